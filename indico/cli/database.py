@@ -22,6 +22,7 @@ from indico.core.db.sqlalchemy.migration import PluginScriptDirectory, migrate,
 from indico.core.db.sqlalchemy.util.management import get_all_tables
 from indico.core.plugins import plugin_engine
 from indico.util.console import cformat
+from indico.util.synthetic import SyntheticDataGenerator
 
 
 @cli_group()
@@ -47,6 +48,42 @@ def prepare():
     return prepare_db()
 
 
+@cli.command()
+@click.option('--categories', type=int, default=100, show_default=True, help='Number of categories')
+@click.option('--depth', type=int, default=5, show_default=True, help='Maximum depth of the category tree')
+@click.option('--events', type=int, default=1000, show_default=True, help='Number of events')
+@click.option('--sessions', type=int, default=2000, show_default=True, help='Number of sessions')
+@click.option('--contributions', type=int, default=50000, show_default=True, help='Number of contributions')
+@click.option('--registrations', type=int, default=50000, show_default=True, help='Number of registrations')
+@click.option('--attachments', type=int, default=10000, show_default=True, help='Number of attachments')
+@click.option('--rooms', type=int, default=100, show_default=True, help='Number of rooms')
+@click.option('--reservations', type=int, default=10000, show_default=True, help='Number of room bookings')
+@click.option('--seed', type=int, help='Seed for the random number generator')
+def populate_synthetic(categories, depth, events, sessions, contributions, registrations, attachments, rooms,
+                       reservations, seed):
+    """Fill the database with synthetic data.
+
+    This creates large amounts of data very quickly to reproduce
+    performance problems that only occur on big Indico instances.
+    The data is inserted directly, so no notifications are sent and
+    no logs are written.
+    """
+    if not current_app.debug:
+        click.secho('Debug mode is NOT ACTIVE, so make sure you are not using a production database!', fg='red')
+        click.confirm('Do you want to add synthetic data to this database?', abort=True)
+    generator = SyntheticDataGenerator(seed)
+    click.echo(f'Creating {categories} categories')
+    generator.create_categories(categories, depth)
+    with click.progressbar(length=events, label='Creating events') as bar:
+        for n in generator.create_events(events, sessions=sessions, contributions=contributions,
+                                         registrations=registrations, attachments=attachments):
+            bar.update(n)
+    with click.progressbar(length=rooms, label='Creating rooms') as bar:
+        for n in generator.create_rooms(rooms, reservations=reservations):
+            bar.update(n)
+    click.secho('Done', fg='green')
+
+
 def _stamp(plugin=None, revision=None):
     table = 'alembic_version' if not plugin else f'alembic_version_plugin_{plugin}'
     db.session.execute(f'DELETE FROM {table}')
@@ -5,7 +5,13 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import timedelta
+from uuid import uuid4
 
 from flask_caching import Cache
 from flask_caching.backends.rediscache import RedisCache
@@ -14,6 +20,7 @@ from redis import from_url as redis_from_url
 
 from indico.core.config import config
 from indico.core.logger import Logger
+from indico.web.flask.stats import count_cache_access
 
 
 _logger = Logger.get('cache')
@@ -36,19 +43,220 @@ class CachedNone:
             return value
 
 
+class LocalCache:
+    """A small in-process cache in front of the Redis cache.
+
+    It contains the serialized values of recently used keys (or the fact
+    that a key does not exist) so repeated lookups of the same key do not
+    need a roundtrip to Redis.  The least recently used entries are evicted
+    once the total size of the cached data exceeds `max_size` bytes, and
+    no entry is kept longer than `ttl` seconds.
+
+    Whenever a key is changed or deleted, all processes are notified via
+    Redis pub/sub so they can drop their local copy.  Until a process has
+    successfully subscribed to these notifications (and whenever it loses
+    the connection) nothing is cached locally, so the `ttl` only limits
+    the staleness of data in case such a notification gets lost.
+    """
+
+    def __init__(self, client, channel, max_size, ttl):
+        self.client = client
+        self.channel = channel
+        self.max_size = max_size
+        self.ttl = ttl
+        self._init_process()
+        os.register_at_fork(after_in_child=self._init_process)
+
+    def _init_process(self):
+        # we need a listener thread in every process, but forked processes only
+        # inherit the thread that forked them so it's started lazily
+        self._lock = threading.Lock()
+        self._pid = None
+        self._origin = uuid4().hex
+        self._subscribed = threading.Event()
+        self._generation = 0
+        self._reset()
+
+    def _reset(self):
+        self._data = OrderedDict()
+        self._size = 0
+        self._generation += 1
+
+    def _ensure_listener(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            threading.Thread(target=self._listen, name='cache-invalidation', daemon=True).start()
+
+    def _listen(self):
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                pubsub.subscribe(self.channel)
+                # wait for the subscription to be confirmed before caching anything
+                while pubsub.get_message(timeout=1) is None:
+                    pass
+                self._subscribed.set()
+                while True:
+                    message = pubsub.get_message(timeout=60)
+                    if message is not None and message['type'] == 'message':
+                        self._handle_message(message['data'])
+            except RedisError:
+                _logger.warning('Lost connection to the local cache invalidation channel')
+            except Exception:
+                _logger.exception('Local cache invalidation failed')
+            finally:
+                self._subscribed.clear()
+                with self._lock:
+                    self._reset()
+                pubsub.close()
+            time.sleep(5)
+
+    def _handle_message(self, data):
+        data = json.loads(data)
+        if data['origin'] == self._origin:
+            return
+        with self._lock:
+            if data['keys'] is None:
+                self._reset()
+            else:
+                self._generation += 1
+                for key in data['keys']:
+                    self._remove(key)
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._size -= entry[2]
+
+    @property
+    def generation(self):
+        """A counter which changes whenever keys are invalidated.
+
+        It needs to be retrieved before loading data from Redis and
+        passed to :meth:`set` when storing that data locally, so data
+        which got invalidated while loading it is not stored.
+        """
+        return self._generation
+
+    def get(self, key):
+        """Get the serialized value of a key.
+
+        :return: A ``(found, value)`` tuple; the value being ``None``
+                 indicates that the key does not exist in Redis.
+        """
+        self._ensure_listener()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            elif entry[0] < time.monotonic():
+                self._remove(key)
+                return False, None
+            self._data.move_to_end(key)
+            return True, entry[1]
+
+    def set(self, key, value, generation, ttl=None):
+        """Store the serialized value of a key.
+
+        :param value: The serialized value or ``None`` if the key does
+                      not exist in Redis.
+        :param generation: The :attr:`generation` from before the value
+                           was loaded.
+        :param ttl: The remaining lifetime of the key in Redis.
+        """
+        size = len(key) + (len(value) if value is not None else 0)
+        if not self._subscribed.is_set() or size > self.max_size:
+            return
+        ttl = min(ttl, self.ttl) if ttl is not None else self.ttl
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._remove(key)
+            self._data[key] = (time.monotonic() + ttl, value, size)
+            self._size += size
+            while self._size > self.max_size:
+                __, (__, __, evicted_size) = self._data.popitem(last=False)
+                self._size -= evicted_size
+
+    def invalidate(self, keys=None):
+        """Remove keys from the local caches of all processes.
+
+        :param keys: The keys to remove; if omitted, everything is removed.
+        """
+        self._ensure_listener()
+        with self._lock:
+            if keys is None:
+                self._reset()
+            else:
+                self._generation += 1
+                for key in keys:
+                    self._remove(key)
+        self.client.publish(self.channel, json.dumps({'origin': self._origin, 'keys': keys}))
+
+
 class IndicoRedisCache(RedisCache):
     """
     This is similar to the original RedisCache from Flask-Caching, but it
     allows specifying a default value when retrieving cache data and
     distinguishing between a cached ``None`` value and a cache miss.
+
+    Optionally, recently used values are also kept in a :class:`LocalCache`
+    inside each process.
     """
 
+    def __init__(self, *args, local_size=0, local_ttl=60, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.local_cache = None
+        if local_size:
+            channel = f'{self._get_prefix()}local-cache-invalidation'
+            self.local_cache = LocalCache(self._write_client, channel, local_size, local_ttl)
+
     def dump_object(self, value):
         # We are not overriding the `load_object` counterpart to this method o
         # purpose because we need to have access to the wrapped value in `get`
         # and `get_many`.
         return super().dump_object(CachedNone.wrap(value))
 
+    def _invalidate_local(self, *keys):
+        if self.local_cache is not None:
+            self.local_cache.invalidate(list(keys))
+
+    def _get_dumps(self, keys):
+        if self.local_cache is None:
+            if len(keys) == 1:
+                return [self._read_clients.get(self._get_prefix() + keys[0])]
+            return self._read_clients.mget([self._get_prefix() + key for key in keys])
+        dumps = {}
+        missing = []
+        for key in keys:
+            found, dump = self.local_cache.get(key)
+            if found:
+                dumps[key] = dump
+            else:
+                missing.append(key)
+        if missing:
+            generation = self.local_cache.generation
+            # we also need to know when the keys expire so we don't keep them locally for longer
+            pipe = self._read_clients.pipeline(transaction=False)
+            for key in missing:
+                pipe.get(self._get_prefix() + key)
+                pipe.pttl(self._get_prefix() + key)
+            results = pipe.execute()
+            for key, dump, pttl in zip(missing, results[::2], results[1::2]):
+                dumps[key] = dump
+                self.local_cache.set(key, dump, generation, (pttl / 1000) if pttl >= 0 else None)
+        return [dumps[key] for key in keys]
+
+    def set(self, key, value, timeout=None):
+        rv = super().set(key, value, timeout=timeout)
+        self._invalidate_local(key)
+        return rv
+
     def add(self, key, value, timeout=None):
         # XXX: remove this once there's a release contining the fix from
         # https://github.com/sh4nks/flask-caching/pull/218
@@ -61,13 +269,37 @@ class IndicoRedisCache(RedisCache):
             self._write_client.expire(
                 name=self._get_prefix() + key, time=timeout
             )
+        if created:
+            self._invalidate_local(key)
         return created
 
+    def set_many(self, mapping, timeout=None):
+        rv = super().set_many(mapping, timeout=timeout)
+        self._invalidate_local(*mapping)
+        return rv
+
+    def delete(self, key):
+        rv = super().delete(key)
+        self._invalidate_local(key)
+        return rv
+
+    def delete_many(self, *keys):
+        rv = super().delete_many(*keys)
+        if keys:
+            self._invalidate_local(*keys)
+        return rv
+
+    def clear(self):
+        rv = super().clear()
+        if self.local_cache is not None:
+            self.local_cache.invalidate()
+        return rv
+
     def get(self, key, default=None):
-        return CachedNone.unwrap(super().get(key), default)
+        return CachedNone.unwrap(self.load_object(self._get_dumps([key])[0]), default)
 
     def get_many(self, *keys, default=None):
-        return [CachedNone.unwrap(val, default) for val in super().get_many(*keys)]
+        return [CachedNone.unwrap(self.load_object(dump), default) for dump in self._get_dumps(keys)]
 
     def get_dict(self, *keys, default=None):
         return dict(zip(keys, self.get_many(*keys, default=default)))
@@ -78,6 +310,8 @@ class IndicoRedisCache(RedisCache):
         if key_prefix:
             kwargs['key_prefix'] = key_prefix
         kwargs['host'] = redis_from_url(config['CACHE_REDIS_URL'], socket_timeout=1)
+        kwargs['local_size'] = config.get('CACHE_LOCAL_SIZE', 0)
+        kwargs['local_ttl'] = config.get('CACHE_LOCAL_TTL', 60)
         return IndicoRedisCache(*args, **kwargs)
 
 
@@ -100,7 +334,7 @@ class ScopedCache:
     def add(self, key, value, timeout=None):
         if isinstance(timeout, timedelta):
             timeout = int(timeout.total_seconds())
-        self.cache.add(self._scoped(key), value, timeout=timeout)
+        return self.cache.add(self._scoped(key), value, timeout=timeout)
 
     def delete(self, key):
         self.cache.delete(self._scoped(key))
@@ -143,12 +377,15 @@ class IndicoCache(Cache):
 
     def get(self, key, default=None):
         try:
-            return super().get(key, default)
+            rv = super().get(key, default)
         except RedisError:
             if config.DEBUG:
                 raise
             _logger.exception('get(%r) failed', key)
             return default
+        hit = rv is not default
+        count_cache_access(int(hit), int(not hit))
+        return rv
 
     def set(self, key, value, timeout=None):
         if isinstance(timeout, timedelta):
@@ -164,11 +401,12 @@ class IndicoCache(Cache):
         if isinstance(timeout, timedelta):
             timeout = int(timeout.total_seconds())
         try:
-            super().add(key, value, timeout=timeout)
+            return super().add(key, value, timeout=timeout)
         except RedisError:
             if config.DEBUG:
                 raise
             _logger.exception('add(%r) failed', key)
+            return False
 
     def delete(self, key):
         try:
@@ -196,13 +434,16 @@ class IndicoCache(Cache):
 
     def get_many(self, *keys, default=None):
         try:
-            return super().get_many(*keys, default=default)
+            rv = super().get_many(*keys, default=default)
         except RedisError:
             if config.DEBUG:
                 raise
             logkeys = ', '.join(map(repr, keys))
             _logger.exception('get_many(%s) failed', logkeys)
             return [default] * len(keys)
+        hits = sum(1 for value in rv if value is not default)
+        count_cache_access(hits, len(rv) - hits)
+        return rv
 
     def set_many(self, mapping, timeout=None):
         if isinstance(timeout, timedelta):
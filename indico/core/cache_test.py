@@ -5,11 +5,13 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+import time
 from datetime import timedelta
 
 import pytest
+from redis import from_url as redis_from_url
 
-from indico.core.cache import cache, make_scoped_cache
+from indico.core.cache import IndicoRedisCache, cache, make_scoped_cache
 
 
 def test_cache_none_default():
@@ -36,8 +38,8 @@ def test_scoped_cache():
     assert scoped.get('foo', 'notset') == 'notset'
 
     scoped.set('foo', 'bar')
-    scoped.add('foobar', 'test')
-    scoped.add('foo', 'nope')
+    assert scoped.add('foobar', 'test')
+    assert not scoped.add('foo', 'nope')
 
     # accessing the scope through the global cache is possibly, but should not be done
     # if this ever starts failing because we change something in the cache implementation
@@ -69,3 +71,84 @@ def test_expiry(scoped, timeout):
     cache_obj.add('b', 2, timeout=timeout)
     cache_obj.set_many({'c': 3}, timeout=timeout)
     assert cache_obj.get_many('a', 'b', 'c') == [1, 2, 3]
+
+
+@pytest.fixture
+def create_local_cache(redis_proc):
+    """Return a callable which creates Redis caches with a local cache."""
+    client = redis_from_url(f'redis://{redis_proc.host}:{redis_proc.port}/0')
+
+    def _create_local_cache(**kwargs):
+        kwargs.setdefault('local_size', 1000)
+        kwargs.setdefault('local_ttl', 60)
+        local_cache = IndicoRedisCache(client, key_prefix='localtest_', **kwargs)
+        local_cache.get('init')
+        assert local_cache.local_cache._subscribed.wait(5)
+        return local_cache
+
+    yield _create_local_cache
+    if keys := client.keys('localtest_*'):
+        client.delete(*keys)
+
+
+def _wait_for(func, expected):
+    for __ in range(50):
+        if func() == expected:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_local_cache(create_local_cache):
+    cache1 = create_local_cache()
+    cache2 = create_local_cache()
+    client = cache1._write_client
+    cache1.set('foo', 'bar')
+    cache1.set('none', None)
+    assert cache1.get_many('foo', 'none', 'missing', default='x') == ['bar', None, 'x']
+    # changing the data behind the cache's back is not noticed...
+    client.set('localtest_foo', cache1.dump_object('changed'))
+    client.set('localtest_missing', cache1.dump_object('found'))
+    assert cache1.get('foo') == 'bar'
+    assert cache1.get('missing') is None
+    # ...but changes through the cache in other processes are
+    cache2.set('foo', 'test')
+    assert _wait_for(lambda: cache1.get('foo'), 'test')
+    cache2.delete('missing')
+    cache2.delete_many('none')
+    assert _wait_for(lambda: cache1.get_many('missing', 'none', default='x'), ['x', 'x'])
+    cache2.add('missing', 'added')
+    assert _wait_for(lambda: cache1.get('missing'), 'added')
+    cache2.clear()
+    assert _wait_for(lambda: cache1.get('foo'), None)
+
+
+def test_local_cache_limits(create_local_cache):
+    cache = create_local_cache(local_ttl=60)
+    client = cache._write_client
+    value = 'x' * 30
+    cache.local_cache.max_size = 3 * (len('key0') + len(cache.dump_object(value)))
+    cache.set('big', 'x' * 1000)
+    cache.set_many({f'key{i}': value for i in range(4)})
+    assert cache.get('big') == 'x' * 1000
+    assert cache.get_many('key0', 'key1', 'key2', 'key0') == [value] * 4
+    assert cache.get('key3') == value
+    for key in ('big', 'key0', 'key1', 'key2', 'key3'):
+        client.set(f'localtest_{key}', cache.dump_object('changed'))
+    # the least recently used keys are evicted first
+    assert cache.get_many('key0', 'key1', 'key2', 'key3') == [value, 'changed', value, value]
+    # too big to be cached locally
+    assert cache.get('big') == 'changed'
+
+
+def test_local_cache_expiry(create_local_cache):
+    cache = create_local_cache(local_ttl=1)
+    client = cache._write_client
+    cache.set('short', 'a', timeout=1)
+    cache.set('long', 'a')
+    assert cache.get_many('short', 'long') == ['a', 'a']
+    client.set('localtest_long', cache.dump_object('changed'))
+    assert cache.get('long') == 'a'
+    time.sleep(1.1)
+    # entries neither outlive the keys in redis nor the local ttl
+    assert cache.get_many('short', 'long') == [None, 'changed']
@@ -7,6 +7,7 @@
 
 import logging
 import os
+from collections import defaultdict
 from contextlib import ExitStack
 from operator import itemgetter
 
@@ -37,6 +38,9 @@ class IndicoCelery(Celery):
                   inside a plugin context for that plugin.  This will
                   override whatever plugin context is active when
                   sending the task.
+    - `load_options` -- a dict mapping models to a list of SQLAlchemy
+                        query options (e.g. to eager-load relationships)
+                        used when loading the objects passed to the task
     """
 
     def __init__(self, *args, **kwargs):
@@ -122,8 +126,7 @@ class IndicoCelery(Celery):
                 stack.enter_context(self.flask_app.app_context())
                 if getattr(s, 'request_context', False):
                     stack.enter_context(self.flask_app.test_request_context(base_url=config.BASE_URL))
-                args = _CelerySAWrapper.unwrap_args(args)
-                kwargs = _CelerySAWrapper.unwrap_kwargs(kwargs)
+                args, kwargs = _CelerySAWrapper.unwrap(args, kwargs, getattr(s, 'load_options', None))
                 plugin = getattr(s, 'plugin', s.request.get('indico_plugin'))
                 if isinstance(plugin, str):
                     plugin_name = plugin
@@ -185,6 +188,18 @@ class IndicoPersistentScheduler(PersistentScheduler):
         print(AsciiTable(table_data, cformat('%{white!}Periodic Tasks%{reset}')).table)
 
 
+def _format_identity_key(identity_key):
+    model, args = identity_key
+    return '<{}: {}>'.format(model.__name__, ','.join(map(repr, args)))
+
+
+def _get_loaded_object(objects, identity_key):
+    try:
+        return objects[identity_key]
+    except KeyError:
+        raise ValueError(f'Object not in DB: {_format_identity_key(identity_key)}')
+
+
 class _CelerySAWrapper:
     """Wrapper to safely pass SQLAlchemy objects to tasks.
 
@@ -201,28 +216,86 @@ class _CelerySAWrapper:
         self.identity_key = identity_key[:2]
 
     @property
-    def object(self):
-        obj = self.identity_key[0].get(self.identity_key[1])
-        if obj is None:
-            raise ValueError(f'Object not in DB: {self}')
-        return obj
+    def identity_keys(self):
+        return [self.identity_key]
+
+    def resolve(self, objects):
+        return _get_loaded_object(objects, self.identity_key)
 
     def __repr__(self):
-        model, args = self.identity_key[:2]
-        return '<{}: {}>'.format(model.__name__, ','.join(map(repr, args)))
+        return _format_identity_key(self.identity_key)
+
+    @classmethod
+    def _wrap(cls, value):
+        if isinstance(value, db.Model):
+            return cls(value)
+        elif (isinstance(value, (list, tuple)) and value and
+                all(isinstance(x, db.Model) for x in value)):
+            return _CelerySAListWrapper(value)
+        return value
 
     @classmethod
     def wrap_args(cls, args):
-        return tuple(cls(x) if isinstance(x, db.Model) else x for x in args)
+        return tuple(cls._wrap(x) for x in args)
 
     @classmethod
     def wrap_kwargs(cls, kwargs):
-        return {k: cls(v) if isinstance(v, db.Model) else v for k, v in kwargs.items()}
+        return {k: cls._wrap(v) for k, v in kwargs.items()}
+
+    @staticmethod
+    def _load_objects(identity_keys, load_options):
+        pks_by_model = defaultdict(set)
+        for model, pk in identity_keys:
+            pks_by_model[model].add(pk)
+        objects = {}
+        for model, pks in pks_by_model.items():
+            pk_columns = inspect(model).primary_key
+            if len(pk_columns) == 1:
+                criterion = pk_columns[0].in_({pk[0] for pk in pks})
+            else:
+                criterion = db.tuple_(*pk_columns).in_(pks)
+            query = model.query.filter(criterion).options(*load_options.get(model, ()))
+            objects.update((inspect(obj).identity_key[:2], obj) for obj in query)
+        return objects
 
     @classmethod
-    def unwrap_args(cls, args):
-        return tuple(x.object if isinstance(x, cls) else x for x in args)
+    def unwrap(cls, args, kwargs, load_options=None):
+        """Load the objects passed to a task.
+
+        All objects passed to the task are loaded at once, using a
+        single query for each model.
+
+        :param args: The positional arguments of the task
+        :param kwargs: The keyword arguments of the task
+        :param load_options: A dict mapping models to a list of
+                             SQLAlchemy query options used when
+                             loading objects of that model, e.g.
+                             to eager-load relationships.
+        :return: A ``(args, kwargs)`` tuple
+        """
+        wrapped = [x for x in [*args, *kwargs.values()] if isinstance(x, (cls, _CelerySAListWrapper))]
+        if not wrapped:
+            return args, kwargs
+        objects = cls._load_objects({key for x in wrapped for key in x.identity_keys}, load_options or {})
+        args = tuple(x.resolve(objects) if isinstance(x, (cls, _CelerySAListWrapper)) else x for x in args)
+        kwargs = {k: v.resolve(objects) if isinstance(v, (cls, _CelerySAListWrapper)) else v
+                  for k, v in kwargs.items()}
+        return args, kwargs
 
-    @classmethod
-    def unwrap_kwargs(cls, kwargs):
-        return {k: v.object if isinstance(v, cls) else v for k, v in kwargs.items()}
+
+class _CelerySAListWrapper:
+    """Wrapper to safely pass a list of SQLAlchemy objects to tasks.
+
+    The objects are loaded together with all other objects passed to
+    the task when executing it.
+    """
+    __slots__ = ('identity_keys',)
+
+    def __init__(self, objs):
+        self.identity_keys = [_CelerySAWrapper(obj).identity_key for obj in objs]
+
+    def resolve(self, objects):
+        return [_get_loaded_object(objects, key) for key in self.identity_keys]
+
+    def __repr__(self):
+        return f'<list of {len(self.identity_keys)} objects>'
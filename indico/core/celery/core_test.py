@@ -0,0 +1,40 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import pickle
+
+import pytest
+
+from indico.core.celery.core import _CelerySAWrapper
+from indico.modules.users import User
+
+
+def test_sa_wrapper(db, create_user, dummy_event, count_queries):
+    users = [create_user(i) for i in range(1, 6)]
+    args = _CelerySAWrapper.wrap_args((users[0], users[1:], 'foo'))
+    kwargs = _CelerySAWrapper.wrap_kwargs({'event': dummy_event, 'users': []})
+    args, kwargs = pickle.loads(pickle.dumps((args, kwargs)))
+    db.session.expunge_all()
+
+    with count_queries() as cnt:
+        args, kwargs = _CelerySAWrapper.unwrap(args, kwargs, {User: [db.joinedload('_affiliation')]})
+    # one query per model, regardless of the number of objects
+    assert cnt() == 2
+    assert args[0].id == 1
+    assert [u.id for u in args[1]] == [2, 3, 4, 5]
+    assert args[2] == 'foo'
+    assert kwargs['event'].id == dummy_event.id
+    assert kwargs['users'] == []
+
+
+def test_sa_wrapper_missing(db, create_user):
+    user = create_user(1)
+    args = _CelerySAWrapper.wrap_args(([user],))
+    db.session.delete(user)
+    db.session.flush()
+    with pytest.raises(ValueError, match='Object not in DB: <User: 1>'):
+        _CelerySAWrapper.unwrap(args, {})
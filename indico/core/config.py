@@ -51,6 +51,7 @@ DEFAULTS = {
     'HELP_URL': 'https://learn.getindico.io',
     'FAILED_LOGIN_RATE_LIMIT': '5 per 15 minutes; 10 per day',
     'IDENTITY_PROVIDERS': {},
+    'LATEX_MAX_PROCESSES': 0,
     'LOCAL_IDENTITIES': True,
     'LOCAL_MODERATION': False,
     'LOCAL_REGISTRATION': True,
@@ -66,7 +67,11 @@ DEFAULTS = {
     'PROFILE': False,
     'PROVIDER_MAP': {},
     'PUBLIC_SUPPORT_EMAIL': None,
+    'REDIS_CACHE_LOCAL_SIZE': 0,
+    'REDIS_CACHE_LOCAL_TTL': 60,
     'REDIS_CACHE_URL': None,
+    'REQUEST_PROFILE_LOG_RATE': 0,
+    'REQUEST_PROFILE_SERVER_TIMING': False,
     'ROUTE_OLD_URLS': False,
     'SCHEDULED_TASK_OVERRIDE': {},
     'SECRET_KEY': None,
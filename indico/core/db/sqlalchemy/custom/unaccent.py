@@ -60,10 +60,12 @@ def define_unaccented_lowercase_index(column):
         Index(conv(f'ix_{column.table.name}_{column.name}_unaccent'), col_func, **index_kwargs).create(conn)
 
 
-def unaccent_match(column, value, exact):
+def unaccent_match(column, value, exact, *, prefix=False):
     from indico.core.db import db
     value = value.replace('%', r'\%').replace('_', r'\_').lower()
-    if not exact:
+    if prefix:
+        value = f'{value}%'
+    elif not exact:
         value = f'%{value}%'
     # we always use LIKE, even for an exact match. when using the pg_trgm indexes this is
     # actually faster than `=`
@@ -23,7 +23,7 @@ from indico.util.caching import memoize_request
 from indico.util.enum import RichIntEnum
 from indico.util.i18n import _, orig_string
 from indico.util.signals import values_from_signal
-from indico.util.user import iter_acl
+from indico.util.user import is_user_in_acl
 from indico.web.util import jsonify_template
 
 
@@ -200,7 +200,7 @@ class ProtectionMixin:
         elif self.protection_mode == ProtectionMode.protected:
             # if it's protected, we also ignore the parent protection
             # and only check our own ACL
-            if any(user in entry.principal for entry in iter_acl(self.acl_entries)):
+            if is_user_in_acl(self.acl_entries, user):
                 rv = True
             elif isinstance(self, ProtectionManagersMixin):
                 rv = self.can_manage(user, allow_admin=allow_admin)
@@ -210,7 +210,7 @@ class ProtectionMixin:
             # if it's inheriting, we only check the parent protection
             # unless `inheriting_have_acl` is set, in which case we
             # might not need to check the parents at all
-            if self.inheriting_have_acl and any(user in entry.principal for entry in iter_acl(self.acl_entries)):
+            if self.inheriting_have_acl and is_user_in_acl(self.acl_entries, user):
                 rv = True
             elif self.allow_none_protection_parent and self.protection_parent is None:
                 # This is the case for unlisted events, which are inheriting
@@ -399,10 +399,10 @@ class ProtectionManagersMixin(ProtectionMixin):
         if not explicit_permission and allow_admin and type(self).is_user_admin(user):
             return True
 
-        if any(user in entry.principal
-               for entry in iter_acl(self.acl_entries)
-               if entry.has_management_permission(permission,
-                                                  explicit=(explicit_permission and permission is not None))):
+        explicit = explicit_permission and permission is not None
+        if is_user_in_acl((entry for entry in self.acl_entries
+                           if entry.has_management_permission(permission, explicit=explicit)),
+                          user):
             return True
 
         if not check_parent or explicit_permission:
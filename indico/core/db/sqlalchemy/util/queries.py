@@ -137,7 +137,7 @@ def get_related_object(obj, relationship, criteria):
     return cls.query.with_parent(obj, relationship).filter_by(**criteria).first()
 
 
-def get_n_matching(query, n, predicate, *, prefetch_factor=5, preload_bulk=None):
+def get_n_matching(query, n, predicate, *, prefetch_factor=5, preload_bulk=None, continue_after=None):
     """Get N objects from a query that satisfy a condition.
 
     This queries for ``n * 5`` objects initially and then loads
@@ -151,14 +151,27 @@ def get_n_matching(query, n, predicate, *, prefetch_factor=5, preload_bulk=None)
     :param preload_bulk: Function that's called with the full set of objects
                          to allow for bulk-preloading of data neede in the
                          predicate function
+    :param continue_after: Function that's called with the query and the
+                           last object that has been loaded and returns a
+                           query for the objects after it.  When specified,
+                           it is used instead of an ``OFFSET`` to load more
+                           objects, which avoids scanning all the previously
+                           loaded rows again.  The query must be sorted by a
+                           unique column for this to work.
     """
     _offset = 0
+    _last = None
 
     def _get():
-        nonlocal _offset
+        nonlocal _offset, _last
         limit = n * prefetch_factor
-        rv = query.offset(_offset).limit(limit).all()
-        _offset += limit
+        if continue_after is None:
+            rv = query.offset(_offset).limit(limit).all()
+            _offset += limit
+        else:
+            rv = (query if _last is None else continue_after(query, _last)).limit(limit).all()
+            if rv:
+                _last = rv[-1]
         return rv
 
     results = []
@@ -7,6 +7,7 @@
 
 import os
 import pickle
+import smtplib
 import tempfile
 from datetime import date
 from email.headerregistry import parser
@@ -31,6 +32,8 @@ from indico.vendor.django_mail.message import EmailMessage
 logger = Logger.get('emails')
 MAX_TRIES = 10
 DELAYS = [30, 60, 120, 300, 600, 1800, 3600, 3600, 7200]
+#: The maximum number of queued emails sent in a single task
+BATCH_SIZE = 100
 
 
 @celery.task(name='send_email', bind=True, max_retries=None)
@@ -66,6 +69,46 @@ def send_email_task(task, email, log_entry=None):
             db.session.commit()
 
 
+@celery.task(name='send_emails', bind=True, max_retries=None)
+def send_emails_task(task, emails, log_entry_ids):
+    """Send a batch of emails using a single connection to the mail server.
+
+    Only the emails which could not be sent are retried later.
+
+    :param emails: A list of emails as created by `make_email`
+    :param log_entry_ids: A list containing the ID of the `EventLogEntry`
+                          for each email, or ``None`` for emails which
+                          were not sent in the context of an event
+    """
+    from indico.modules.logs import EventLogEntry
+    attempt = task.request.retries + 1
+    log_entries = {}
+    if ids := {id_ for id_ in log_entry_ids if id_ is not None}:
+        log_entries = {entry.id: entry for entry in EventLogEntry.query.filter(EventLogEntry.id.in_(ids))}
+    failed = do_send_emails([(email, log_entries.get(id_)) for email, id_ in zip(emails, log_entry_ids)])
+    # commit the log entry state changes of the emails which have been sent
+    db.session.commit()
+    if not failed:
+        return
+    delay = (DELAYS + [0])[task.request.retries] if not config.DEBUG else 1
+    try:
+        task.retry(args=([email for email, __, __ in failed],
+                         [log_entry.id if log_entry else None for __, log_entry, __ in failed]),
+                   countdown=delay, max_retries=(MAX_TRIES - 1))
+    except MaxRetriesExceededError:
+        for email, log_entry, exc in failed:
+            if log_entry:
+                update_email_log_state(log_entry, failed=True)
+            path = store_failed_email(email, log_entry)
+            logger.error('Could not send email "%s" (attempt %d/%d); giving up [%s]; stored data in %s',
+                         truncate(email['subject'], 100), attempt, MAX_TRIES, exc, path)
+        db.session.commit()
+    except Retry:
+        logger.warning('Could not send %d/%d emails (attempt %d/%d); retry in %ds [%s]',
+                       len(failed), len(emails), attempt, MAX_TRIES, delay, failed[0][2])
+        raise
+
+
 def _rewrite_sender(msg: EmailMessage):
     if not config.SMTP_SENDER_FALLBACK:
         # no fallback set, cannot rewrite. let's hope all emails go through...
@@ -95,22 +138,64 @@ def do_send_email(email, log_entry=None, _from_task=False):
                        the celery task responsible for sending emails.
     """
     with get_connection() as conn:
-        msg = EmailMessage(subject=email['subject'], body=email['body'], from_email=email['from'],
-                           to=email['to'], cc=email['cc'], bcc=email['bcc'], reply_to=email['reply_to'],
-                           attachments=email['attachments'], connection=conn)
-        if not msg.to:
-            msg.extra_headers['To'] = 'Undisclosed-recipients:;'
-        _rewrite_sender(msg)
-        if email['html']:
-            msg.content_subtype = 'html'
-        msg.extra_headers['message-id'] = make_msgid(domain=url_parse(config.BASE_URL).host)
-        msg.send()
+        _make_message(email, conn).send()
     if not _from_task:
         logger.info('Sent email "%s"', truncate(email['subject'], 100))
     if log_entry:
         update_email_log_state(log_entry)
 
 
+def _make_message(email, connection):
+    msg = EmailMessage(subject=email['subject'], body=email['body'], from_email=email['from'],
+                       to=email['to'], cc=email['cc'], bcc=email['bcc'], reply_to=email['reply_to'],
+                       attachments=email['attachments'], connection=connection)
+    if not msg.to:
+        msg.extra_headers['To'] = 'Undisclosed-recipients:;'
+    _rewrite_sender(msg)
+    if email['html']:
+        msg.content_subtype = 'html'
+    msg.extra_headers['message-id'] = make_msgid(domain=url_parse(config.BASE_URL).host)
+    return msg
+
+
+def do_send_emails(emails):
+    """Send several emails using the same connection to the mail server.
+
+    If the mail server closes the connection while sending, it is
+    reopened once for each email.  Failing to send an email does not
+    prevent the other emails from being sent.
+
+    :param emails: A list of ``(email, log_entry)`` tuples, see
+                   :func:`do_send_email`
+    :return: A list of ``(email, log_entry, exception)`` tuples for
+             the emails which could not be sent
+    """
+    conn = get_connection()
+    try:
+        conn.open()
+    except Exception as exc:
+        return [(email, log_entry, exc) for email, log_entry in emails]
+    failed = []
+    try:
+        for email, log_entry in emails:
+            try:
+                try:
+                    _make_message(email, conn).send()
+                except smtplib.SMTPServerDisconnected:
+                    conn.close()
+                    conn.open()
+                    _make_message(email, conn).send()
+            except Exception as exc:
+                failed.append((email, log_entry, exc))
+                continue
+            logger.info('Sent email "%s"', truncate(email['subject'], 100))
+            if log_entry:
+                update_email_log_state(log_entry)
+    finally:
+        conn.close()
+    return failed
+
+
 def update_email_log_state(log_entry, failed=False):
     if failed:
         log_entry.data['state'] = 'failed'
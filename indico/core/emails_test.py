@@ -5,9 +5,12 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+from smtplib import SMTP, SMTPServerDisconnected
+
 import pytest
 
-from indico.core.emails import _rewrite_sender
+from indico.core.emails import _rewrite_sender, do_send_emails
+from indico.core.notifications import make_email
 from indico.vendor.django_mail.message import EmailMessage
 
 
@@ -42,3 +45,23 @@ def test_rewrite_sender_notset():
     _rewrite_sender(msg)
     assert msg.from_email == 'foo@example.com'
     assert msg.message()['From'] == 'foo@example.com'
+
+
+def test_do_send_emails(smtp, mocker):
+    orig_sendmail = SMTP.sendmail
+    connect = mocker.spy(SMTP, 'connect')
+    calls = []
+
+    def _sendmail(self, *args, **kwargs):
+        calls.append(args)
+        if len(calls) == 2:
+            raise SMTPServerDisconnected('Connection unexpectedly closed')
+        return orig_sendmail(self, *args, **kwargs)
+
+    mocker.patch.object(SMTP, 'sendmail', _sendmail)
+    emails = [make_email(f'user{i}@example.com', subject=f'Test {i}', body='Hello') for i in range(3)]
+    assert do_send_emails([(email, None) for email in emails]) == []
+    # all emails use the same connection, but it is reopened after being closed by the server
+    assert connect.call_count == 2
+    assert len(calls) == 4
+    assert [msg['Subject'] for msg in smtp.outbox] == ['Test 0', 'Test 1', 'Test 2']
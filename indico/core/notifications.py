@@ -15,6 +15,7 @@ from flask import g
 from indico.core.config import config
 from indico.core.db import db
 from indico.core.logger import Logger
+from indico.util.iterables import grouper
 from indico.util.string import truncate
 
 
@@ -49,15 +50,19 @@ def send_email(email, event=None, module=None, user=None, log_metadata=None):
     :param user: The user to show in the email log
     :param log_metadata: A metadata dictionary to be saved in the event's log
     """
-    from indico.core.emails import do_send_email, send_email_task
-    fn = send_email_task.delay if config.SMTP_USE_CELERY else do_send_email
+    from indico.core.emails import do_send_email, send_emails_task
+
     # we log the email immediately (as pending).  if we don't commit,
     # the log message will simply be thrown away later
     log_entry = _log_email(email, event, module, user, log_metadata)
     if 'email_queue' in g:
-        g.email_queue.append((fn, email, log_entry))
+        g.email_queue.append((email, log_entry))
+    elif config.SMTP_USE_CELERY:
+        if log_entry:
+            db.session.flush()
+        send_emails_task.delay([email], [log_entry.id if log_entry else None])
     else:
-        fn(email, log_entry)
+        do_send_email(email, log_entry)
 
 
 def _log_email(email, event, module, user, meta=None):
@@ -93,27 +98,35 @@ def flush_email_queue():
     doing a commit/rollback of any other changes that might have
     been pending.
     """
-    from indico.core.emails import store_failed_email, update_email_log_state
+    from indico.core.emails import (BATCH_SIZE, do_send_emails, send_emails_task, store_failed_email,
+                                    update_email_log_state)
     queue = g.get('email_queue', [])
     if not queue:
         return
     logger.debug('Sending %d queued emails', len(queue))
-    for fn, email, log_entry in queue:
-        try:
-            fn(email, log_entry)
-        except Exception:
-            # Flushing the email queue happens after a commit.
-            # If anything goes wrong here we keep going and just log
-            # it to avoid losing (more) emails in case celery is not
-            # used for email sending or there is a temporary issue
-            # with celery.
-            if log_entry:
-                update_email_log_state(log_entry, failed=True)
-            path = store_failed_email(email, log_entry)
-            logger.exception('Flushing queued email "%s" failed; stored data in %s',
-                             truncate(email['subject'], 100), path)
-            # Wait for a short moment in case it's a very temporary issue
-            time.sleep(0.25)
+    if config.SMTP_USE_CELERY:
+        failed = []
+        for chunk in grouper(queue, BATCH_SIZE, skip_missing=True):
+            try:
+                send_emails_task.delay([email for email, __ in chunk],
+                                       [log_entry.id if log_entry else None for __, log_entry in chunk])
+            except Exception as exc:
+                failed += [(email, log_entry, exc) for email, log_entry in chunk]
+                # Wait for a short moment in case it's a very temporary issue
+                time.sleep(0.25)
+    else:
+        failed = do_send_emails(queue)
+    # Flushing the email queue happens after a commit.
+    # If anything goes wrong here we keep going and just log
+    # it to avoid losing (more) emails in case celery is not
+    # used for email sending or there is a temporary issue
+    # with celery.
+    for email, log_entry, exc in failed:
+        if log_entry:
+            update_email_log_state(log_entry, failed=True)
+        path = store_failed_email(email, log_entry)
+        logger.error('Flushing queued email "%s" failed; stored data in %s [%s]',
+                     truncate(email['subject'], 100), path, exc)
     del queue[:]
     db.session.commit()
 
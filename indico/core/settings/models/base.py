@@ -14,6 +14,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from indico.core.db import db
 from indico.core.db.sqlalchemy.principals import PrincipalMixin, PrincipalType
 from indico.util.decorators import strict_classproperty
+from indico.web.flask.stats import count_settings_query
 
 
 def _coerce_value(value):
@@ -80,8 +81,8 @@ class SettingsBase:
             # no cache for this settings class / kwargs
             return g.global_settings_cache.setdefault(key, defaultdict(dict)), False
 
-    @staticmethod
-    def _clear_cache():
+    @classmethod
+    def _clear_cache(cls):
         if has_request_context():
             g.pop('global_settings_cache', None)
 
@@ -98,21 +99,37 @@ class JSONSettingsBase(SettingsBase):
 
     @classmethod
     def get_setting(cls, module, name, **kwargs):
+        count_settings_query()
         return cls.query.filter_by(module=module, name=name, **kwargs).first()
 
     @classmethod
     def get_all_settings(cls, module, **kwargs):
+        count_settings_query()
         return {s.name: s for s in cls.query.filter_by(module=module, **kwargs)}
 
     @classmethod
-    def get_all(cls, module, **kwargs):
+    def preload(cls, **kwargs):
+        """Load the settings of all modules into the request cache.
+
+        :return: A dict mapping module names to dicts containing the
+                 settings of each module.
+        """
         cache, hit = cls._get_cache(kwargs)
-        if hit:
-            return cache[module]
-        else:
-            for s in cls.query.filter_by(**kwargs):
-                cache[s.module][s.name] = s.value
-            return cache[module]
+        if not hit:
+            cache.update(cls._load_all(**kwargs))
+        return cache
+
+    @classmethod
+    def _load_all(cls, **kwargs):
+        count_settings_query()
+        rv = defaultdict(dict)
+        for s in cls.query.filter_by(**kwargs):
+            rv[s.module][s.name] = s.value
+        return rv
+
+    @classmethod
+    def get_all(cls, module, **kwargs):
+        return cls.preload(**kwargs)[module]
 
     @classmethod
     def get(cls, module, name, default=None, **kwargs):
@@ -155,16 +172,30 @@ class PrincipalSettingsBase(PrincipalMixin, SettingsBase):
     def unique_columns(cls):
         return ('module', 'name') + cls.extra_key_cols
 
+    @classmethod
+    def preload(cls, **kwargs):
+        """Load the ACLs of all modules into the request cache.
+
+        :return: A dict mapping module names to dicts containing the
+                 principals of each ACL.
+        """
+        cache, hit = cls._get_cache(kwargs)
+        if not hit:
+            count_settings_query()
+            for setting in cls.query.filter_by(**kwargs):
+                cache[setting.module].setdefault(setting.name, set()).add(setting.principal)
+        return cache
+
     @classmethod
     def get_all_acls(cls, module, **kwargs):
-        rv = defaultdict(set)
-        for setting in cls.query.filter_by(module=module, **kwargs):
-            rv[setting.name].add(setting.principal)
-        return rv
+        return defaultdict(set, {name: set(acl) for name, acl in cls.preload(**kwargs)[module].items()})
 
     @classmethod
     def get_acl(cls, module, name, raw=False, **kwargs):
-        return {x if raw else x.principal for x in cls.query.filter_by(module=module, name=name, **kwargs)}
+        if not raw:
+            return set(cls.preload(**kwargs)[module].get(name, ()))
+        count_settings_query()
+        return set(cls.query.filter_by(module=module, name=name, **kwargs))
 
     @classmethod
     def set_acl(cls, module, name, acl, **kwargs):
@@ -176,6 +207,7 @@ class PrincipalSettingsBase(PrincipalMixin, SettingsBase):
             if setting.principal not in acl:
                 db.session.delete(setting)
         db.session.flush()
+        cls._clear_cache()
 
     @classmethod
     def set_acl_multi(cls, module, items, **kwargs):
@@ -184,9 +216,10 @@ class PrincipalSettingsBase(PrincipalMixin, SettingsBase):
 
     @classmethod
     def add_principal(cls, module, name, principal, **kwargs):
-        if principal not in cls.get_acl(module, name):
+        if principal not in cls.get_acl(module, name, **kwargs):
             db.session.add(cls(module=module, name=name, principal=principal, **kwargs))
             db.session.flush()
+            cls._clear_cache()
 
     @classmethod
     def remove_principal(cls, module, name, principal, **kwargs):
@@ -194,6 +227,7 @@ class PrincipalSettingsBase(PrincipalMixin, SettingsBase):
             if setting.principal == principal:
                 db.session.delete(setting)
                 db.session.flush()
+                cls._clear_cache()
 
     @classmethod
     def merge_users(cls, module, target, source):
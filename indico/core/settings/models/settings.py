@@ -5,14 +5,26 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+from copy import deepcopy
+from uuid import uuid4
+
+from flask import g, has_app_context
 from sqlalchemy.ext.declarative import declared_attr
 
+from indico.core import signals
+from indico.core.cache import make_scoped_cache
 from indico.core.db.sqlalchemy import db
 from indico.core.db.sqlalchemy.util.models import auto_table_args
 from indico.core.settings.models.base import JSONSettingsBase, PrincipalSettingsBase
 from indico.util.decorators import strict_classproperty
 
 
+settings_cache = make_scoped_cache('settings')
+#: The global settings shared by all requests handled by this process,
+#: as a ``(version, settings)`` tuple
+_shared_settings = (None, None)
+
+
 class CoreSettingsMixin:
     @strict_classproperty
     @staticmethod
@@ -34,6 +46,41 @@ class Setting(JSONSettingsBase, CoreSettingsMixin, db.Model):
     def __repr__(self):
         return f'<Setting({self.module}, {self.name}, {self.value!r})>'
 
+    @classmethod
+    def _load_all(cls):
+        # Global settings rarely change, so we keep them in memory across requests. Whenever
+        # they are modified, a new version is stored in the cache so all processes know that
+        # they need to reload them from the database.
+        global _shared_settings
+        if g.get('settings_modified'):
+            # the current transaction has uncommitted changes
+            return super()._load_all()
+        version = settings_cache.get('version')
+        if version is None:
+            settings_cache.add('version', uuid4().hex)
+            version = settings_cache.get('version')
+            if version is None:
+                # cache not available
+                return super()._load_all()
+        cached_version, settings = _shared_settings
+        if cached_version != version:
+            settings = super()._load_all()
+            _shared_settings = (version, settings)
+        # callers may modify the values they get, so they must not be shared
+        return deepcopy(settings)
+
+    @classmethod
+    def _clear_cache(cls):
+        super()._clear_cache()
+        if has_app_context():
+            g.settings_modified = True
+
+
+@signals.core.after_commit.connect
+def _settings_committed(sender, **kwargs):
+    if g.pop('settings_modified', False):
+        settings_cache.set('version', uuid4().hex)
+
 
 class SettingPrincipal(PrincipalSettingsBase, CoreSettingsMixin, db.Model):
     principal_backref_name = 'in_settings_acls'
@@ -12,7 +12,7 @@ from operator import attrgetter
 from flask import g, has_request_context
 
 from indico.core.settings.models.settings import Setting, SettingPrincipal
-from indico.core.settings.util import get_all_settings, get_setting, get_setting_acl
+from indico.core.settings.util import get_all_settings, get_setting, get_setting_acl, preload_settings
 
 
 class ACLProxyBase:
@@ -182,8 +182,8 @@ class ACLProxy(ACLProxyBase):
         :param name: Setting name
         :param user: A :class:`.User`
         """
-        from indico.util.user import iter_acl
-        return any(user in principal for principal in iter_acl(self.get(name)))
+        from indico.util.user import is_user_in_acl
+        return is_user_in_acl(self.get(name), user)
 
     def add_principal(self, name, principal):
         """Add a principal to an ACL.
@@ -234,6 +234,15 @@ class SettingsProxy(SettingsProxyBase):
         self._check_name(name)
         return get_setting(Setting, self, name, default, self._cache)
 
+    def preload(self):
+        """Load all settings of the module into the request cache.
+
+        The settings and ACLs of all modules are loaded with a single
+        query per table, so preloading multiple proxies does not cause
+        any additional queries.
+        """
+        preload_settings(Setting, SettingPrincipal, self, self._cache)
+
     def set(self, name, value):
         """Set a single setting.
 
@@ -10,9 +10,11 @@ from datetime import datetime, timedelta
 import pytest
 import pytz
 
+from indico.core import signals
 from indico.core.settings import PrefixSettingsProxy, SettingsProxy
 from indico.core.settings.converters import DatetimeConverter, TimedeltaConverter
-from indico.modules.events.settings import EventSettingsProxy
+from indico.core.settings.models.settings import Setting, settings_cache
+from indico.modules.events.settings import EventSettingsProxy, preload_event_settings
 from indico.modules.users import User
 
 
@@ -106,6 +108,28 @@ def test_proxy_cache_mutable():
     assert not proxy.get('foo')
 
 
+@pytest.mark.usefixtures('db')
+def test_proxy_shared_cache(count_queries):
+    proxy = SettingsProxy('test', {'foo': None, 'bar': []})
+    proxy.set_multi({'foo': 'test', 'bar': ['test']})
+    # uncommitted changes never use the shared cache
+    with count_queries() as cnt:
+        assert proxy.get('foo') == 'test'
+    assert cnt() == 1
+    signals.core.after_commit.send()
+    with count_queries() as cnt:
+        assert proxy.get('foo') == 'test'
+        assert proxy.get('foo') == 'test'
+        proxy.get('bar').append('changed')
+        assert proxy.get('bar') == ['test']
+    assert cnt() == 1
+    # changes from other processes are only visible once the version changes
+    Setting.query.filter_by(module='test', name='foo').update({Setting.value: 'changed'})
+    assert proxy.get('foo') == 'test'
+    settings_cache.set('version', 'other')
+    assert proxy.get('foo') == 'changed'
+
+
 @pytest.mark.usefixtures('db')
 def test_acls_invalid():
     user = User()
@@ -141,6 +165,26 @@ def test_acls(dummy_user, create_user):
     assert proxy.acls.get('acl') == {other_user}
 
 
+@pytest.mark.usefixtures('db', 'request_context')  # use req ctx so the cache is active
+def test_preload_event_settings(dummy_event, dummy_user, count_queries):
+    foo_proxy = EventSettingsProxy('foo', {'a': 1, 'b': 2}, acls={'acl', 'empty_acl'})
+    bar_proxy = EventSettingsProxy('bar', {'x': None})
+    foo_proxy.set(dummy_event, 'a', 11)
+    foo_proxy.acls.set(dummy_event, 'acl', {dummy_user})
+    bar_proxy.set(dummy_event, 'x', 'test')
+    with count_queries() as count:
+        preload_event_settings(dummy_event, foo_proxy)
+    assert count() == 2
+    with count_queries() as count:
+        assert foo_proxy.get(dummy_event, 'a') == 11
+        assert foo_proxy.get(dummy_event, 'b') == 2
+        assert foo_proxy.acls.get(dummy_event, 'acl') == {dummy_user}
+        assert foo_proxy.acls.get(dummy_event, 'empty_acl') == set()
+        assert bar_proxy.get(dummy_event, 'x') == 'test'
+        assert bar_proxy.get_all(dummy_event) == {'x': 'test'}
+    assert count() == 0
+
+
 def test_delete_propagate(mocker):
     Setting = mocker.patch('indico.core.settings.proxy.Setting')
     SettingPrincipal = mocker.patch('indico.core.settings.proxy.SettingPrincipal')
@@ -45,6 +45,15 @@ def get_all_settings(cls, acl_cls, proxy, no_defaults, **kwargs):
     return settings
 
 
+def preload_settings(cls, acl_cls, proxy, cache, **kwargs):
+    """Helper function for SettingsProxy.preload."""
+    _preload_settings(cls, proxy, cache, **kwargs)
+    if acl_cls and proxy.acl_names:
+        acls = acl_cls.get_all_acls(proxy.module, **kwargs)
+        for name in proxy.acl_names:
+            cache[_get_cache_key(proxy.acls, name, kwargs)] = acls[name]
+
+
 def get_setting(cls, proxy, name, default, cache, **kwargs):
     """Helper function for SettingsProxy.get."""
     from indico.core.settings import SettingsProxyBase
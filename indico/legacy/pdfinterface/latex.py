@@ -6,9 +6,15 @@
 # LICENSE file for more details.
 
 import codecs
+import fcntl
+import hashlib
 import os
+import shutil
 import subprocess
 import tempfile
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from io import BytesIO
 from operator import attrgetter
 from zipfile import ZipFile
@@ -31,6 +37,7 @@ from indico.modules.events.abstracts.settings import BOACorrespondingAuthorType,
 from indico.modules.events.contributions.util import sort_contribs
 from indico.modules.events.util import create_event_logo_tmp_file
 from indico.util import mdx_latex
+from indico.util.caching import memoize
 from indico.util.date_time import format_date, format_human_timedelta, format_time
 from indico.util.fs import chmod_umask
 from indico.util.i18n import _, ngettext
@@ -128,6 +135,74 @@ def _latex_escape(s, ignore_braces=False):
     return RawLatex(mdx_latex.latex_escape(s, ignore_braces=ignore_braces))
 
 
+#: The markdown converter of the document which is currently being rendered
+_markdown_converter = ContextVar('latex_markdown_converter')
+
+
+def _markdown(text):
+    return _markdown_converter.get()(text)
+
+
+@memoize
+def _get_latex_env():
+    template_dir = os.path.join(get_root_path('indico'), 'legacy/pdfinterface/latex_templates')
+    env = Environment(loader=FileSystemLoader(template_dir),
+                      autoescape=False,
+                      trim_blocks=True,
+                      keep_trailing_newline=True,
+                      auto_reload=config.DEBUG,
+                      extensions=[LatexEscapeExtension],
+                      undefined=StrictUndefined,
+                      block_start_string=r'\JINJA{', block_end_string='}',
+                      variable_start_string=r'\VAR{', variable_end_string='}',
+                      comment_start_string=r'\#{', comment_end_string='}')
+    env.filters['format_date'] = format_date
+    env.filters['format_time'] = format_time
+    env.filters['format_duration'] = lambda delta: format_human_timedelta(delta, 'minutes')
+    env.filters['latex'] = _latex_escape
+    env.filters['rawlatex'] = RawLatex
+    # the markdown converter depends on the directory of the document
+    # being generated, so it is set while rendering the template (it
+    # cannot be passed in the template context, since the macros using
+    # it are imported without context)
+    env.filters['markdown'] = _markdown
+    env.globals['_'] = _
+    env.globals['ngettext'] = ngettext
+    env.globals['session'] = session
+    return env
+
+
+@contextmanager
+def _latex_process_slot():
+    """Wait until a LaTeX process may be started on this machine.
+
+    The number of concurrent LaTeX processes is limited by the
+    `LATEX_MAX_PROCESSES` setting.  Each running process holds a lock
+    on one of the slot files in the temp dir, so the limit applies to
+    all Indico processes on the machine.
+    """
+    if not config.LATEX_MAX_PROCESSES:
+        yield
+        return
+    slot_dir = os.path.join(config.TEMP_DIR, 'latex-slots')
+    os.makedirs(slot_dir, exist_ok=True)
+    while True:
+        for slot in range(config.LATEX_MAX_PROCESSES):
+            fd = os.open(os.path.join(slot_dir, f'{slot}.lock'), os.O_CREAT | os.O_RDWR, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            try:
+                yield
+            finally:
+                # closing the file releases the lock
+                os.close(fd)
+            return
+        time.sleep(0.5)
+
+
 class LatexRunner:
     """Handle the PDF generation from a chosen LaTeX template."""
 
@@ -163,28 +238,31 @@ class LatexRunner:
                 raise
 
     def _render_template(self, template_name, kwargs):
-        template_dir = os.path.join(get_root_path('indico'), 'legacy/pdfinterface/latex_templates')
-        env = Environment(loader=FileSystemLoader(template_dir),
-                          autoescape=False,
-                          trim_blocks=True,
-                          keep_trailing_newline=True,
-                          auto_reload=config.DEBUG,
-                          extensions=[LatexEscapeExtension],
-                          undefined=StrictUndefined,
-                          block_start_string=r'\JINJA{', block_end_string='}',
-                          variable_start_string=r'\VAR{', variable_end_string='}',
-                          comment_start_string=r'\#{', comment_end_string='}')
-        env.filters['format_date'] = format_date
-        env.filters['format_time'] = format_time
-        env.filters['format_duration'] = lambda delta: format_human_timedelta(delta, 'minutes')
-        env.filters['latex'] = _latex_escape
-        env.filters['rawlatex'] = RawLatex
-        env.filters['markdown'] = kwargs.pop('markdown')
-        env.globals['_'] = _
-        env.globals['ngettext'] = ngettext
-        env.globals['session'] = session
-        template = env.get_or_select_template(template_name)
-        return template.render(font_dir='fonts/', **kwargs)
+        template = _get_latex_env().get_or_select_template(template_name)
+        token = _markdown_converter.set(kwargs.pop('markdown'))
+        try:
+            return template.render(font_dir='fonts/', **kwargs)
+        finally:
+            _markdown_converter.reset(token)
+
+    def _get_cache_path(self):
+        """Get the path where the PDF for the LaTeX source is cached.
+
+        The name of the file is a hash of the source file and all other
+        files in the source directory (e.g. images), so a PDF is only
+        reused if the output would be exactly the same.
+        """
+        checksum = hashlib.sha256()
+        checksum.update(pkg_resources.get_distribution('indico-fonts').version.encode())
+        checksum.update(b'toc' if self.has_toc else b'')
+        for dirpath, dirnames, files in sorted(os.walk(self.source_dir)):
+            for f in sorted(files):
+                path = os.path.join(dirpath, f)
+                checksum.update(os.path.relpath(path, self.source_dir).encode())
+                with open(path, 'rb') as fd:
+                    for chunk in iter(lambda: fd.read(65536), b''):
+                        checksum.update(chunk)
+        return os.path.join(config.CACHE_DIR, 'latex', f'{checksum.hexdigest()}.pdf')
 
     def prepare(self, template_name, **kwargs):
         chmod_umask(self.source_dir, execute=True)
@@ -204,12 +282,19 @@ class LatexRunner:
         if not config.LATEX_ENABLED:
             raise RuntimeError('LaTeX is not enabled')
         source_filename, target_filename = self.prepare(template_name, **kwargs)
+        cache_path = self._get_cache_path()
+        if os.path.exists(cache_path):
+            # update file mtime so it's not deleted during cache cleanup
+            os.utime(cache_path, None)
+            shutil.copy(cache_path, target_filename)
+            return target_filename
         log_filename = os.path.join(self.source_dir, 'output.log')
         log_file = open(log_filename, 'a+')
         try:
-            self.run_latex(source_filename, log_file)
-            if self.has_toc:
+            with _latex_process_slot():
                 self.run_latex(source_filename, log_file)
+                if self.has_toc:
+                    self.run_latex(source_filename, log_file)
         finally:
             log_file.close()
 
@@ -217,6 +302,10 @@ class LatexRunner:
                 # something went terribly wrong, no LaTeX file was produced
                 raise LaTeXRuntimeException(source_filename, log_filename)
 
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        shutil.copy(target_filename, tmp_path)
+        os.replace(tmp_path, cache_path)
         return target_filename
 
 
@@ -0,0 +1,46 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import pytest
+from jinja2 import ChoiceLoader, DictLoader
+
+from indico.legacy.pdfinterface.latex import (AbstractToPDF, ContribToPDF, LatexRunner, _get_latex_env,
+                                              _markdown_converter)
+
+
+pytest_plugins = 'indico.modules.events.abstracts.testing.fixtures'
+
+
+def test_markdown_in_imported_macro(tmp_path):
+    # macros are imported without context, but they still need to use the converter of the document
+    env = _get_latex_env()
+    env = env.overlay(loader=ChoiceLoader([DictLoader({'macros.tex': r'\JINJA{macro md(text)}\VAR{text|markdown}'
+                                                                     r'\JINJA{endmacro}'}),
+                                           env.loader]))
+    template = env.from_string(r"\JINJA{from 'macros.tex' import md}\VAR{md('*test*')|rawlatex}")
+    token = _markdown_converter.set(lambda text: f'md:{text}')
+    try:
+        assert template.render() == 'md:*test*'
+    finally:
+        _markdown_converter.reset(token)
+
+
+@pytest.mark.usefixtures('request_context')
+def test_render_contribution(dummy_contribution):
+    dummy_contribution.description = 'Some **important** text'
+    pdf = ContribToPDF(dummy_contribution)
+    source = LatexRunner(pdf.source_dir)._render_template('single_doc.tex', dict(pdf._args))
+    assert r'\textbf{important}' in source
+    assert _markdown_converter.get(None) is None
+
+
+@pytest.mark.usefixtures('request_context')
+def test_render_abstract(dummy_abstract):
+    dummy_abstract.description = 'Some **important** text'
+    pdf = AbstractToPDF(dummy_abstract)
+    source = LatexRunner(pdf.source_dir)._render_template('single_doc.tex', dict(pdf._args))
+    assert r'\textbf{important}' in source
@@ -0,0 +1,49 @@
+"""Add room occupancy table
+
+Revision ID: 8b832a3ce8a7
+Revises: 3dafee32ba7d
+Create Date: 2022-01-20 15:30:12.458120
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8b832a3ce8a7'
+down_revision = '3dafee32ba7d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'room_occupancy',
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False, index=True),
+        sa.Column('booked_time', sa.Integer(), nullable=False),
+        sa.Column('occurrence_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['room_id'], ['roombooking.rooms.id']),
+        sa.PrimaryKeyConstraint('room_id', 'date'),
+        schema='roombooking'
+    )
+    # Booked time within the working hours (08:30-12:30 and 13:30-17:30) of all valid occurrences
+    op.execute('''
+        INSERT INTO roombooking.room_occupancy (room_id, date, booked_time, occurrence_count)
+        SELECT
+            r.room_id,
+            ro.start_dt::date,
+            SUM(
+                GREATEST(0, EXTRACT(epoch FROM LEAST(ro.end_dt::time, '12:30') - GREATEST(ro.start_dt::time, '08:30'))) +
+                GREATEST(0, EXTRACT(epoch FROM LEAST(ro.end_dt::time, '17:30') - GREATEST(ro.start_dt::time, '13:30')))
+            )::int,
+            COUNT(*)
+        FROM roombooking.reservation_occurrences ro
+        JOIN roombooking.reservations r ON (r.id = ro.reservation_id)
+        WHERE ro.state = 2
+        GROUP BY r.room_id, ro.start_dt::date;
+    ''')
+
+
+def downgrade():
+    op.drop_table('room_occupancy', schema='roombooking')
@@ -0,0 +1,88 @@
+"""Add search documents table
+
+Revision ID: ddca38090092
+Revises: 8b832a3ce8a7
+Create Date: 2022-01-27 10:45:31.264512
+"""
+
+from enum import Enum
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from indico.core.db.sqlalchemy import PyIntEnum
+
+
+# revision identifiers, used by Alembic.
+revision = 'ddca38090092'
+down_revision = '8b832a3ce8a7'
+branch_labels = None
+depends_on = None
+
+
+class _SearchTarget(int, Enum):
+    category = 1
+    event = 2
+    contribution = 3
+    subcontribution = 4
+    event_note = 5
+    attachment = 6
+
+
+def _strip_tags(column):
+    return f"regexp_replace({column}, '<[^>]*>', ' ', 'g')"
+
+
+def _person_names(table, column):
+    return f'''
+        COALESCE((
+            SELECT string_agg(COALESCE(pl.first_name, p.first_name) || ' ' || COALESCE(pl.last_name, p.last_name), ' ')
+            FROM events.{table} pl
+            JOIN events.persons p ON (p.id = pl.person_id)
+            WHERE pl.{column} = x.id
+        ), '')
+    '''
+
+
+def upgrade():
+    op.create_table(
+        'search_documents',
+        sa.Column('object_type', PyIntEnum(_SearchTarget), nullable=False),
+        sa.Column('object_id', sa.Integer(), nullable=False, autoincrement=False),
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=False),
+        sa.Index(None, 'search_vector', postgresql_using='gin'),
+        sa.PrimaryKeyConstraint('object_type', 'object_id'),
+        schema='indico'
+    )
+    op.execute(f'''
+        INSERT INTO indico.search_documents (object_type, object_id, search_vector)
+        SELECT {_SearchTarget.event.value}, x.id,
+               setweight(to_tsvector('simple', x.title), 'A') ||
+               setweight(to_tsvector('simple', {_strip_tags('x.description')}), 'B') ||
+               setweight(to_tsvector('simple', {_person_names('event_person_links', 'event_id')}), 'B')
+        FROM events.events x;
+
+        INSERT INTO indico.search_documents (object_type, object_id, search_vector)
+        SELECT {_SearchTarget.contribution.value}, x.id,
+               setweight(to_tsvector('simple', x.title), 'A') ||
+               setweight(to_tsvector('simple', {_strip_tags('x.description')}), 'B') ||
+               setweight(to_tsvector('simple', {_person_names('contribution_person_links', 'contribution_id')}), 'B')
+        FROM events.contributions x;
+
+        INSERT INTO indico.search_documents (object_type, object_id, search_vector)
+        SELECT {_SearchTarget.attachment.value}, x.id,
+               setweight(to_tsvector('simple', x.title), 'A') ||
+               setweight(to_tsvector('simple', COALESCE(f.filename, '')), 'C')
+        FROM attachments.attachments x
+        LEFT JOIN attachments.files f ON (f.id = x.file_id);
+
+        INSERT INTO indico.search_documents (object_type, object_id, search_vector)
+        SELECT {_SearchTarget.event_note.value}, x.id,
+               setweight(to_tsvector('simple', {_strip_tags("COALESCE(x.html, '')")}), 'B')
+        FROM events.notes x;
+    ''')
+
+
+def downgrade():
+    op.drop_table('search_documents', schema='indico')
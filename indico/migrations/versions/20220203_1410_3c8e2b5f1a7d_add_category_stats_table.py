@@ -0,0 +1,76 @@
+"""Add category stats table
+
+Revision ID: 3c8e2b5f1a7d
+Revises: ddca38090092
+Create Date: 2022-02-03 14:10:42.185337
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8e2b5f1a7d'
+down_revision = 'ddca38090092'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'category_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True, index=True),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('created_event_count', sa.Integer(), nullable=False),
+        sa.Column('contribution_count', sa.Integer(), nullable=False),
+        sa.Column('attachment_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.categories.id']),
+        sa.PrimaryKeyConstraint('id'),
+        schema='categories'
+    )
+    op.create_index(None, 'category_stats', ['category_id', 'year'], unique=True, schema='categories',
+                    postgresql_where=sa.text('category_id IS NOT NULL'))
+    op.create_index(None, 'category_stats', ['year'], unique=True, schema='categories',
+                    postgresql_where=sa.text('category_id IS NULL'))
+    op.execute('''
+        INSERT INTO categories.category_stats (category_id, year, event_count, created_event_count,
+                                               contribution_count, attachment_count)
+        SELECT category_id, year, sum(events), sum(created_events), sum(contributions), sum(attachments)
+        FROM (
+            SELECT e.category_id, extract(year FROM e.start_dt)::int AS year,
+                   1 AS events, 0 AS created_events, 0 AS contributions, 0 AS attachments
+            FROM events.events e
+            WHERE NOT e.is_deleted
+            UNION ALL
+            SELECT e.category_id, extract(year FROM e.created_dt)::int, 0, 1, 0, 0
+            FROM events.events e
+            WHERE NOT e.is_deleted
+            UNION ALL
+            SELECT e.category_id, extract(year FROM tt.start_dt)::int, 0, 0, 1, 0
+            FROM events.timetable_entries tt
+            JOIN events.events e ON (e.id = tt.event_id)
+            WHERE tt.type = 2 AND NOT e.is_deleted
+            UNION ALL
+            SELECT e.category_id, extract(year FROM e.start_dt)::int, 0, 0, 0, 1
+            FROM attachments.attachments a
+            JOIN attachments.folders f ON (f.id = a.folder_id)
+            JOIN events.events e ON (e.id = f.event_id)
+            LEFT JOIN events.sessions s ON (s.id = f.session_id)
+            LEFT JOIN events.contributions c ON (c.id = f.contribution_id)
+            LEFT JOIN events.subcontributions sc ON (sc.id = f.subcontribution_id)
+            LEFT JOIN events.contributions scc ON (scc.id = sc.contribution_id)
+            WHERE f.link_type != 1 AND
+                  NOT a.is_deleted AND
+                  NOT f.is_deleted AND
+                  NOT e.is_deleted AND
+                  NOT COALESCE(s.is_deleted, c.is_deleted, sc.is_deleted, false) AND
+                  (scc.is_deleted IS NULL OR NOT scc.is_deleted)
+        ) x
+        GROUP BY category_id, year
+    ''')
+
+
+def downgrade():
+    op.drop_table('category_stats', schema='categories')
@@ -183,7 +183,7 @@ class AttachmentPackageMixin(AttachmentPackageGeneratorMixin):
     def _process(self):
         form = self._prepare_form()
         if form.validate_on_submit():
-            attachments = [attachment.id for attachment in self._filter_attachments(form.data)]
+            attachments = list(self._filter_attachments(form.data))
             if attachments:
                 task = generate_materials_package.delay(attachments, self.event)
                 return jsonify(task_id=task.id, success=True)
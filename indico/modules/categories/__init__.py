@@ -42,6 +42,60 @@ def _merge_users(target, source, **kwargs):
     CategoryPrincipal.merge_users(target, source, 'category')
 
 
+@signals.event.created.connect
+@signals.event.deleted.connect
+@signals.event.restored.connect
+@signals.event.imported.connect
+def _event_content_changed(event, **kwargs):
+    from indico.modules.categories.util import mark_category_stats_changed
+    mark_category_stats_changed(event.category)
+
+
+@signals.event.cloned.connect
+def _event_cloned(event, new_event, **kwargs):
+    _event_content_changed(new_event)
+
+
+@signals.event.updated.connect
+def _event_updated(event, changes, **kwargs):
+    if 'start_dt' in changes:
+        _event_content_changed(event)
+
+
+@signals.event.moved.connect
+def _event_moved(event, old_parent, **kwargs):
+    from indico.modules.categories.util import mark_category_stats_changed
+    mark_category_stats_changed(old_parent)
+    mark_category_stats_changed(event.category)
+
+
+@signals.event.times_changed.connect
+@signals.event.timetable_entry_created.connect
+@signals.event.timetable_entry_updated.connect
+@signals.event.timetable_entry_deleted.connect
+@signals.event.contribution_deleted.connect
+@signals.event.subcontribution_deleted.connect
+@signals.event.session_deleted.connect
+@signals.attachments.folder_deleted.connect
+def _event_object_changed(sender, obj=None, **kwargs):
+    # `times_changed` is sent with the type of the changed object as the sender
+    obj = obj if isinstance(sender, type) else sender
+    if event := obj.event:
+        _event_content_changed(event)
+
+
+@signals.attachments.attachment_created.connect
+@signals.attachments.attachment_deleted.connect
+def _attachment_changed(attachment, **kwargs):
+    _event_object_changed(attachment.folder)
+
+
+@signals.core.after_commit.connect
+def _update_category_stats(sender, **kwargs):
+    from indico.modules.categories.util import schedule_category_stats_update
+    schedule_category_stats_update()
+
+
 def _is_moderation_visible(category):
     return (
         category.event_creation_mode == EventCreationMode.moderated or
@@ -0,0 +1,67 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from indico.core.db import db
+from indico.util.string import format_repr
+
+
+class CategoryStats(db.Model):
+    """Yearly statistics of the events directly inside a category.
+
+    The statistics of a category including its subcategories are
+    obtained by summing up the rows of all categories in the subtree.
+    Unlisted events are counted in the rows without a category.
+    """
+
+    __tablename__ = 'category_stats'
+    __table_args__ = (db.Index(None, 'category_id', 'year', unique=True,
+                               postgresql_where=db.text('category_id IS NOT NULL')),
+                      db.Index(None, 'year', unique=True, postgresql_where=db.text('category_id IS NULL')),
+                      {'schema': 'categories'})
+
+    id = db.Column(
+        db.Integer,
+        primary_key=True
+    )
+    #: The ID of the category, ``None`` for unlisted events
+    category_id = db.Column(
+        db.ForeignKey('categories.categories.id'),
+        nullable=True,
+        index=True
+    )
+    #: The year the statistics are for
+    year = db.Column(
+        db.Integer,
+        nullable=False
+    )
+    #: The number of events starting in that year
+    event_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+    #: The number of events created in that year
+    created_event_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+    #: The number of contributions scheduled in that year
+    contribution_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+    #: The number of attachments in events starting in that year
+    attachment_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+
+    def __repr__(self):
+        return format_repr(self, 'id', 'category_id', 'year')
@@ -14,6 +14,7 @@ from sqlalchemy.orm import joinedload, load_only, subqueryload, undefer
 from indico.modules.categories import Category
 from indico.modules.events import Event
 from indico.modules.events.ical import events_to_ical
+from indico.modules.events.util import get_accessible_event_ids
 from indico.util.string import sanitize_html
 
 
@@ -78,7 +79,9 @@ def serialize_category_atom(category, url, user, event_filter):
                                 'access_key'),
                       subqueryload('acl_entries'))
              .order_by(Event.start_dt))
-    events = [e for e in query if e.can_access(user)]
+    events = query.all()
+    accessible_ids = get_accessible_event_ids(events, user)
+    events = [e for e in events if e.id in accessible_ids]
 
     feed = FeedGenerator()
     feed.id(url)
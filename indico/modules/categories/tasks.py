@@ -13,6 +13,7 @@ from indico.core.celery import celery
 from indico.core.config import config
 from indico.core.db import db
 from indico.modules.categories import Category, logger
+from indico.modules.categories.util import update_category_stats
 from indico.modules.users import User, UserSetting
 from indico.modules.users.models.suggestions import SuggestedCategory
 from indico.modules.users.util import get_related_categories
@@ -73,3 +74,9 @@ def category_cleanup():
             if i % 100 == 0:
                 db.session.commit()
         db.session.commit()
+
+
+@celery.task(name='refresh_category_stats')
+def refresh_category_stats(category_ids):
+    update_category_stats(category_ids)
+    db.session.commit()
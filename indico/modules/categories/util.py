@@ -5,9 +5,12 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+from collections import defaultdict
 from datetime import date, timedelta
 
+from flask import g
 from pytz import timezone
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import load_only
 from sqlalchemy.orm.attributes import set_committed_value
 
@@ -17,7 +20,8 @@ from indico.core.db.sqlalchemy.links import LinkType
 from indico.core.db.sqlalchemy.protection import ProtectionMode
 from indico.modules.attachments import Attachment
 from indico.modules.attachments.models.folders import AttachmentFolder
-from indico.modules.categories import upcoming_events_settings
+from indico.modules.categories import Category, upcoming_events_settings
+from indico.modules.categories.models.stats import CategoryStats
 from indico.modules.events import Event
 from indico.modules.events.contributions import Contribution
 from indico.modules.events.contributions.models.subcontributions import SubContribution
@@ -30,101 +34,157 @@ from indico.util.i18n import _, ngettext
 from indico.util.iterables import materialize_iterable
 
 
-def get_events_by_year(category_id=None):
-    """Get the number of events for each year.
+def _get_events_by_year(category_id):
+    return (db.session
+            .query(db.cast(db.extract('year', Event.start_dt), db.Integer).label('year'),
+                   db.func.count())
+            .filter(~Event.is_deleted,
+                    Event.category_id == category_id)
+            .group_by('year'))
 
-    :param category_id: The category ID to get statistics for. Events
-                        from subcategories are also included.
-    :return: A dictionary mapping years to event counts.
-    """
-    category_filter = Event.category_chain_overlaps(category_id) if category_id else True
-    query = (db.session
-             .query(db.cast(db.extract('year', Event.start_dt), db.Integer).label('year'),
-                    db.func.count())
-             .filter(~Event.is_deleted,
-                     category_filter)
-             .order_by('year')
-             .group_by('year'))
-    return dict(query)
 
+def _get_created_events_by_year(category_id):
+    return (db.session
+            .query(db.cast(db.extract('year', Event.created_dt), db.Integer).label('year'),
+                   db.func.count())
+            .filter(~Event.is_deleted,
+                    Event.category_id == category_id)
+            .group_by('year'))
 
-def get_contribs_by_year(category_id=None):
-    """Get the number of contributions for each year.
 
-    :param category_id: The category ID to get statistics for.
-                        Contributions from subcategories are also
-                        included.
-    :return: A dictionary mapping years to contribution counts.
+def _get_contribs_by_year(category_id):
+    return (db.session
+            .query(db.cast(db.extract('year', TimetableEntry.start_dt), db.Integer).label('year'),
+                   db.func.count())
+            .join(TimetableEntry.event)
+            .filter(TimetableEntry.type == TimetableEntryType.CONTRIBUTION,
+                    ~Event.is_deleted,
+                    Event.category_id == category_id)
+            .group_by('year'))
+
+
+def _get_attachments_by_year(category_id):
+    subcontrib_contrib = db.aliased(Contribution)
+    return (db.session
+            .query(db.cast(db.extract('year', Event.start_dt), db.Integer).label('year'),
+                   db.func.count(Attachment.id))
+            .join(Attachment.folder)
+            .join(AttachmentFolder.event)
+            .outerjoin(AttachmentFolder.session)
+            .outerjoin(AttachmentFolder.contribution)
+            .outerjoin(AttachmentFolder.subcontribution)
+            .outerjoin(subcontrib_contrib, subcontrib_contrib.id == SubContribution.contribution_id)
+            .filter(AttachmentFolder.link_type != LinkType.category,
+                    ~Attachment.is_deleted,
+                    ~AttachmentFolder.is_deleted,
+                    ~Event.is_deleted,
+                    # we have exactly one of those or none if the attachment is on the event itself
+                    ~db.func.coalesce(Session.is_deleted, Contribution.is_deleted, SubContribution.is_deleted, False),
+                    # in case of a subcontribution we also need to check that the contrib is not deleted
+                    (subcontrib_contrib.is_deleted.is_(None) | ~subcontrib_contrib.is_deleted),
+                    Event.category_id == category_id)
+            .group_by('year'))
+
+
+def mark_category_stats_changed(category):
+    """Mark the statistics of a category as outdated.
+
+    The statistics are recalculated in the background once the current
+    transaction has been committed.
+
+    :param category: The :class:`.Category` containing an event whose
+                     content changed, or ``None`` for unlisted events
     """
-    category_filter = Event.category_chain_overlaps(category_id) if category_id else True
-    query = (db.session
-             .query(db.cast(db.extract('year', TimetableEntry.start_dt), db.Integer).label('year'),
-                    db.func.count())
-             .join(TimetableEntry.event)
-             .filter(TimetableEntry.type == TimetableEntryType.CONTRIBUTION,
-                     ~Event.is_deleted,
-                     category_filter)
-             .order_by('year')
-             .group_by('year'))
-    return dict(query)
+    g.setdefault('changed_stats_category_ids', set()).add(category.id if category else None)
 
 
-def get_min_year(category_id=None):
-    """Get the min year.
+def schedule_category_stats_update():
+    """Update the statistics of all categories marked as outdated.
 
-    :param category_id: The category ID to get statistics for.
-    :return: The year.
+    This is called after each commit.
     """
-    category_filter = Event.category_chain_overlaps(category_id) if category_id else True
-    min_dt = db.session.query(db.func.min(Event.created_dt)).filter(~Event.is_deleted, category_filter).scalar()
-    return min_dt.year if min_dt else date.today().year
+    from indico.modules.categories.tasks import refresh_category_stats
+    if 'changed_stats_category_ids' in g:
+        refresh_category_stats.delay(list(g.pop('changed_stats_category_ids')))
 
 
-def get_attachment_count(category_id=None):
-    """Get the number of attachments in events in a category.
+def update_category_stats(category_ids):
+    """Recalculate the statistics of the events directly in categories.
 
-    :param category_id: The category ID to get statistics for.
-                        Attachments from subcategories are also
-                        included.
-    :return: The number of attachments
+    Only the events directly inside the categories are counted, so
+    this is fast even for categories with large subtrees; the
+    statistics of the subcategories are added when reading them in
+    :func:`get_category_stats`.
+
+    :param category_ids: The IDs of the categories to update; ``None``
+                         refers to unlisted events.
     """
-    category_filter = Event.category_chain_overlaps(category_id) if category_id else True
-    subcontrib_contrib = db.aliased(Contribution)
-    query = (db.session
-             .query(db.func.count(Attachment.id))
-             .join(Attachment.folder)
-             .join(AttachmentFolder.event)
-             .outerjoin(AttachmentFolder.session)
-             .outerjoin(AttachmentFolder.contribution)
-             .outerjoin(AttachmentFolder.subcontribution)
-             .outerjoin(subcontrib_contrib, subcontrib_contrib.id == SubContribution.contribution_id)
-             .filter(AttachmentFolder.link_type != LinkType.category,
-                     ~Attachment.is_deleted,
-                     ~AttachmentFolder.is_deleted,
-                     ~Event.is_deleted,
-                     # we have exactly one of those or none if the attachment is on the event itself
-                     ~db.func.coalesce(Session.is_deleted, Contribution.is_deleted, SubContribution.is_deleted, False),
-                     # in case of a subcontribution we also need to check that the contrib is not deleted
-                     (subcontrib_contrib.is_deleted.is_(None) | ~subcontrib_contrib.is_deleted),
-                     category_filter))
-    return query.scalar()
-
-
-@memoize_redis(86400)
+    columns = {'event_count': _get_events_by_year,
+               'created_event_count': _get_created_events_by_year,
+               'contribution_count': _get_contribs_by_year,
+               'attachment_count': _get_attachments_by_year}
+    for category_id in category_ids:
+        stats = defaultdict(lambda: dict.fromkeys(columns, 0))
+        for column, query_func in columns.items():
+            for year, count in query_func(category_id):
+                stats[year][column] = count
+        (CategoryStats.query
+         .filter(CategoryStats.category_id == category_id, CategoryStats.year.notin_(list(stats)))
+         .delete(synchronize_session=False))
+        if not stats:
+            continue
+        # the same category may be updated concurrently by another task, so we cannot
+        # simply delete and re-insert the rows without violating the unique indexes
+        stmt = insert(CategoryStats.__table__).values([{'category_id': category_id, 'year': year, **counts}
+                                                       for year, counts in stats.items()])
+        if category_id is None:
+            conflict_target = {'index_elements': [CategoryStats.year],
+                               'index_where': CategoryStats.category_id.is_(None)}
+        else:
+            conflict_target = {'index_elements': [CategoryStats.category_id, CategoryStats.year],
+                               'index_where': CategoryStats.category_id.isnot(None)}
+        db.session.execute(stmt.on_conflict_do_update(**conflict_target,
+                                                      set_={column: stmt.excluded[column] for column in columns}))
+
+
 def get_category_stats(category_id=None):
     """Get category statistics.
 
-    This function is mainly a helper so we can get and cache
-    all values at once and keep a last-update timestamp.
+    The statistics are updated whenever the content of an event
+    changes, so getting them is cheap even for large categories.
 
     :param category_id: The category ID to get statistics for.
                         Subcategories are also included.
     """
-    return {'events_by_year': get_events_by_year(category_id),
-            'contribs_by_year': get_contribs_by_year(category_id),
-            'attachments': get_attachment_count(category_id),
+    query = (db.session
+             .query(CategoryStats.year,
+                    db.func.sum(CategoryStats.event_count),
+                    db.func.sum(CategoryStats.created_event_count),
+                    db.func.sum(CategoryStats.contribution_count),
+                    db.func.sum(CategoryStats.attachment_count))
+             .group_by(CategoryStats.year)
+             .order_by(CategoryStats.year))
+    if category_id:
+        cte = Category.get_tree_cte()
+        query = (query.join(cte, cte.c.id == CategoryStats.category_id)
+                 .filter(cte.c.path.overlap([category_id])))
+    events_by_year = {}
+    contribs_by_year = {}
+    created_years = []
+    attachments = 0
+    for year, event_count, created_event_count, contribution_count, attachment_count in query:
+        if event_count:
+            events_by_year[year] = event_count
+        if contribution_count:
+            contribs_by_year[year] = contribution_count
+        if created_event_count:
+            created_years.append(year)
+        attachments += attachment_count
+    return {'events_by_year': events_by_year,
+            'contribs_by_year': contribs_by_year,
+            'attachments': attachments,
             'updated': now_utc(),
-            'min_year': get_min_year(category_id)}
+            'min_year': min(created_years) if created_years else date.today().year}
 
 
 @memoize_redis(3600)
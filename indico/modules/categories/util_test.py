@@ -5,9 +5,17 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+from datetime import date, datetime
+
 import pytest
+from pytz import utc
 
-from indico.modules.categories.util import can_create_unlisted_events
+from indico.core import signals
+from indico.modules.attachments.models.attachments import Attachment, AttachmentType
+from indico.modules.attachments.models.folders import AttachmentFolder
+from indico.modules.categories.models.stats import CategoryStats
+from indico.modules.categories.util import (can_create_unlisted_events, get_category_stats, mark_category_stats_changed,
+                                            update_category_stats)
 from indico.modules.events.settings import unlisted_events_settings
 
 
@@ -26,3 +34,66 @@ def test_can_create_unlisted_events(dummy_user, create_user):
     unlisted_events_settings.acls.set('authorized_creators', {dummy_user})
     assert can_create_unlisted_events(dummy_user)
     assert can_create_unlisted_events(admin_user)
+
+
+def test_category_stats(db, dummy_user, create_category, create_event, mocker):
+    delay = mocker.patch('indico.modules.categories.tasks.refresh_category_stats.delay')
+    parent = create_category(title='Parent')
+    child = create_category(title='Child', parent=parent)
+    db.session.flush()
+    create_event(category=parent, start_dt=datetime(2019, 5, 1, tzinfo=utc), end_dt=datetime(2019, 5, 2, tzinfo=utc))
+    event = create_event(category=child, start_dt=datetime(2021, 5, 1, tzinfo=utc),
+                         end_dt=datetime(2021, 5, 2, tzinfo=utc))
+    create_event(category=child, is_deleted=True)
+    Attachment(folder=AttachmentFolder.get_or_create_default(event), user=dummy_user, title='Slides',
+               type=AttachmentType.link, link_url='https://example.com')
+    db.session.flush()
+
+    # statistics are only updated in the background after committing
+    mark_category_stats_changed(child)
+    mark_category_stats_changed(parent)
+    signals.core.after_commit.send()
+    assert set(delay.call_args.args[0]) == {parent.id, child.id}
+    assert get_category_stats(parent.id)['events_by_year'] == {}
+
+    update_category_stats([parent.id, child.id])
+    stats = get_category_stats(parent.id)
+    assert stats['events_by_year'] == {2019: 1, 2021: 1}
+    assert stats['attachments'] == 1
+    assert stats['min_year'] == date.today().year
+    stats = get_category_stats(child.id)
+    assert stats['events_by_year'] == {2021: 1}
+    assert stats['attachments'] == 1
+
+    # moving an event only requires updating the two affected categories
+    event.category = parent
+    update_category_stats([parent.id, child.id])
+    assert get_category_stats(child.id)['events_by_year'] == {}
+    assert get_category_stats(parent.id)['events_by_year'] == {2019: 1, 2021: 1}
+
+
+def test_category_stats_update_existing(db, create_category, create_event):
+    category = create_category(title='Category')
+    db.session.flush()
+    for year in (2019, 2020):
+        create_event(category=category, start_dt=datetime(year, 5, 1, tzinfo=utc),
+                     end_dt=datetime(year, 5, 2, tzinfo=utc))
+    unlisted_event = create_event(category=None, start_dt=datetime(2020, 5, 1, tzinfo=utc),
+                                  end_dt=datetime(2020, 5, 2, tzinfo=utc))
+    update_category_stats([category.id, None])
+    rows = {row.year: row.id for row in CategoryStats.query.filter_by(category_id=category.id)}
+    assert rows.keys() == {2019, 2020}
+    assert CategoryStats.query.filter_by(category_id=None).one().event_count == 1
+
+    # existing rows are updated in place and the ones for years without events are removed
+    create_event(category=category, start_dt=datetime(2020, 6, 1, tzinfo=utc),
+                 end_dt=datetime(2020, 6, 2, tzinfo=utc))
+    unlisted_event.is_deleted = True
+    update_category_stats([category.id, None])
+    update_category_stats([category.id, None])
+    db.session.expire_all()
+    assert {(row.year, row.id, row.event_count) for row in CategoryStats.query.filter_by(category_id=category.id)} == {
+        (2019, rows[2019], 1),
+        (2020, rows[2020], 2),
+    }
+    assert not CategoryStats.query.filter_by(category_id=None).has_rows()
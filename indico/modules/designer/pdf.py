@@ -64,6 +64,7 @@ class DesignerPDFBase:
         if self.config.page_orientation == PageOrientation.landscape:
             self.page_size = pagesizes.landscape(self.page_size)
         self.width, self.height = self.page_size
+        self._background_forms = {}
         setTTFonts()
 
     def _process_tpl_data(self, tpl_data):
@@ -88,6 +89,8 @@ class DesignerPDFBase:
     def get_pdf(self):
         data = BytesIO()
         canvas = Canvas(data, pagesize=self.page_size)
+        # forms can only be used in the PDF they were added to
+        self._background_forms = {}
         self._build_pdf(canvas)
         canvas.save()
         data.seek(0)
@@ -145,6 +148,28 @@ class DesignerPDFBase:
                 p.drawOn(canvas, margin_x + item_x, self.height - margin_y - item_y - h)
                 item_y += h
 
+    def _draw_template_background(self, canvas, template, tpl_data, pos_x, pos_y, width, height):
+        """Draw the background image of a template.
+
+        The image is only decoded and embedded in the PDF the first time
+        it is drawn.  It is stored as a form XObject which is referenced
+        whenever the same background is drawn again, e.g. on every badge.
+        """
+        key = (template.id, width, height)
+        name = self._background_forms.get(key)
+        if name is None:
+            name = f'Background{len(self._background_forms)}'
+            with template.background_image.open() as f:
+                img_reader = ImageReader(self._remove_transparency(f))
+                canvas.beginForm(name, upperx=width, uppery=height)
+                self._draw_background(canvas, img_reader, tpl_data, 0, 0, width, height)
+                canvas.endForm()
+            self._background_forms[key] = name
+        canvas.saveState()
+        canvas.translate(pos_x, pos_y)
+        canvas.doForm(name)
+        canvas.restoreState()
+
     def _draw_background(self, canvas, img_reader, tpl_data, pos_x, pos_y, width, height):
         img_width, img_height = img_reader.getSize()
 
@@ -44,6 +44,11 @@ def _clear_boa_cache(sender, obj=None, **kwargs):
     clear_boa_cache(event)
 
 
+@signals.core.import_tasks.connect
+def _import_tasks(sender, **kwargs):
+    import indico.modules.events.abstracts.tasks  # noqa: F401
+
+
 @signals.menu.items.connect_via('event-management-sidemenu')
 def _extend_event_management_menu(sender, event, **kwargs):
     if not event.can_manage(session.user, permission='abstracts') or not AbstractsFeature.is_allowed_for_event(event):
@@ -7,21 +7,25 @@
 
 import os
 
-from flask import flash, request, session
+from flask import flash, redirect, request, session
 from werkzeug.exceptions import NotFound
 
+from indico.core.celery import AsyncResult
 from indico.core.config import config
 from indico.modules.events.abstracts.controllers.base import RHAbstractsBase, RHManageAbstractsBase
 from indico.modules.events.abstracts.forms import BOASettingsForm
 from indico.modules.events.abstracts.settings import boa_settings
-from indico.modules.events.abstracts.util import clear_boa_cache, create_boa, create_boa_tex
+from indico.modules.events.abstracts.tasks import generate_boa
+from indico.modules.events.abstracts.util import boa_build_cache, clear_boa_cache, create_boa_tex, get_cached_boa
+from indico.modules.events.abstracts.views import WPDisplayBOA
 from indico.modules.events.contributions import contribution_settings
+from indico.modules.events.controllers.base import PDFBuildStatusMixin
 from indico.modules.files.controllers import UploadFileMixin
 from indico.modules.logs.models.entries import EventLogRealm, LogKind
 from indico.util.i18n import _
 from indico.util.marshmallow import FileField, file_extension
 from indico.web.args import use_kwargs
-from indico.web.flask.util import send_file
+from indico.web.flask.util import send_file, url_for
 from indico.web.forms.base import FormDefaults
 from indico.web.util import jsonify_data, jsonify_form
 
@@ -92,13 +96,34 @@ class RHExportBOA(RHAbstractsBase):
             config.LATEX_ENABLED and
             self.event.can_manage(session.user, permission='abstracts')
         ):
-            return send_file('book-of-abstracts.pdf', create_boa(self.event), 'application/pdf')
+            return self._send_generated_boa()
         if self.event.has_custom_boa:
             return self.event.custom_boa.send()
         elif config.LATEX_ENABLED:
-            return send_file('book-of-abstracts.pdf', create_boa(self.event), 'application/pdf')
+            return self._send_generated_boa()
         raise NotFound
 
+    def _send_generated_boa(self):
+        path = get_cached_boa(self.event)
+        if path:
+            return send_file('book-of-abstracts.pdf', path, 'application/pdf')
+        # the book is built in the background. if someone else already
+        # requested it, we simply wait for that build to finish
+        task_id = boa_build_cache.get(self.event.id)
+        if task_id is None or AsyncResult(task_id).failed():
+            task_id = generate_boa.delay(self.event, session.user).id
+            boa_build_cache.set(self.event.id, task_id, timeout=3600)
+        return redirect(url_for('.export_boa_status', self.event, task_id=task_id))
+
+
+class RHExportBOAStatus(PDFBuildStatusMixin, RHExportBOA):
+    """Wait for the book of abstracts to be generated."""
+
+    wp = WPDisplayBOA
+
+    def _get_waiting_message(self):
+        return _('The Book of Abstracts is being generated.')
+
 
 class RHExportBOATeX(RHManageAbstractsBase):
     """Export a zip file with the book of abstracts in TeX format."""
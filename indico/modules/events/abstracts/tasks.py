@@ -0,0 +1,28 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from flask import session
+
+from indico.core.celery import celery
+from indico.core.db import db
+from indico.modules.events.abstracts.util import create_boa
+from indico.modules.files.models.files import File
+
+
+@celery.task(ignore_result=False, request_context=True)
+def generate_boa(event, user):
+    """Generate the book of abstracts and store it as a file.
+
+    :return: The URL from which the PDF can be downloaded.
+    """
+    session.set_session_user(user)
+    f = File(filename='book-of-abstracts.pdf', content_type='application/pdf', meta={'event_id': event.id})
+    with open(create_boa(event), 'rb') as pdf:
+        f.save(('event', event.id, 'boa-build'), pdf)
+    db.session.add(f)
+    db.session.commit()
+    return f.signed_download_url
@@ -12,6 +12,7 @@ from collections import defaultdict, namedtuple
 
 from sqlalchemy.orm import contains_eager, joinedload, load_only, noload
 
+from indico.core.cache import make_scoped_cache
 from indico.core.config import config
 from indico.core.db import db
 from indico.core.db.sqlalchemy.util.session import no_autoflush
@@ -31,6 +32,9 @@ from indico.util.spreadsheets import unique_col
 from indico.web.flask.templating import get_template_module
 
 
+boa_build_cache = make_scoped_cache('boa-build')
+
+
 def build_default_email_template(event, tpl_type):
     """
     Build a default e-mail template based on a notification type
@@ -277,18 +281,31 @@ def get_track_reviewer_abstract_counts(event, user):
             for track, total, reviewed, unreviewed in query}
 
 
+def get_cached_boa(event):
+    """Get the cached book of abstracts.
+
+    :return: The path to the PDF file or ``None`` if it has not been
+             generated yet.
+    """
+    path = boa_settings.get(event, 'cache_path')
+    if not path:
+        return None
+    path = os.path.join(config.CACHE_DIR, path)
+    if not os.path.exists(path):
+        return None
+    # update file mtime so it's not deleted during cache cleanup
+    os.utime(path, None)
+    return path
+
+
 def create_boa(event):
     """Create the book of abstracts if necessary.
 
     :return: The path to the PDF file
     """
-    path = boa_settings.get(event, 'cache_path')
+    path = get_cached_boa(event)
     if path:
-        path = os.path.join(config.CACHE_DIR, path)
-        if os.path.exists(path):
-            # update file mtime so it's not deleted during cache cleanup
-            os.utime(path, None)
-            return path
+        return path
     pdf = AbstractBook(event)
     tmp_path = pdf.generate()
     filename = f'boa-{event.id}.pdf'
@@ -309,6 +326,7 @@ def create_boa_tex(event):
 
 def clear_boa_cache(event):
     """Delete the cached book of abstract."""
+    boa_build_cache.delete(event.id)
     path = boa_settings.get(event, 'cache_path')
     if path:
         try:
@@ -40,6 +40,10 @@ class WPDisplayAbstractsReviewing(WPDisplayAbstracts):
     bundles = ('module_events.management.js',)
 
 
+class WPDisplayBOA(WPDisplayAbstractsBase):
+    menu_entry_name = 'abstracts_book'
+
+
 def render_abstract_page(abstract, view_class=None, management=False):
     from indico.modules.events.abstracts.forms import (AbstractCommentForm, AbstractJudgmentForm,
                                                        AbstractReviewedForTracksForm, build_review_form)
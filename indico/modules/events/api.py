@@ -33,8 +33,10 @@ from indico.modules.events.notes.util import build_note_api_data, build_note_leg
 from indico.modules.events.sessions.models.sessions import Session
 from indico.modules.events.timetable.legacy import TimetableSerializer
 from indico.modules.events.timetable.models.entries import TimetableEntry
+from indico.modules.events.util import get_accessible_event_ids
 from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
 from indico.util.date_time import iterdays
+from indico.util.iterables import grouper
 from indico.util.signals import values_from_signal
 from indico.web.flask.util import send_file, url_for
 from indico.web.http_api.hooks.base import HTTPAPIHook, IteratedDataFetcher
@@ -98,6 +100,8 @@ class CategoryEventHook(HTTPAPIHook):
     TYPES = ('event', 'categ')
     RE = r'(?P<idlist>\w+(?:-\w+)*)'
     DEFAULT_DETAIL = 'events'
+    STREAMING = True
+    STREAM_EXTRA_KEYS = ('categoryId',)
     MAX_RECORDS = {
         'events': 1000,
         'contributions': 500,
@@ -414,8 +418,12 @@ class SerializerBase:
 
 
 class CategoryEventFetcher(IteratedDataFetcher, SerializerBase):
+    #: number of events loaded at once when streaming the results
+    STREAM_BATCH_SIZE = 100
+
     def __init__(self, user, hook):
         super().__init__(user, hook)
+        self._stream = hook._stream
         self._eventType = hook._eventType
         self._occurrences = hook._occurrences
         self._location = hook._location
@@ -477,10 +485,9 @@ class CategoryEventFetcher(IteratedDataFetcher, SerializerBase):
             query = (Event.query
                      .filter(~Event.is_deleted,
                              Event.category_chain_overlaps(idlist),
-                             Event.happens_between(self._fromDT, self._toDT))
-                     .options(*self._get_query_options(self._detail_level)))
+                             Event.happens_between(self._fromDT, self._toDT)))
         query = self._update_query(query)
-        return self.serialize_events(x for x in query if self._filter_event(x) and x.can_access(self.user))
+        return self._serialize_query(query)
 
     def category_extra(self, ids):
         if self._toDT is None:
@@ -501,10 +508,34 @@ class CategoryEventFetcher(IteratedDataFetcher, SerializerBase):
         query = (Event.query
                  .filter(Event.id.in_(idlist),
                          ~Event.is_deleted,
-                         Event.happens_between(self._fromDT, self._toDT))
-                 .options(*self._get_query_options(self._detail_level)))
+                         Event.happens_between(self._fromDT, self._toDT)))
         query = self._update_query(query)
-        return self.serialize_events(x for x in query if self._filter_event(x) and x.can_access(self.user))
+        return self._serialize_query(query)
+
+    def _serialize_query(self, query):
+        if self._stream:
+            return self._iter_serialized_events(query)
+        events = [x for x in query.options(*self._get_query_options(self._detail_level)) if self._filter_event(x)]
+        accessible_ids = get_accessible_event_ids(events, self.user)
+        return self.serialize_events(x for x in events if x.id in accessible_ids)
+
+    def _iter_serialized_events(self, query):
+        """Serialize the events of a query while loading them in batches.
+
+        Only the ids of all events are loaded at once; the events themselves
+        (including any eager-loaded data needed for the requested detail
+        level) are loaded in small batches so the whole result never needs
+        to be kept in memory.
+        """
+        options = self._get_query_options(self._detail_level)
+        event_ids = [id_ for id_, in query.with_entities(Event.id)]
+        for batch_ids in grouper(event_ids, self.STREAM_BATCH_SIZE, skip_missing=True):
+            events = {e.id: e for e in Event.query.filter(Event.id.in_(batch_ids)).options(*options)}
+            events = [events[id_] for id_ in batch_ids if self._filter_event(events[id_])]
+            accessible_ids = get_accessible_event_ids(events, self.user)
+            for event in events:
+                if event.id in accessible_ids:
+                    yield self._build_event_api_data(event)
 
     def _filter_event(self, event):
         if self._room or self._location or self._eventType:
@@ -35,6 +35,11 @@ def _extend_event_management_menu(sender, event, **kwargs):
                             section='organization')
 
 
+@signals.core.import_tasks.connect
+def _import_tasks(sender, **kwargs):
+    import indico.modules.events.contributions.tasks  # noqa: F401
+
+
 @signals.users.merged.connect
 def _merge_users(target, source, **kwargs):
     from indico.modules.events.contributions.models.principals import ContributionPrincipal
@@ -41,6 +41,8 @@ _bp.add_url_rule('/manage/contributions/contributions.zip', 'contributions_tex_e
 # LaTeX-based exports
 _bp.add_url_rule('/manage/contributions/tex-export/<uuid>', 'contributions_tex_export_book',
                  management.RHContributionsExportTeXBook)
+_bp.add_url_rule('/manage/contributions/tex-export/status/<task_id>', 'contributions_tex_export_status',
+                 management.RHContributionsExportTeXBookStatus)
 _bp.add_url_rule('/manage/contributions/tex-export-dialog', 'contributions_tex_export_dialog',
                  management.RHContributionExportTexConfig, methods=('POST',))
 
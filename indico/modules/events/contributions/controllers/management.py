@@ -42,6 +42,7 @@ from indico.modules.events.contributions.util import (contribution_type_row, gen
                                                       get_boa_export_formats, import_contributions_from_csv,
                                                       make_contribution_form)
 from indico.modules.events.contributions.views import WPManageContributions
+from indico.modules.events.controllers.base import PDFBuildStatusMixin
 from indico.modules.events.management.controllers import RHManageEventBase
 from indico.modules.events.management.controllers.base import RHContributionPersonListMixin
 from indico.modules.events.management.util import flash_if_unregistered
@@ -537,6 +538,13 @@ class RHContributionsExportTeXBook(RHManageContributionsExportActionsBase):
         return func(self.event, contribs, sort_by, ContributionBook)
 
 
+class RHContributionsExportTeXBookStatus(PDFBuildStatusMixin, RHManageContributionsBase):
+    """Wait for the PDF of a LaTeX export to be generated."""
+
+    ALLOW_LOCKED = True
+    wp = WPManageContributions
+
+
 class RHContributionsImportCSV(RHManageContributionsBase):
     """Import contributions from a CSV file."""
 
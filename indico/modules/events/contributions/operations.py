@@ -185,6 +185,7 @@ def create_contribution_from_abstract(abstract, contrib_session=None):
                                   custom_fields_data=custom_fields_data)
     if abstracts_settings.get(event, 'copy_attachments') and abstract.files:
         folder = AttachmentFolder.get_or_create_default(contrib)
+        attachments = []
         for abstract_file in abstract.files:
             attachment = Attachment(user=abstract.submitter, type=AttachmentType.file, folder=folder,
                                     title=abstract_file.filename)
@@ -192,5 +193,9 @@ def create_contribution_from_abstract(abstract, contrib_session=None):
                                              content_type=abstract_file.content_type)
             with abstract_file.open() as fd:
                 attachment.file.save(fd)
+            attachments.append(attachment)
+        db.session.flush()
+        for attachment in attachments:
+            signals.attachments.attachment_created.send(attachment, user=abstract.submitter)
     db.session.flush()
     return contrib
@@ -0,0 +1,29 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from flask import session
+
+from indico.core.celery import celery
+from indico.core.db import db
+from indico.modules.files.models.files import File
+
+
+@celery.task(ignore_result=False, request_context=True)
+def generate_contribution_book(event, user, contribs, sort_by, cls):
+    """Generate a PDF containing the given contributions and store it as a file.
+
+    :param cls: The LaTeX document class used to generate the PDF
+    :return: The URL from which the PDF can be downloaded.
+    """
+    session.set_session_user(user)
+    pdf = cls(event, user, contribs, tz=event.timezone, sort_by=sort_by)
+    f = File(filename='book-of-abstracts.pdf', content_type='application/pdf', meta={'event_id': event.id})
+    with open(pdf.generate(), 'rb') as fd:
+        f.save(('event', event.id, 'contribution-book'), fd)
+    db.session.add(f)
+    db.session.commit()
+    return f.signed_download_url
@@ -11,7 +11,7 @@ from datetime import timedelta
 from operator import attrgetter
 
 import dateutil.parser
-from flask import session
+from flask import redirect, session
 from sqlalchemy.orm import contains_eager, joinedload, load_only, noload
 
 from indico.core.config import config
@@ -25,6 +25,7 @@ from indico.modules.events.contributions.models.persons import (AuthorType, Cont
 from indico.modules.events.contributions.models.principals import ContributionPrincipal
 from indico.modules.events.contributions.models.subcontributions import SubContribution
 from indico.modules.events.contributions.operations import create_contribution
+from indico.modules.events.contributions.tasks import generate_contribution_book
 from indico.modules.events.models.events import Event
 from indico.modules.events.models.persons import EventPerson
 from indico.modules.events.persons.util import get_event_person
@@ -330,9 +331,8 @@ def import_contributions_from_csv(event, f):
 
 
 def render_pdf(event, contribs, sort_by, cls):
-    pdf = cls(event, session.user, contribs, tz=event.timezone, sort_by=sort_by)
-    res = pdf.generate()
-    return send_file('book-of-abstracts.pdf', res, 'application/pdf')
+    task = generate_contribution_book.delay(event, session.user, contribs, sort_by, cls)
+    return redirect(url_for('contributions.contributions_tex_export_status', event, task_id=task.id))
 
 
 def render_archive(event, contribs, sort_by, cls):
@@ -5,11 +5,15 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
-from flask import flash, redirect, request, session
+from celery.exceptions import TimeoutError
+from flask import flash, jsonify, make_response, redirect, render_template, request, session
 from werkzeug.exceptions import Forbidden, NotFound
 
+from indico.core.celery import AsyncResult
+from indico.core.errors import IndicoError
 from indico.modules.events import Event
 from indico.modules.events.registration.util import get_event_regforms_registrations
+from indico.modules.events.settings import preload_event_settings
 from indico.modules.events.views import WPAccessKey
 from indico.util.i18n import _
 from indico.web.flask.util import url_for
@@ -51,6 +55,11 @@ class RHAuthenticatedEventBase(RHProtectedEventBase):
 
 
 class RHDisplayEventBase(RHProtectedEventBase):
+    def _process_args(self):
+        RHProtectedEventBase._process_args(self)
+        # display pages access the settings of many different modules
+        preload_event_settings(self.event)
+
     def _forbidden_if_not_admin(self):
         if not request.is_xhr and session.user and session.user.is_admin:
             flash(_('This page is currently not visible by non-admin users (menu entry disabled)!'), 'warning')
@@ -102,3 +111,42 @@ class AccessKeyRequired(Forbidden):
 
 class RegistrationRequired(Forbidden):
     pass
+
+
+class PDFBuildStatusMixin:
+    """Wait for a PDF which is built by a Celery task.
+
+    The task needs to return the URL from which the PDF can be
+    downloaded.  AJAX requests receive a JSON response containing
+    ``download_url`` (``None`` while the PDF is still being built);
+    other requests get a page which reloads itself until the PDF is
+    ready and then redirects to it.
+    """
+
+    #: The WP used to render the waiting page
+    wp = None
+    #: The seconds to wait for the task before responding
+    wait_timeout = 2
+    #: The seconds after which the waiting page is reloaded
+    refresh_interval = 3
+
+    def _get_waiting_message(self):
+        return _('The PDF is being generated.')
+
+    def _process(self):
+        res = AsyncResult(request.view_args['task_id'])
+        try:
+            download_url = res.get(self.wait_timeout, propagate=False)
+        except TimeoutError:
+            download_url = None
+        else:
+            if not res.successful():
+                raise IndicoError(_('PDF generation failed'))
+        if request.is_xhr:
+            return jsonify(download_url=download_url)
+        elif download_url:
+            return redirect(download_url)
+        html = render_template('events/pdf_build_status.html', message=self._get_waiting_message())
+        response = make_response(self.wp.render_string(html, self.event))
+        response.headers['Refresh'] = str(self.refresh_interval)
+        return response
@@ -5,12 +5,17 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+from unittest.mock import MagicMock
+
 import pytest
-from flask import session
+from celery.exceptions import TimeoutError
+from flask import request, session
 from werkzeug.exceptions import Forbidden
 
 from indico.core.db.sqlalchemy.protection import ProtectionMode
-from indico.modules.events.controllers.base import AccessKeyRequired, RHDisplayEventBase, RHProtectedEventBase
+from indico.core.errors import IndicoError
+from indico.modules.events.controllers.base import (AccessKeyRequired, PDFBuildStatusMixin, RHDisplayEventBase,
+                                                    RHProtectedEventBase)
 
 
 @pytest.mark.usefixtures('request_context')
@@ -53,3 +58,61 @@ def test_event_key_access(create_user, create_event):
     rh.event.update_principal(user, read_access=True)
     session.set_session_user(user)
     rh._check_access()
+
+
+class _RHTestPDFBuildStatus(PDFBuildStatusMixin):
+    def __init__(self):
+        self.event = MagicMock()
+        self.wp = MagicMock()
+        self.wp.render_string.return_value = 'waiting page'
+
+
+@pytest.fixture
+def pdf_build_status(app, mocker):
+    """Process a PDF build status request for a task in a given state."""
+    def _process(state, xhr=False):
+        res = mocker.patch('indico.modules.events.controllers.base.AsyncResult').return_value
+        if state == 'pending':
+            res.get.side_effect = TimeoutError
+        elif state == 'success':
+            res.get.return_value = 'http://localhost/files/book.pdf'
+            res.successful.return_value = True
+        elif state == 'failure':
+            res.get.return_value = ValueError('LaTeX failed')
+            res.successful.return_value = False
+        rh = _RHTestPDFBuildStatus()
+        headers = {'X-Requested-With': 'XMLHttpRequest'} if xhr else {}
+        with app.test_request_context(headers=headers):
+            request.view_args = {'task_id': 'abc123'}
+            resp = rh._process()
+        res.get.assert_called_once_with(rh.wait_timeout, propagate=False)
+        return rh, resp
+
+    return _process
+
+
+def test_pdf_build_status_pending(pdf_build_status):
+    rh, resp = pdf_build_status('pending', xhr=True)
+    assert resp.json == {'download_url': None}
+    rh, resp = pdf_build_status('pending')
+    assert resp.status_code == 200
+    assert resp.headers['Refresh'] == str(rh.refresh_interval)
+    assert resp.get_data(as_text=True) == 'waiting page'
+    html = rh.wp.render_string.call_args[0][0]
+    assert 'The PDF is being generated.' in html
+    assert rh.wp.render_string.call_args[0][1] is rh.event
+
+
+def test_pdf_build_status_success(pdf_build_status):
+    rh, resp = pdf_build_status('success', xhr=True)
+    assert resp.json == {'download_url': 'http://localhost/files/book.pdf'}
+    rh, resp = pdf_build_status('success')
+    assert resp.status_code == 302
+    assert resp.headers['Location'] == 'http://localhost/files/book.pdf'
+    assert not rh.wp.render_string.called
+
+
+@pytest.mark.parametrize('xhr', (True, False))
+def test_pdf_build_status_failure(pdf_build_status, xhr):
+    with pytest.raises(IndicoError, match='PDF generation failed'):
+        pdf_build_status('failure', xhr=xhr)
@@ -189,6 +189,7 @@ def events_to_ical(
     """
     from indico.modules.events.contributions.ical import generate_contribution_component
     from indico.modules.events.sessions.ical import generate_session_block_component
+    from indico.modules.events.util import get_accessible_event_ids
 
     calendar = icalendar.Calendar()
     calendar.add('version', '2.0')
@@ -197,10 +198,12 @@ def events_to_ical(
     if method:
         calendar.add('method', method)
 
-    for event in events:
-        if not skip_access_check and not event.can_access(user):
-            continue
+    if not skip_access_check:
+        events = list(events)
+        accessible_ids = get_accessible_event_ids(events, user)
+        events = [event for event in events if event.id in accessible_ids]
 
+    for event in events:
         if scope == CalendarScope.contribution:
             components = [
                 generate_contribution_component(contrib, organizer=organizer)
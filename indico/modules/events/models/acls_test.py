@@ -460,3 +460,43 @@ def test_has_management_permission_db(create_event, create_user, dummy_user):
     assert not _query().count()
     assert _query('foo').one() == entry
     assert _query('ANY').count() == 2
+
+
+@pytest.mark.usefixtures('request_context')
+def test_get_accessible_event_ids(db, create_event, create_category, create_user, create_group):
+    from indico.modules.events.util import get_accessible_event_ids
+
+    group = create_group(1)
+    user = create_user(123, groups={group})
+    other_user = create_user(456)
+    admin = create_user(789, admin=True)
+
+    public_cat = create_category(protection_mode=ProtectionMode.public)
+    protected_cat = create_category(protection_mode=ProtectionMode.protected)
+    inheriting_cat = create_category(parent=protected_cat, protection_mode=ProtectionMode.inheriting)
+    managed_cat = create_category(parent=public_cat, protection_mode=ProtectionMode.protected)
+    managed_cat.update_principal(user, full_access=True)
+    group_cat = create_category(parent=protected_cat, protection_mode=ProtectionMode.inheriting)
+    group_cat.update_principal(group, read_access=True)
+    db.session.flush()
+
+    events = []
+    for category in (public_cat, protected_cat, inheriting_cat, managed_cat, group_cat):
+        events.append(create_event(category=category, protection_mode=ProtectionMode.inheriting))
+        events.append(create_event(category=category, protection_mode=ProtectionMode.protected))
+        events.append(create_event(category=category, protection_mode=ProtectionMode.public))
+    events.append(create_event(category=managed_cat.parent, protection_mode=ProtectionMode.protected))
+    events[-1].update_principal(user, read_access=True)
+    events.append(create_event(category=protected_cat, protection_mode=ProtectionMode.inheriting))
+    events[-1].update_principal(group, read_access=True)
+    unlisted_event = create_event(category=None, protection_mode=ProtectionMode.inheriting)
+    unlisted_event.update_principal(user, read_access=True)
+    events.append(unlisted_event)
+    db.session.flush()
+
+    for u in (None, user, other_user, admin):
+        expected = {e.id for e in events if e.can_access(u)}
+        assert get_accessible_event_ids(events, u) == expected
+    assert get_accessible_event_ids(events, admin, allow_admin=False) == {e.id for e in events
+                                                                          if e.can_access(admin, allow_admin=False)}
+    assert get_accessible_event_ids([], user) == set()
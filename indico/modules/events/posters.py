@@ -8,7 +8,6 @@
 from collections import namedtuple
 
 from reportlab.lib.units import cm
-from reportlab.lib.utils import ImageReader
 
 from indico.modules.designer import PageOrientation
 from indico.modules.designer.pdf import DesignerPDFBase
@@ -32,10 +31,9 @@ class PosterPDF(DesignerPDFBase):
         tpl_data = self.tpl_data
 
         if self.template.background_image:
-            with self.template.background_image.open() as f:
-                self._draw_background(canvas, ImageReader(self._remove_transparency(f)), tpl_data,
-                                      config.margin_horizontal, config.margin_vertical,
-                                      tpl_data.width_cm * cm, tpl_data.height_cm * cm)
+            self._draw_template_background(canvas, self.template, tpl_data,
+                                           config.margin_horizontal, config.margin_vertical,
+                                           tpl_data.width_cm * cm, tpl_data.height_cm * cm)
 
         placeholders = get_placeholders('designer-fields')
 
@@ -10,7 +10,6 @@ from collections import namedtuple
 from itertools import product
 
 from reportlab.lib.units import cm
-from reportlab.lib.utils import ImageReader
 from werkzeug.exceptions import BadRequest
 
 from indico.core import signals
@@ -32,7 +31,10 @@ def _get_font_size(text):
 class RegistrantsListToBadgesPDF(DesignerPDFBase):
     def __init__(self, template, config, event, registrations):
         super().__init__(template, config)
+        self.event = event
         self.registrations = registrations
+        self.placeholders = get_placeholders('designer-fields')
+        self._sorted_items = {}
 
     def _build_config(self, config_data):
         return ConfigData(**config_data)
@@ -47,9 +49,9 @@ class RegistrantsListToBadgesPDF(DesignerPDFBase):
                        config.top_margin + n_y * (tpl_data.height_cm + config.margin_rows))
             canvas.showPage()
 
-    def _build_pdf(self, canvas):
+    def _get_grid_size(self):
+        """Get the number of badges fitting on a page horizontally and vertically."""
         config = self.config
-
         available_width = self.width - (config.left_margin - config.right_margin + config.margin_columns) * cm
         n_horizontal = int(available_width / ((self.tpl_data.width_cm + config.margin_columns) * cm))
         available_height = self.height - (config.top_margin - config.bottom_margin + config.margin_rows) * cm
@@ -57,11 +59,33 @@ class RegistrantsListToBadgesPDF(DesignerPDFBase):
 
         if not n_horizontal or not n_vertical:
             raise BadRequest(_('The template dimensions are too large for the page size you selected'))
+        return n_horizontal, n_vertical
+
+    @property
+    def badges_per_page(self):
+        n_horizontal, n_vertical = self._get_grid_size()
+        return n_horizontal * n_vertical
+
+    def _build_pdf(self, canvas):
+        n_horizontal, n_vertical = self._get_grid_size()
 
         # Print a badge for each registration
         for registration, (x, y) in zip(self.registrations, self._iter_position(canvas, n_horizontal, n_vertical)):
             self._draw_badge(canvas, registration, self.template, self.tpl_data, x * cm, y * cm)
 
+    def _get_sorted_items(self, template, tpl_data):
+        """Get the items of a template in the order they are drawn."""
+        try:
+            return self._sorted_items[template.id]
+        except KeyError:
+            pass
+        # Print images first
+        image_placeholders = {name for name, placeholder in self.placeholders.items() if placeholder.is_image}
+        items = sorted(tpl_data.items, key=lambda item: (int(item.get('zIndex', 10)),
+                                                         item['type'] not in image_placeholders))
+        self._sorted_items[template.id] = items
+        return items
+
     def _draw_badge(self, canvas, registration, template, tpl_data, pos_x, pos_y):
         """
         Draw a badge for a given registration, at position pos_x,
@@ -78,18 +102,11 @@ class RegistrantsListToBadgesPDF(DesignerPDFBase):
             canvas.restoreState()
 
         if template.background_image:
-            with template.background_image.open() as f:
-                self._draw_background(canvas, ImageReader(self._remove_transparency(f)), tpl_data, *badge_rect)
-
-        placeholders = get_placeholders('designer-fields')
-
-        # Print images first
-        image_placeholders = {name for name, placeholder in placeholders.items() if placeholder.is_image}
-        items = sorted(tpl_data.items, key=lambda item: (int(item.get('zIndex', 10)),
-                                                         item['type'] not in image_placeholders))
+            self._draw_template_background(canvas, template, tpl_data, *badge_rect)
 
+        items = self._get_sorted_items(template, tpl_data)
         for item in items:
-            placeholder = placeholders.get(item['type'])
+            placeholder = self.placeholders.get(item['type'])
 
             if placeholder:
                 if placeholder.group == 'registrant':
@@ -113,6 +130,8 @@ class RegistrantsListToBadgesPDF(DesignerPDFBase):
 
 
 class RegistrantsListToBadgesPDFFoldable(RegistrantsListToBadgesPDF):
+    badges_per_page = 1
+
     def _build_pdf(self, canvas):
         # Only one badge per page
         n_horizontal = 1
@@ -142,16 +161,7 @@ class RegistrantsListToBadgesPDFFoldable(RegistrantsListToBadgesPDF):
 
 class RegistrantsListToBadgesPDFDoubleSided(RegistrantsListToBadgesPDF):
     def _build_pdf(self, canvas):
-        config = self.config
-
-        available_width = self.width - (config.left_margin - config.right_margin + config.margin_columns) * cm
-        n_horizontal = int(available_width / ((self.tpl_data.width_cm + config.margin_columns) * cm))
-        available_height = self.height - (config.top_margin - config.bottom_margin + config.margin_rows) * cm
-        n_vertical = int(available_height / ((self.tpl_data.height_cm + config.margin_rows) * cm))
-
-        if not n_horizontal or not n_vertical:
-            raise BadRequest(_('The template dimensions are too large for the page size you selected'))
-
+        n_horizontal, n_vertical = self._get_grid_size()
         per_page = n_horizontal * n_vertical
         # make batch of as many badges as we can fit into one page and add duplicates for printing back sides
         page_used = 0
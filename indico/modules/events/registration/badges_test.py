@@ -0,0 +1,90 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from flask import session
+from PIL import Image
+
+from indico.modules.events.registration.badges import (RegistrantsListToBadgesPDF,
+                                                       RegistrantsListToBadgesPDFDoubleSided,
+                                                       RegistrantsListToBadgesPDFFoldable)
+from indico.modules.events.registration.settings import DEFAULT_BADGE_SETTINGS
+
+
+def _make_template(template_id, mode):
+    image = BytesIO()
+    Image.new(mode, (200, 100), 'red').save(image, 'PNG')
+    template = SimpleNamespace(id=template_id, backside_template=None, opened=0,
+                               data={'width': 425, 'height': 270, 'items': [], 'background_position': 'stretch'})
+
+    def _open():
+        template.opened += 1
+        return BytesIO(image.getvalue())
+
+    template.background_image = SimpleNamespace(open=_open)
+    return template
+
+
+@pytest.mark.parametrize('mode', ('RGB', 'RGBA'))
+def test_badge_background_embedded_once(mode):
+    template = _make_template(1, mode)
+    pdf = RegistrantsListToBadgesPDF(template, DEFAULT_BADGE_SETTINGS, None, [object()] * 50).get_pdf().read()
+    assert template.opened == 1
+    assert pdf.count(b'/Subtype /Image') == 1
+    assert pdf.count(b'/Type /Page\n') == 5
+
+
+def test_badge_background_double_sided():
+    template = _make_template(1, 'RGB')
+    template.backside_template = _make_template(2, 'RGBA')
+    pdf = RegistrantsListToBadgesPDFDoubleSided(template, DEFAULT_BADGE_SETTINGS, None, [object()] * 15)
+    data = pdf.get_pdf().read()
+    assert template.opened == template.backside_template.opened == 1
+    assert data.count(b'/Subtype /Image') == 2
+    # the forms are only valid for one PDF
+    assert pdf.get_pdf().read().count(b'/Subtype /Image') == 2
+
+
+@pytest.mark.parametrize('pdf_class', (RegistrantsListToBadgesPDF, RegistrantsListToBadgesPDFDoubleSided))
+def test_badges_chunks_fill_pages(pdf_class):
+    # badges rendered in chunks which are a multiple of the badges per
+    # page can be merged without gaps or misaligned back sides
+    template = _make_template(1, 'RGB')
+    template.backside_template = _make_template(2, 'RGB')
+    registrations = [object()] * 23
+    pdf = pdf_class(template, DEFAULT_BADGE_SETTINGS, None, registrations)
+    per_page = pdf.badges_per_page
+    assert per_page > 1
+    pages = pdf.get_pdf().read().count(b'/Type /Page\n')
+    chunk_pages = 0
+    for i in range(0, len(registrations), per_page * 2):
+        chunk = pdf_class(template, DEFAULT_BADGE_SETTINGS, None, registrations[i:i + per_page * 2])
+        chunk_pages += chunk.get_pdf().read().count(b'/Type /Page\n')
+    assert chunk_pages == pages
+
+
+def test_badges_per_page_foldable():
+    template = _make_template(1, 'RGB')
+    template.backside_template = _make_template(2, 'RGB')
+    assert RegistrantsListToBadgesPDFFoldable(template, DEFAULT_BADGE_SETTINGS, None, []).badges_per_page == 1
+
+
+def test_badges_chunk_session_user(dummy_event, dummy_user):
+    from indico.modules.events.registration.tasks import generate_badges_chunk
+
+    class _BadgesPDF:
+        def __init__(self, template, config, event, registrations):
+            pass
+
+        def get_pdf(self):
+            # placeholders in badge templates may depend on the user printing them
+            return BytesIO(session.user.full_name.encode())
+
+    assert generate_badges_chunk(_BadgesPDF, None, {}, dummy_event, [], dummy_user) == dummy_user.full_name.encode()
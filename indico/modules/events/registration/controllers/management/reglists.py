@@ -25,6 +25,7 @@ from indico.modules.designer import PageLayout, TemplateType
 from indico.modules.designer.models.templates import DesignerTemplate
 from indico.modules.designer.util import get_badge_format, get_inherited_templates
 from indico.modules.events import EventLogRealm
+from indico.modules.events.controllers.base import PDFBuildStatusMixin
 from indico.modules.events.payment.models.transactions import TransactionAction
 from indico.modules.events.payment.util import register_transaction
 from indico.modules.events.registration import logger
@@ -41,6 +42,7 @@ from indico.modules.events.registration.models.items import PersonalDataType, Re
 from indico.modules.events.registration.models.registrations import Registration, RegistrationData, RegistrationState
 from indico.modules.events.registration.notifications import notify_registration_state_update
 from indico.modules.events.registration.settings import event_badge_settings
+from indico.modules.events.registration.tasks import BADGES_CHUNK_SIZE, generate_badges_in_chunks
 from indico.modules.events.registration.util import (create_registration, generate_spreadsheet_from_registrations,
                                                      get_event_section_data, get_flat_section_submission_data,
                                                      get_ticket_attachments, get_title_uuid,
@@ -438,9 +440,22 @@ class RHRegistrationsPrintBadges(RHRegistrationsActionBase):
         signals.event.designer.print_badge_template.send(self.template, regform=self.regform,
                                                          registrations=registrations)
         pdf = pdf_class(self.template, config_params, self.event, registrations)
+        if len(registrations) > BADGES_CHUNK_SIZE:
+            result = generate_badges_in_chunks(pdf, registrations, session.user)
+            return redirect(url_for('.registrations_print_badges_status', self.regform, task_id=result.id))
         return send_file(f'Badges-{self.event.id}.pdf', pdf.get_pdf(), 'application/pdf')
 
 
+class RHRegistrationsPrintBadgesStatus(PDFBuildStatusMixin, RHManageRegFormBase):
+    """Wait for the badges to be generated."""
+
+    ALLOW_LOCKED = True
+    wp = WPManageRegistration
+
+    def _get_waiting_message(self):
+        return _('The badges are being generated.')
+
+
 class RHRegistrationsConfigBadges(RHRegistrationsActionBase):
     """Print badges for the selected registrations."""
 
@@ -8,7 +8,12 @@
 from collections import defaultdict, namedtuple
 from itertools import chain, groupby
 
-from indico.modules.events.registration.models.registrations import RegistrationData
+from indico.core.db import db
+from indico.modules.events.payment.models.transactions import PaymentTransaction, TransactionStatus
+from indico.modules.events.registration.models.form_fields import RegistrationFormFieldData
+from indico.modules.events.registration.models.items import PersonalDataType, RegistrationFormItem
+from indico.modules.events.registration.models.registrations import Registration, RegistrationData
+from indico.util.countries import get_country
 from indico.util.date_time import now_utc
 from indico.util.i18n import _
 
@@ -110,9 +115,25 @@ class DataItem(namedtuple('DataItem', ['regs', 'attendance', 'capacity', 'billab
                                paid_amount, unpaid, unpaid_amount)
 
 
+class RegistrationDataGroup(namedtuple('RegistrationDataGroup', ['field_data', 'data', 'price', 'paid', 'count'])):
+    """Hold the number of registrations with the same data for a field.
+
+    :param field_data: RegistrationFormFieldData -- the version of the
+                       field the data was submitted for
+    :param data: dict -- the parts of the submitted data used to group
+                 the registrations
+    :param price: the price of the data
+    :param paid: bool -- whether the registrations have been paid
+    :param count: int -- the number of registrations
+    """
+
+
 class FieldStats:
     """Hold stats for a registration form field."""
 
+    #: The keys of the submitted data by which registrations are grouped
+    data_keys = ()
+
     def __init__(self, field, **kwargs):
         kwargs.setdefault('type', 'table')
         super().__init__(**kwargs)
@@ -129,11 +150,34 @@ class FieldStats:
         return {choice['id']: choice for choice in field.current_data.versioned_data['choices']}
 
     def _get_registration_data(self, field):
-        registration_ids = [r.id for r in field.registration_form.active_registrations]
-        field_data_ids = [data.id for data in field.data_versions]
-        return RegistrationData.query.filter(RegistrationData.registration_id.in_(registration_ids),
-                                             RegistrationData.field_data_id.in_(field_data_ids),
-                                             RegistrationData.data != {}).all()
+        """Count the active registrations for each distinct field value.
+
+        The registrations are grouped in the database, so no matter how
+        many registrations there are, only the aggregated data is loaded.
+
+        :returns: [RegistrationDataGroup] -- the groups of registration
+                  data.
+        """
+        data_columns = [RegistrationData.data[key].astext for key in self.data_keys]
+        paid_states = {TransactionStatus.successful, TransactionStatus.pending}
+        paid = db.func.coalesce(PaymentTransaction.status.in_(paid_states), False)
+        group_columns = [RegistrationData.field_data_id, *data_columns, paid]
+        query = (db.session.query(*group_columns, db.func.count())
+                 .join(RegistrationData.registration)
+                 .join(RegistrationData.field_data)
+                 .outerjoin(PaymentTransaction, PaymentTransaction.id == Registration.transaction_id)
+                 .filter(RegistrationFormFieldData.field_id == field.id,
+                         Registration.registration_form_id == field.registration_form_id,
+                         Registration.is_active,
+                         RegistrationData.data != {})
+                 .group_by(*group_columns))
+        versions = {data.id: data for data in field.data_versions}
+        groups = []
+        for field_data_id, *values, is_paid, count in query:
+            data = {key: value for key, value in zip(self.data_keys, values) if value is not None}
+            group = RegistrationDataGroup(versions[field_data_id], data, None, is_paid, count)
+            groups.append(group._replace(price=field.calculate_price(group)))
+        return groups
 
     def _build_data(self):
         """Build data from registration data and field choices.
@@ -236,7 +280,8 @@ class FieldStats:
     def _build_regitems_data(self, key, regitems):
         """Return a `DataItem` aggregating data from registration items.
 
-        :param regitems: list -- list of registrations items to be aggregated
+        :param regitems: [RegistrationDataGroup] -- list of groups of
+                         registration items to be aggregated
         :returns: DataItem -- the data aggregation
         """
         raise NotImplementedError
@@ -297,17 +342,26 @@ class OverviewStats(StatsBase):
     def __init__(self, regform):
         super().__init__(title=_('Overview'), subtitle='', type='overview')
         self.regform = regform
-        self.registrations = regform.active_registrations
+        self.registration_count = regform.active_registration_count
         self.countries, self.num_countries = self._get_countries()
         self.availability = self._get_availibility()
         self.days_left = max((self.regform.end_dt - now_utc()).days, 0) if self.regform.end_dt else 0
 
     def _get_countries(self):
+        query = (db.session.query(RegistrationData.data, db.func.count())
+                 .join(RegistrationData.registration)
+                 .join(RegistrationData.field_data)
+                 .join(RegistrationFormFieldData.field)
+                 .filter(Registration.registration_form_id == self.regform.id,
+                         Registration.is_active,
+                         RegistrationFormItem.personal_data_type == PersonalDataType.country,
+                         RegistrationData.data.notin_(['', 'None']))
+                 .group_by(RegistrationData.data))
         countries = defaultdict(int)
-        for country, regs in groupby(self.registrations, lambda x: x.get_personal_data().get('country')):
-            if country is None:
-                continue
-            countries[country] += sum(1 for x in regs)
+        for country_code, count in query:
+            country = get_country(country_code) if country_code else None
+            if country is not None:
+                countries[country] += count
         if not countries:
             return [], 0
         # Sort by highest number of people per country then alphabetically per countries' name
@@ -317,12 +371,14 @@ class OverviewStats(StatsBase):
 
     def _get_availibility(self):
         limit = self.regform.registration_limit
-        if not limit or self.regform.limit_reached:
+        if not limit or self.registration_count >= limit:
             return (0, 0, 0)
-        return (len(self.registrations), limit, len(self.registrations) / limit)
+        return (self.registration_count, limit, self.registration_count / limit)
 
 
 class AccommodationStats(FieldStats, StatsBase):
+    data_keys = ('choice', 'arrival_date', 'departure_date')
+
     def __init__(self, field):
         super().__init__(title=_('Accommodation'), subtitle=field.title, field=field)
         self.has_capacity = any(detail.capacity for acco_details in self._data.values()
@@ -346,24 +402,24 @@ class AccommodationStats(FieldStats, StatsBase):
                      data=(details.regs / details.capacity, '{0.regs} / {0.capacity}'.format(details)))]
 
     def _build_key(self, obj):
-        choice_id = obj.data['choice'] if isinstance(obj, RegistrationData) else obj['id']
-        choice_price = obj.price if isinstance(obj, RegistrationData) else obj['price']
+        choice_id = obj.data['choice'] if isinstance(obj, RegistrationDataGroup) else obj['id']
+        choice_price = obj.price if isinstance(obj, RegistrationDataGroup) else obj['price']
         choice_caption = self._field.data['captions'][choice_id]
         return choice_caption, choice_id, choice_price
 
     def _build_regitems_data(self, key, regitems):
         name, id, price = key
         choices = lambda r: {choice['id']: choice for choice in r.field_data.versioned_data['choices']}
-        data = {'regs': len(regitems),
+        data = {'regs': sum(regitem.count for regitem in regitems),
                 'capacity': next((choices(regitem)[regitem.data['choice']]['places_limit'] for regitem in regitems), 0),
                 'cancelled': any(not choices(regitem)[regitem.data['choice']]['is_enabled'] for regitem in regitems),
                 'billable': bool(price)}
         if data['billable']:
             data['price'] = price
-            data['paid'] = sum(1 for regitem in regitems if regitem.registration.is_paid)
-            data['paid_amount'] = sum(float(price) for regitem in regitems if regitem.registration.is_paid)
-            data['unpaid'] = sum(1 for regitem in regitems if not regitem.registration.is_paid)
-            data['unpaid_amount'] = sum(float(price) for regitem in regitems if not regitem.registration.is_paid)
+            data['paid'] = sum(regitem.count for regitem in regitems if regitem.paid)
+            data['paid_amount'] = sum(float(price) * regitem.count for regitem in regitems if regitem.paid)
+            data['unpaid'] = sum(regitem.count for regitem in regitems if not regitem.paid)
+            data['unpaid_amount'] = sum(float(price) * regitem.count for regitem in regitems if not regitem.paid)
         return DataItem(**data)
 
     def _build_choice_data(self, choice):
@@ -389,13 +445,13 @@ class AccommodationStats(FieldStats, StatsBase):
         return head
 
     def _get_main_row_cells(self, data_items, choice_caption, total_regs):
-        active_registrations = self._field.registration_form.active_registrations
+        registration_count = self._field.registration_form.active_registration_count
         cancelled = any(d.cancelled for d in data_items)
         return [
             Cell(type='str', data=' ' + choice_caption, classes=['cancelled-item'] if cancelled else []),
-            Cell(type='progress', data=((total_regs / len(active_registrations),
-                                         f'{total_regs} / {len(active_registrations)}')
-                                        if active_registrations else None))
+            Cell(type='progress', data=((total_regs / registration_count,
+                                         f'{total_regs} / {registration_count}')
+                                        if registration_count else None))
         ] + self._get_occupancy(data_items)
 
     def _get_sub_row_cells(self, data_item, total_regs):
@@ -0,0 +1,86 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from uuid import uuid4
+
+import pytest
+
+from indico.modules.events.payment.models.transactions import PaymentTransaction, TransactionStatus
+from indico.modules.events.registration.models.form_fields import RegistrationFormField, RegistrationFormFieldData
+from indico.modules.events.registration.models.items import PersonalDataType
+from indico.modules.events.registration.models.registrations import Registration, RegistrationData, RegistrationState
+from indico.modules.events.registration.stats import AccommodationStats, DataItem, OverviewStats
+
+
+@pytest.fixture
+def create_registration(db, dummy_regform):
+    def _create_registration(num, data=None, paid=False):
+        reg = Registration(registration_form=dummy_regform, first_name='Guinea', last_name=f'Pig {num}',
+                           email=f'pig{num}@example.com', state=RegistrationState.complete, currency='USD')
+        for field, value in (data or {}).items():
+            reg.data.append(RegistrationData(field_data=field.current_data, data=value))
+        dummy_regform.event.registrations.append(reg)
+        db.session.flush()
+        if paid:
+            reg.transaction = PaymentTransaction(registration=reg, status=TransactionStatus.successful, amount=1,
+                                                 currency='USD', data={})
+        db.session.flush()
+        return reg
+
+    return _create_registration
+
+
+def test_overview_stats(db, dummy_regform, create_registration):
+    country_field = next(f for f in dummy_regform.active_fields if f.personal_data_type == PersonalDataType.country)
+    dummy_regform.registration_limit = 10
+    for i, country in enumerate(('CH', 'CH', 'FR', '', None)):
+        reg = create_registration(i, {country_field: country} if country is not None else None)
+    reg.is_deleted = True
+    create_registration(10, {country_field: 'DE'}).is_deleted = True
+    db.session.flush()
+    stats = OverviewStats(dummy_regform)
+    assert stats.registration_count == 4
+    assert stats.num_countries == 2
+    assert stats.countries == [(1, 'France'), (2, 'Switzerland')]
+    assert stats.availability == (4, 10, 0.4)
+
+
+def test_accommodation_stats(db, dummy_regform, create_registration):
+    hotel_a = str(uuid4())
+    hotel_b = str(uuid4())
+    field = RegistrationFormField(registration_form=dummy_regform, parent=dummy_regform.sections[0],
+                                  input_type='accommodation', title='Accommodation', is_enabled=True)
+    field.data = {'captions': {hotel_a: 'Hotel A', hotel_b: 'Hotel B'}}
+    field.current_data = RegistrationFormFieldData(versioned_data={'choices': [
+        {'id': hotel_a, 'price': 10, 'places_limit': 5, 'is_enabled': True},
+        {'id': hotel_b, 'price': 0, 'places_limit': 0, 'is_enabled': True},
+    ]})
+    db.session.flush()
+
+    def _accommodation(choice, nights):
+        return {'choice': choice, 'is_no_accommodation': False,
+                'arrival_date': '2022-01-01', 'departure_date': f'2022-01-{1 + nights:02}'}
+
+    create_registration(1, {field: _accommodation(hotel_a, 2)}, paid=True)
+    create_registration(2, {field: _accommodation(hotel_a, 2)})
+    create_registration(3, {field: _accommodation(hotel_a, 1)})
+    create_registration(4, {field: _accommodation(hotel_b, 3)})
+    create_registration(5, {field: _accommodation(hotel_b, 3)})
+    create_registration(6, {field: _accommodation(hotel_b, 3)}).is_deleted = True
+    db.session.flush()
+
+    stats = AccommodationStats(field)
+    assert stats.is_currency_shown
+    assert stats.has_capacity
+    assert stats._data == {
+        ('Hotel A', hotel_a): [
+            DataItem(regs=1, capacity=5, billable=True, price=10, unpaid=1, unpaid_amount=10),
+            DataItem(regs=2, capacity=5, billable=True, price=20, paid=1, paid_amount=20, unpaid=1, unpaid_amount=20),
+        ],
+        ('Hotel B', hotel_b): [DataItem(regs=2)],
+    }
+    assert len(stats.get_table()['rows']) == 4
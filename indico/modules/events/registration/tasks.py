@@ -0,0 +1,75 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from io import BytesIO
+
+from celery import chord
+from flask import session
+from PyPDF2 import PdfFileReader, PdfFileWriter
+from sqlalchemy.orm import subqueryload
+
+from indico.core.celery import celery
+from indico.core.db import db
+from indico.modules.events.registration.models.registrations import Registration
+from indico.modules.files.models.files import File
+
+
+#: The number of badges rendered in one task when printing badges in
+#: parallel.  Printing fewer badges than this is done synchronously.
+BADGES_CHUNK_SIZE = 500
+
+
+def generate_badges_in_chunks(pdf, registrations, user):
+    """Render badges in parallel Celery tasks and merge them into one PDF.
+
+    :param pdf: A `RegistrantsListToBadgesPDF` which has been created
+                with the settings used to print the badges.
+    :param registrations: The registrations to print badges for.
+    :param user: The user who is printing the badges.
+    :return: The `AsyncResult` of the task which returns the download
+             URL of the merged PDF.
+    """
+    # each chunk needs to fill its pages so the merged PDF looks exactly
+    # like one that was generated in a single go
+    per_page = pdf.badges_per_page
+    chunk_size = -(-BADGES_CHUNK_SIZE // per_page) * per_page
+    header = [generate_badges_chunk.s(type(pdf), pdf.template, pdf.config._asdict(), pdf.event,
+                                      registrations[i:i + chunk_size], user)
+              for i in range(0, len(registrations), chunk_size)]
+    # the callback signature is sent along with the chunk tasks, so it cannot contain any SA objects
+    return chord(header)(merge_badges.s(pdf.event.id))
+
+
+@celery.task(ignore_result=False, request_context=True,
+             load_options={Registration: [subqueryload('data').joinedload('field_data')]})
+def generate_badges_chunk(pdf_class, template, config, event, registrations, user):
+    """Render the badges for some registrations.
+
+    :return: The PDF as bytes.
+    """
+    session.set_session_user(user)
+    return pdf_class(template, config, event, registrations).get_pdf().getvalue()
+
+
+@celery.task(ignore_result=False)
+def merge_badges(chunks, event_id):
+    """Merge the PDFs of badge chunks and store the result as a file.
+
+    :return: The URL from which the PDF can be downloaded.
+    """
+    writer = PdfFileWriter()
+    for chunk in chunks:
+        for page in PdfFileReader(BytesIO(chunk)).pages:
+            writer.addPage(page)
+    data = BytesIO()
+    writer.write(data)
+    data.seek(0)
+    f = File(filename=f'Badges-{event_id}.pdf', content_type='application/pdf', meta={'event_id': event_id})
+    f.save(('event', event_id, 'badges'), data)
+    db.session.add(f)
+    db.session.commit()
+    return f.signed_download_url
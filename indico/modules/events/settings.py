@@ -16,11 +16,11 @@ from indico.core import signals
 from indico.core.settings import ACLProxyBase, SettingProperty, SettingsProxyBase
 from indico.core.settings.converters import DatetimeConverter
 from indico.core.settings.proxy import SettingsProxy
-from indico.core.settings.util import get_all_settings, get_setting, get_setting_acl
+from indico.core.settings.util import get_all_settings, get_setting, get_setting_acl, preload_settings
 from indico.modules.events.models.settings import EventSetting, EventSettingPrincipal
 from indico.util.caching import memoize
 from indico.util.signals import values_from_signal
-from indico.util.user import iter_acl
+from indico.util.user import is_user_in_acl
 
 
 def event_or_id(f):
@@ -70,7 +70,7 @@ class EventACLProxy(ACLProxyBase):
         :param name: Setting name
         :param user: A :class:`.User`
         """
-        return any(user in principal for principal in iter_acl(self.get(event, name)))
+        return is_user_in_acl(self.get(event, name), user)
 
     @event_or_id
     def add_principal(self, event, name, principal):
@@ -134,6 +134,18 @@ class EventSettingsProxy(SettingsProxyBase):
         self._check_name(name)
         return get_setting(EventSetting, self, name, default, self._cache, event_id=event)
 
+    @event_or_id
+    def preload(self, event):
+        """Load all settings of the module into the request cache.
+
+        The settings and ACLs of all modules are loaded with a single
+        query per table, so preloading multiple proxies does not cause
+        any additional queries.
+
+        :param event: Event (or its ID)
+        """
+        preload_settings(EventSetting, EventSettingPrincipal, self, self._cache, event_id=event)
+
     @event_or_id
     def set(self, event, name, value):
         """Set a single setting.
@@ -182,6 +194,25 @@ class EventSettingsProxy(SettingsProxyBase):
         self._flush_cache()
 
 
+def preload_event_settings(event, *proxies):
+    """Load all settings of an event into the request cache.
+
+    This loads the settings and ACLs of all modules with one query per
+    table, so accessing any event setting afterwards does not require
+    any further queries.
+
+    :param event: Event (or its ID)
+    :param proxies: `EventSettingsProxy` instances whose cache should
+                    be populated as well
+    """
+    from indico.modules.events import Event
+    event_id = event.id if isinstance(event, Event) else int(event)
+    EventSetting.preload(event_id=event_id)
+    EventSettingPrincipal.preload(event_id=event_id)
+    for proxy in proxies:
+        proxy.preload(event_id)
+
+
 class EventSettingProperty(SettingProperty):
     attr = 'event'
 
@@ -10,12 +10,14 @@ import os
 import random
 import re
 import warnings
-from collections import defaultdict
-from contextlib import contextmanager
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from copy import deepcopy
+from io import BufferedReader, RawIOBase
 from mimetypes import guess_extension
 from tempfile import NamedTemporaryFile
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
 
 from flask import current_app, flash, g, redirect, request, session
 from sqlalchemy import inspect
@@ -25,8 +27,13 @@ from werkzeug.urls import url_parse
 
 from indico.core import signals
 from indico.core.config import config
+from indico.core.db import db
+from indico.core.db.sqlalchemy.principals import PrincipalType
+from indico.core.db.sqlalchemy.protection import ProtectionMode
 from indico.core.errors import NoReportError, UserValueError
 from indico.core.permissions import FULL_ACCESS_PERMISSION, READ_ACCESS_PERMISSION
+from indico.modules.categories.models.categories import Category
+from indico.modules.categories.models.principals import CategoryPrincipal
 from indico.modules.categories.models.roles import CategoryRole
 from indico.modules.events import Event
 from indico.modules.events.contributions import contribution_settings
@@ -44,8 +51,8 @@ from indico.modules.events.timetable.models.breaks import Break
 from indico.modules.events.timetable.models.entries import TimetableEntry
 from indico.modules.networks import IPNetworkGroup
 from indico.modules.users import User
-from indico.util.caching import memoize_request
-from indico.util.fs import chmod_umask, secure_filename
+from indico.util.caching import memoize, memoize_request
+from indico.util.fs import secure_filename
 from indico.util.i18n import _
 from indico.util.string import strip_tags
 from indico.util.user import principal_from_identifier
@@ -170,6 +177,121 @@ def get_events_with_linked_event_persons(user, dt=None):
             for event_id, event_type in query}
 
 
+# cheapest principal types first, like `iter_acl` does for principal objects
+_PRINCIPAL_CHECK_ORDER = {
+    PrincipalType.user: 0,
+    PrincipalType.email: 0,
+    PrincipalType.network: 1,
+    PrincipalType.local_group: 2,
+    PrincipalType.event_role: 2,
+    PrincipalType.category_role: 2,
+    PrincipalType.registration_form: 2,
+    PrincipalType.multipass_group: 3,
+}
+_PRINCIPAL_KEY_COLUMNS = ('user_id', 'local_group_id', 'multipass_group_provider', 'multipass_group_name', 'email',
+                          'ip_network_group_id', 'event_role_id', 'category_role_id', 'registration_form_id')
+
+
+def get_accessible_event_ids(events, user, allow_admin=True):
+    """Get the IDs of the events a user can access.
+
+    This gives the same result as calling :meth:`Event.can_access` on
+    each event, but it resolves the protection for all events at once:
+    Events which are effectively public need no further checks, and for
+    the remaining ones the ACL entries and the protection of all parent
+    categories are loaded in a constant number of queries.  Each distinct
+    principal (e.g. a group) is only checked once for the whole batch.
+
+    :param events: A list of `Event` objects
+    :param user: A `User` or ``None``
+    :param allow_admin: If admin users should always have access
+    :return: A set of event ids
+    """
+    events = list(events)
+    if not events:
+        return set()
+    if len(events) == 1 or any(signal.has_receivers_for(sender)
+                               for signal in (signals.acl.can_access, signals.acl.can_manage)
+                               for sender in (Event, Category)):
+        # plugins may override access checks so we have to check each event; and for
+        # a single event the result of the regular check is usually memoized already
+        return {event.id for event in events if event.can_access(user, allow_admin=allow_admin)}
+    if allow_admin and user and user.is_admin:
+        return {event.id for event in events}
+
+    event_ids = {event.id for event in events}
+    public_ids = {id_ for id_, mode in (db.session.query(Event.id, Event.effective_protection_mode)
+                                        .filter(Event.id.in_(event_ids)))
+                  if mode == ProtectionMode.public}
+    accessible = {event.id for event in events
+                  if event.id in public_ids or (event.access_key and event.check_access_key())}
+    events = [event for event in events if event.id not in accessible]
+    if not events:
+        return accessible
+
+    may_manage = user is not None and not user.is_system
+    event_acls = defaultdict(list)
+    for entry in EventPrincipal.query.filter(EventPrincipal.event_id.in_(e.id for e in events)):
+        event_acls[entry.event_id].append(entry)
+    category_ids = {event.category_id for event in events if event.category_id is not None}
+    categories = {}
+    category_acls = defaultdict(list)
+    if category_ids:
+        query = (Category._get_chain_query(Category.id.in_(category_ids))
+                 .options(load_only('id', 'parent_id', 'protection_mode')))
+        categories = {cat.id: cat for cat in query}
+        for entry in CategoryPrincipal.query.filter(CategoryPrincipal.category_id.in_(categories)):
+            category_acls[entry.category_id].append(entry)
+
+    principal_cache = {}
+
+    def _in_principal(entry):
+        if entry.type == PrincipalType.user:
+            return user is not None and entry.user_id == user.id
+        key = (entry.type,) + tuple(getattr(entry, col, None) for col in _PRINCIPAL_KEY_COLUMNS)
+        try:
+            return principal_cache[key]
+        except KeyError:
+            rv = principal_cache[key] = user in entry.principal
+            return rv
+
+    def _in_acl(entries, managers_only=False):
+        entries = sorted((e for e in entries if not managers_only or e.full_access),
+                         key=lambda e: _PRINCIPAL_CHECK_ORDER[e.type])
+        return any(_in_principal(entry) for entry in entries)
+
+    @memoize
+    def _can_manage_category(category_id):
+        if not may_manage or category_id is None:
+            return False
+        return (_in_acl(category_acls[category_id], managers_only=True) or
+                _can_manage_category(categories[category_id].parent_id))
+
+    @memoize
+    def _can_access_category(category_id):
+        category = categories[category_id]
+        if category.protection_mode == ProtectionMode.public:
+            return True
+        elif category.protection_mode == ProtectionMode.protected:
+            return _in_acl(category_acls[category_id]) or _can_manage_category(category_id)
+        elif _in_acl(category_acls[category_id]):
+            return True
+        return category.parent_id is not None and _can_access_category(category.parent_id)
+
+    for event in events:
+        if event.protection_mode == ProtectionMode.public:
+            rv = True
+        elif event.protection_mode == ProtectionMode.protected:
+            rv = _in_acl(event_acls[event.id]) or _can_manage_category(event.category_id)
+        elif _in_acl(event_acls[event.id]):
+            rv = True
+        else:
+            rv = event.category_id is not None and _can_access_category(event.category_id)
+        if rv:
+            accessible.add(event.id)
+    return accessible
+
+
 def get_random_color(event):
     breaks = Break.query.filter(Break.timetable_entry.has(event=event))
     used_colors = {s.colors for s in event.sessions} | {b.colors for b in breaks}
@@ -636,6 +758,127 @@ def get_event_from_url(url):
     return event
 
 
+#: Size of the chunks in which zip archives are generated
+ZIP_CHUNK_SIZE = 1024 * 1024
+#: Number of files downloaded from the storage backend in parallel
+ZIP_PREFETCH_WORKERS = 4
+#: Extensions of formats that are already compressed and thus not worth deflating again
+ZIP_STORED_EXTENSIONS = {'.7z', '.avi', '.bz2', '.docx', '.epub', '.gif', '.gz', '.jpeg', '.jpg', '.key', '.m4a',
+                         '.mkv', '.mov', '.mp3', '.mp4', '.odp', '.ods', '.odt', '.ogg', '.pdf', '.png', '.pptx',
+                         '.rar', '.tgz', '.webm', '.webp', '.xlsx', '.xz', '.zip'}
+
+
+class _ZipStream:
+    """A write-only file whose data is collected until it's drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _IterReader(RawIOBase):
+    """A readable file containing the data from an iterable of bytestrings."""
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._iterator)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self):
+        if not self.closed and hasattr(self._iterator, 'close'):
+            self._iterator.close()
+        super().close()
+
+
+def _iter_local_files(app, entries):
+    """Get local paths for files from a storage backend.
+
+    Since getting a local path for a file may involve downloading it
+    from a remote storage, the next couple of files are fetched in
+    parallel while the current one is being processed.
+
+    :param app: The Flask app used to get an app context for the storage
+                access, since the iterator is usually consumed after the
+                request context has been torn down
+    :param entries: A list of ``(name, storage, file_id)`` tuples
+    :return: An iterator yielding ``(name, path)`` tuples in the same
+             order as `entries`
+    """
+    def _fetch(storage, file_id):
+        with app.app_context():
+            stack = ExitStack()
+            try:
+                return stack.enter_context(storage.get_local_path(file_id)), stack
+            except BaseException:
+                stack.close()
+                raise
+
+    with ThreadPoolExecutor(ZIP_PREFETCH_WORKERS) as executor:
+        pending = deque()
+        try:
+            for name, storage, file_id in entries:
+                pending.append((name, executor.submit(_fetch, storage, file_id)))
+                if len(pending) <= ZIP_PREFETCH_WORKERS:
+                    continue
+                name, future = pending.popleft()
+                path, stack = future.result()
+                with stack:
+                    yield name, path
+            while pending:
+                name, future = pending.popleft()
+                path, stack = future.result()
+                with stack:
+                    yield name, path
+        finally:
+            # clean up files that have been fetched already in case we stopped early
+            for __, future in pending:
+                if not future.cancel() and not future.exception():
+                    future.result()[1].close()
+
+
+def _iter_zip_file(app, entries):
+    """Generate a zip archive in chunks.
+
+    :param app: The Flask app (see :func:`_iter_local_files`)
+    :param entries: A list of ``(name, storage, file_id)`` tuples
+    """
+    stream = _ZipStream()
+    with ZipFile(stream, 'w', allowZip64=True) as zip_handler:
+        for name, path in _iter_local_files(app, entries):
+            info = ZipInfo.from_file(path, name)
+            if os.path.splitext(name)[1].lower() not in ZIP_STORED_EXTENSIONS:
+                info.compress_type = ZIP_DEFLATED
+            with open(path, 'rb') as src, zip_handler.open(info, 'w') as dest:
+                while chunk := src.read(ZIP_CHUNK_SIZE):
+                    dest.write(chunk)
+                    yield stream.drain()
+    yield stream.drain()
+
+
 class ZipGeneratorMixin:
     """Mixin for RHs that generate zip with files."""
 
@@ -663,30 +906,35 @@ class ZipGeneratorMixin:
     def _iter_items(self, files_holder):
         yield from files_holder
 
+    def _iter_zip_entries(self, files_holder):
+        self.used_filenames = set()
+        for item in self._iter_items(files_holder):
+            name = self._prepare_folder_structure(item)
+            self.used_filenames.add(name)
+            yield name, item.storage, item.storage_file_id
+
     def _generate_zip_file(self, files_holder, name_prefix='material', name_suffix=None, return_file=False):
         """Generate a zip file containing the files passed.
 
+        The archive is built on the fly while it is being sent (or read
+        from the returned file), so it never needs to be stored as a whole.
+
         :param files_holder: An iterable (or an iterable containing) object that
                              contains the files to be added in the zip file.
         :param name_prefix: The prefix to the zip file name
         :param name_suffix: The suffix to the zip file name
-        :param return_file: Return the temp file instead of a response
+        :param return_file: Return a file-like object with the zip data instead
+                            of a response
         """
-
-        temp_file = NamedTemporaryFile(suffix='.zip', dir=config.TEMP_DIR, delete=False)
-        with ZipFile(temp_file.name, 'w', allowZip64=True) as zip_handler:
-            self.used_filenames = set()
-            for item in self._iter_items(files_holder):
-                name = self._prepare_folder_structure(item)
-                self.used_filenames.add(name)
-                with item.get_local_path() as filepath:
-                    zip_handler.write(filepath, name)
-
-        zip_file_name = f'{name_prefix}-{name_suffix}.zip' if name_suffix else f'{name_prefix}.zip'
-        chmod_umask(temp_file.name)
+        # all the database access happens here; only the storage is used while streaming
+        entries = list(self._iter_zip_entries(files_holder))
+        # the response is streamed after the app context is gone, so the app needs to be passed explicitly
+        app = current_app._get_current_object()
+        zip_file = BufferedReader(_IterReader(_iter_zip_file(app, entries)), ZIP_CHUNK_SIZE)
         if return_file:
-            return temp_file
-        return send_file(zip_file_name, temp_file.name, 'application/zip', inline=False)
+            return zip_file
+        zip_file_name = f'{name_prefix}-{name_suffix}.zip' if name_suffix else f'{name_prefix}.zip'
+        return send_file(zip_file_name, zip_file, 'application/zip', inline=False)
 
     def _prepare_folder_structure(self, item):
         file_name = secure_filename(f'{item.id}_{item.filename}', str(item.id))
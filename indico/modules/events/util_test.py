@@ -0,0 +1,75 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from werkzeug.test import EnvironBuilder
+
+from indico.modules.events.util import ZipGeneratorMixin
+from indico.testing.fixtures.storage import MemoryStorage
+
+
+class _DummyFile:
+    def __init__(self, id_, filename, data):
+        self.id = id_
+        self.filename = filename
+        self.storage = MemoryStorage(None)
+        self.storage_file_id, __ = self.storage.save(f'zip-test/{id_}', 'application/octet-stream', filename, data)
+
+
+def _make_files():
+    files = [_DummyFile(1, 'slides.pdf', b'%PDF' + bytes(range(256)) * 100),
+             _DummyFile(2, 'notes.txt', b'hello world\n' * 10000),
+             _DummyFile(3, 'empty.txt', b'')]
+    files += [_DummyFile(i, f'file{i}.txt', str(i).encode() * i) for i in range(4, 20)]
+    return files
+
+
+def test_generate_zip_file():
+    files = _make_files()
+    with ZipGeneratorMixin()._generate_zip_file(files, return_file=True) as zip_file:
+        data = zip_file.read()
+
+    with ZipFile(BytesIO(data)) as zip_handler:
+        assert zip_handler.testzip() is None
+        infos = zip_handler.infolist()
+        # files are added in order, even though they are fetched in parallel
+        assert [info.filename for info in infos] == [f'{f.id}_{f.filename}' for f in files]
+        for f, info in zip(files, infos):
+            assert zip_handler.read(info) == f.storage._get_file_content(f.storage_file_id)
+    assert infos[0].compress_type == ZIP_STORED
+    assert infos[1].compress_type == ZIP_DEFLATED
+    assert infos[1].compress_size < infos[1].file_size
+
+
+def test_generate_zip_file_response(app):
+    files = _make_files()
+    app.add_url_rule('/test/zip', 'test_zip', lambda: ZipGeneratorMixin()._generate_zip_file(files, 'test'))
+    headers = {}
+
+    def _start_response(status, response_headers, exc_info=None):
+        headers.update(response_headers, status=status)
+
+    def _download():
+        # like a WSGI server, consume the streamed response after the app finished handling the request
+        app_iter = app(EnvironBuilder(path='/test/zip').get_environ(), _start_response)
+        try:
+            return b''.join(app_iter)
+        finally:
+            app_iter.close()
+
+    # the test itself runs in an app context, but a WSGI server does not
+    with ThreadPoolExecutor(1) as executor:
+        data = executor.submit(_download).result()
+
+    assert headers['status'] == '200 OK'
+    assert headers['Content-Disposition'] == 'attachment; filename=test.zip'
+    with ZipFile(BytesIO(data)) as zip_handler:
+        assert zip_handler.testzip() is None
+        assert zip_handler.namelist() == [f'{f.id}_{f.filename}' for f in files]
@@ -17,6 +17,11 @@ from indico.web.menu import SideMenuItem
 __all__ = ('GroupProxy',)
 
 
+@signals.core.import_tasks.connect
+def _import_tasks(sender, **kwargs):
+    import indico.modules.groups.tasks  # noqa: F401
+
+
 @signals.menu.items.connect_via('admin-sidemenu')
 def _extend_admin_menu(sender, **kwargs):
     if session.user.is_admin:
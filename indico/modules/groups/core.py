@@ -5,6 +5,7 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+import time
 from warnings import warn
 
 from flask_multipass import MultipassException
@@ -21,6 +22,86 @@ from indico.util.caching import memoize_request
 
 
 group_membership_cache = make_scoped_cache('group-membership')
+#: How long (in seconds) the membership of a user in a multipass group is cached
+MEMBERSHIP_CACHE_TTL = 1800
+#: After how many seconds a cached membership is refreshed in the background
+#: when it is used, so it does not expire while the group is still in use
+MEMBERSHIP_REFRESH_AGE = 1200
+
+
+def _get_membership_cache_key(provider, name, user_id):
+    return f'{provider}:{name}:{user_id}'
+
+
+def cache_multipass_group_membership(group, user, is_member):
+    key = _get_membership_cache_key(group.provider, group.name, user.id)
+    group_membership_cache.set(key, (is_member, time.time()), timeout=MEMBERSHIP_CACHE_TTL)
+
+
+def _schedule_membership_refresh(user, groups):
+    from indico.modules.groups.tasks import refresh_group_memberships
+
+    # only schedule one refresh per membership, even if it is used by many requests in the meantime
+    groups = [g for g in groups
+              if group_membership_cache.add(f'refresh:{_get_membership_cache_key(g.provider, g.name, user.id)}',
+                                            True, timeout=(MEMBERSHIP_CACHE_TTL - MEMBERSHIP_REFRESH_AGE))]
+    if groups:
+        refresh_group_memberships.delay(user.id, [(g.provider, g.name) for g in groups])
+
+
+def _iter_multipass_group_memberships(user, groups):
+    groups = list(dict.fromkeys(groups))
+    if not groups:
+        return
+    keys = [_get_membership_cache_key(g.provider, g.name, user.id) for g in groups]
+    now = time.time()
+    cached = {}
+    stale = []
+    for group, entry in zip(groups, group_membership_cache.get_many(*keys)):
+        if not isinstance(entry, tuple):
+            continue
+        cached[group], checked_at = entry
+        if now - checked_at > MEMBERSHIP_REFRESH_AGE:
+            stale.append(group)
+    if stale:
+        _schedule_membership_refresh(user, stale)
+    yield from cached.items()
+    for group in groups:
+        if group in cached:
+            continue
+        is_member = group.check_membership(user)
+        cache_multipass_group_membership(group, user, is_member)
+        yield group, is_member
+
+
+def get_multipass_group_memberships(user, groups):
+    """Check whether a user is a member of several multipass groups.
+
+    The cached memberships are retrieved all at once, so only groups
+    for which the membership is not cached yet need to be checked
+    with the identity provider.  Cached memberships which are about
+    to expire are refreshed in the background.
+
+    :param user: A :class:`.User`
+    :param groups: An iterable of multipass :class:`GroupProxy` objects
+    :return: A dict mapping the groups to a bool indicating whether
+             the user is a member of the group.
+    """
+    if not user:
+        return dict.fromkeys(groups, False)
+    return dict(_iter_multipass_group_memberships(user, groups))
+
+
+def is_member_of_any_multipass_group(user, groups):
+    """Check whether a user is a member of any of the multipass groups.
+
+    This is like :func:`get_multipass_group_memberships`, but it does
+    not check any other groups with the identity provider once a group
+    containing the user has been found.
+    """
+    if not user:
+        return False
+    return any(is_member for __, is_member in _iter_multipass_group_memberships(user, groups))
 
 
 class GroupProxy:
@@ -203,19 +284,14 @@ class _MultipassGroupProxy(GroupProxy):
             return self.provider.title()
 
     def has_member(self, user):
-        if not user:
-            return False
-        key = f'{self.provider}:{self.name}:{user.id}'
-        rv = group_membership_cache.get(key)
-        if rv is not None:
-            return rv
-        elif self.group is None:
+        return get_multipass_group_memberships(user, [self])[self]
+
+    def check_membership(self, user):
+        """Check if the user is a member of the group, bypassing the cache."""
+        if self.group is None:
             warn(f'Tried to check if {user} is in invalid group {self}')
-            rv = False
-        else:
-            rv = any(x[1] in self.group for x in user.iter_identifiers(check_providers=True, providers={self.provider}))
-        group_membership_cache.set(key, rv, timeout=1800)
-        return rv
+            return False
+        return any(x[1] in self.group for x in user.iter_identifiers(check_providers=True, providers={self.provider}))
 
     @memoize_request
     def get_members(self):
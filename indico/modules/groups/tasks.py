@@ -0,0 +1,25 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from indico.core.celery import celery
+from indico.modules.groups.core import GroupProxy, cache_multipass_group_membership
+from indico.modules.users import User
+
+
+@celery.task(name='refresh_group_memberships')
+def refresh_group_memberships(user_id, groups):
+    """Refresh the cached memberships of a user in multipass groups.
+
+    :param user_id: The ID of the user
+    :param groups: A list of ``(provider, name)`` tuples
+    """
+    user = User.get(user_id, is_deleted=False)
+    if user is None:
+        return
+    for provider, name in groups:
+        group = GroupProxy(name, provider)
+        cache_multipass_group_membership(group, user, group.check_membership(user))
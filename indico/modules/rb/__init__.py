@@ -105,6 +105,48 @@ def _event_deleted(event, user, **kwargs):
         link.reservation.cancel(user or session.user, 'Associated event was deleted')
 
 
+def _refresh_booking_occupancy(reservation, start_date=None, end_date=None, skip_reservation_id=None):
+    from indico.modules.rb.operations.availability import mark_rooms_changed
+    from indico.modules.rb.statistics import refresh_room_occupancy
+    mark_rooms_changed([reservation.room_id])
+    start_date = min(filter(None, (start_date, reservation.start_dt.date())))
+    end_date = max(filter(None, (end_date, reservation.end_dt.date())))
+    refresh_room_occupancy([reservation.room_id], start_date, end_date, skip_reservation_id=skip_reservation_id)
+
+
+@signals.rb.booking_created.connect
+@signals.rb.booking_state_changed.connect
+def _booking_changed(reservation, **kwargs):
+    _refresh_booking_occupancy(reservation)
+
+
+@signals.rb.booking_modified.connect
+def _booking_modified(reservation, changes, **kwargs):
+    # the occurrences have been recreated, so the old period needs to be updated as well
+    _refresh_booking_occupancy(reservation,
+                               start_date=changes.get('start_dt/date', {}).get('old'),
+                               end_date=changes.get('end_dt/date', {}).get('old'))
+
+
+@signals.rb.booking_deleted.connect
+def _booking_deleted(reservation, **kwargs):
+    _refresh_booking_occupancy(reservation, skip_reservation_id=reservation.id)
+
+
+@signals.rb.booking_occurrence_state_changed.connect
+def _booking_occurrence_state_changed(occurrence, **kwargs):
+    from indico.modules.rb.operations.availability import mark_rooms_changed
+    from indico.modules.rb.statistics import refresh_room_occupancy
+    mark_rooms_changed([occurrence.reservation.room_id])
+    refresh_room_occupancy([occurrence.reservation.room_id], occurrence.date, occurrence.date)
+
+
+@signals.core.after_commit.connect
+def _update_room_versions(sender, **kwargs):
+    from indico.modules.rb.operations.availability import update_room_versions
+    update_room_versions()
+
+
 class BookPermission(ManagementPermission):
     name = 'book'
     friendly_name = _('Book')
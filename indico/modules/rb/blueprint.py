@@ -118,6 +118,7 @@ _bp.add_url_rule('/api/admin/rooms/<int:room_id>/availability', 'admin_update_ro
 _bp.add_url_rule('/api/admin/rooms/<int:room_id>/photo', 'admin_room_photo', admin.RHRoomPhoto,
                  methods=('GET', 'POST', 'DELETE'))
 _bp.add_url_rule('/api/admin/map-areas', 'admin_map_areas', admin.RHMapAreas, methods=('POST', 'PATCH', 'DELETE'))
+_bp.add_url_rule('/api/admin/bookings', 'admin_create_bookings', admin.RHCreateBookings, methods=('POST',))
 
 # Event linking
 _bp.add_url_rule('!/event/<int:event_id>/manage/rooms/', 'event_booking_list', event.RHEventBookingList)
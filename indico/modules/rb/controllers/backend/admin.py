@@ -16,7 +16,7 @@ from webargs.flaskparser import abort
 from werkzeug.exceptions import Forbidden, NotFound
 
 from indico.core.db import db
-from indico.core.errors import UserValueError
+from indico.core.errors import NoReportError, UserValueError
 from indico.modules.rb import logger, rb_settings
 from indico.modules.rb.controllers import RHRoomBookingBase
 from indico.modules.rb.controllers.backend.rooms import RHRoomsPermissions
@@ -29,12 +29,14 @@ from indico.modules.rb.models.room_features import RoomFeature
 from indico.modules.rb.models.rooms import Room
 from indico.modules.rb.operations.admin import (create_area, delete_areas, update_area, update_room,
                                                 update_room_attributes, update_room_availability, update_room_equipment)
+from indico.modules.rb.operations.bookings import create_bookings
 from indico.modules.rb.operations.rooms import has_managed_rooms
-from indico.modules.rb.schemas import (AdminRoomSchema, EquipmentTypeArgs, FeatureArgs, LocationArgs, RoomAttributeArgs,
-                                       RoomAttributeValuesSchema, RoomUpdateArgsSchema, SettingsSchema,
-                                       admin_equipment_type_schema, admin_locations_schema, bookable_hours_schema,
-                                       map_areas_schema, nonbookable_periods_schema, room_attribute_schema,
-                                       room_equipment_schema, room_feature_schema, room_update_schema)
+from indico.modules.rb.schemas import (AdminRoomSchema, CreateBookingSchema, EquipmentTypeArgs, FeatureArgs,
+                                       LocationArgs, RoomAttributeArgs, RoomAttributeValuesSchema, RoomUpdateArgsSchema,
+                                       SettingsSchema, admin_equipment_type_schema, admin_locations_schema,
+                                       bookable_hours_schema, map_areas_schema, nonbookable_periods_schema,
+                                       room_attribute_schema, room_equipment_schema, room_feature_schema,
+                                       room_update_schema)
 from indico.modules.rb.util import (build_rooms_spritesheet, get_resized_room_photo, rb_is_admin,
                                     remove_room_spritesheet_photo)
 from indico.util.i18n import _
@@ -449,3 +451,27 @@ class RHMapAreas(RHRoomBookingAdminBase):
     def _process_DELETE(self, area_ids):
         delete_areas(area_ids)
         return '', 204
+
+
+class RHCreateBookings(RHRoomBookingAdminBase):
+    """Create many bookings at once, e.g. to import a schedule."""
+
+    @use_kwargs({
+        'bookings': fields.List(fields.Nested(CreateBookingSchema(only=(
+            'start_dt', 'end_dt', 'repeat_frequency', 'repeat_interval', 'room_id', 'booked_for_user', 'booking_reason'
+        ))), required=True),
+        'is_prebooking': fields.Bool(load_default=False),
+    })
+    def _process(self, bookings, is_prebooking):
+        room_ids = {data['room_id'] for data in bookings}
+        rooms = {room.id: room for room in Room.query.filter(Room.id.in_(room_ids), ~Room.is_deleted)}
+        if room_ids - rooms.keys():
+            raise NotFound(_('The room has been deleted'))
+        for data in bookings:
+            data['room'] = rooms[data.pop('room_id')]
+        try:
+            created = create_bookings(bookings, session.user, prebook=is_prebooking)
+        except NoReportError as e:
+            db.session.rollback()
+            raise ExpectedError(str(e))
+        return jsonify(booking_ids=[booking.id if booking else None for booking in created])
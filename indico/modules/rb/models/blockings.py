@@ -14,7 +14,7 @@ from indico.modules.rb.models.blocking_principals import BlockingPrincipal
 from indico.modules.rb.util import rb_is_admin
 from indico.util.date_time import now_utc
 from indico.util.string import format_repr
-from indico.util.user import iter_acl
+from indico.util.user import is_user_in_acl
 from indico.web.flask.util import url_for
 
 
@@ -109,7 +109,7 @@ class Blocking(db.Model):
                 return True
             if room and room.can_manage(user, allow_admin=allow_admin):
                 return True
-        return any(user in principal for principal in iter_acl(self.allowed))
+        return is_user_in_acl(self.allowed, user)
 
     @property
     def external_details_url(self):
@@ -317,19 +317,43 @@ class Reservation(db.Model):
                         permissions, always use the given mode.
         :param ignore_admin: Whether to ignore the user's admin status.
         """
+        reservation = cls.build_from_data(room, data, user, prebook=prebook, ignore_admin=ignore_admin)
+        reservation.create_occurrences(True, allow_admin=(not ignore_admin))
+        if not any(occ.is_valid for occ in reservation.occurrences):
+            raise NoReportError(_('Reservation has no valid occurrences'))
+        db.session.flush()
+        signals.rb.booking_created.send(reservation)
+        notify_creation(reservation)
+        return reservation
 
-        populate_fields = ('start_dt', 'end_dt', 'repeat_frequency', 'repeat_interval', 'room_id', 'booking_reason')
+    @staticmethod
+    def check_data(room, data, user):
+        """Check whether the dates of a new reservation are allowed.
+
+        :param room: The Room that's being booked.
+        :param data: A dict containing the booking data
+        :param user: The :class:`.User` who creates the booking.
+        """
         if data['repeat_frequency'] == RepeatFrequency.NEVER and data['start_dt'].date() != data['end_dt'].date():
             raise ValueError('end_dt != start_dt for non-repeating booking')
+        room.check_advance_days(data['end_dt'].date(), user)
+        room.check_bookable_hours(data['start_dt'].time(), data['end_dt'].time(), user)
+
+    @classmethod
+    def build_from_data(cls, room, data, user, prebook=None, ignore_admin=False):
+        """Create a new reservation without its occurrences.
 
+        This performs all the checks of :meth:`create_from_data` which
+        do not depend on the occurrences of the reservation.  The
+        parameters are the same as for :meth:`create_from_data`.
+        """
+        populate_fields = ('start_dt', 'end_dt', 'repeat_frequency', 'repeat_interval', 'room_id', 'booking_reason')
         if prebook is None:
             prebook = not room.can_book(user, allow_admin=(not ignore_admin))
             if prebook and not room.can_prebook(user, allow_admin=(not ignore_admin)):
                 raise NoReportError('You cannot book this room')
 
-        room.check_advance_days(data['end_dt'].date(), user)
-        room.check_bookable_hours(data['start_dt'].time(), data['end_dt'].time(), user)
-
+        cls.check_data(room, data, user)
         reservation = cls()
         for field in populate_fields:
             if field in data:
@@ -339,12 +363,6 @@ class Reservation(db.Model):
         reservation.booked_for_name = reservation.booked_for_user.full_name
         reservation.state = ReservationState.pending if prebook else ReservationState.accepted
         reservation.created_by_user = user
-        reservation.create_occurrences(True, allow_admin=(not ignore_admin))
-        if not any(occ.is_valid for occ in reservation.occurrences):
-            raise NoReportError(_('Reservation has no valid occurrences'))
-        db.session.flush()
-        signals.rb.booking_created.send(reservation)
-        notify_creation(reservation)
         return reservation
 
     @staticmethod
@@ -0,0 +1,47 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from indico.core.db import db
+from indico.util.string import format_repr
+
+
+class RoomOccupancy(db.Model):
+    """Per-room daily booking totals used for the occupancy statistics.
+
+    The rows are derived from the valid reservation occurrences and kept
+    up to date whenever a booking changes; there is no row for days
+    without any valid occurrence.
+    """
+
+    __tablename__ = 'room_occupancy'
+    __table_args__ = {'schema': 'roombooking'}
+
+    room_id = db.Column(
+        db.Integer,
+        db.ForeignKey('roombooking.rooms.id'),
+        primary_key=True,
+        nullable=False
+    )
+    date = db.Column(
+        db.Date,
+        primary_key=True,
+        nullable=False,
+        index=True
+    )
+    #: The number of seconds booked within the working time periods
+    booked_time = db.Column(
+        db.Integer,
+        nullable=False
+    )
+    #: The number of valid occurrences on that day
+    occurrence_count = db.Column(
+        db.Integer,
+        nullable=False
+    )
+
+    def __repr__(self):
+        return format_repr(self, 'room_id', 'date', 'booked_time', 'occurrence_count')
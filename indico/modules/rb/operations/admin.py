@@ -14,6 +14,7 @@ from indico.modules.rb.models.equipment import EquipmentType
 from indico.modules.rb.models.map_areas import MapArea
 from indico.modules.rb.models.room_bookable_hours import BookableHours
 from indico.modules.rb.models.room_nonbookable_periods import NonBookablePeriod
+from indico.modules.rb.operations.availability import mark_rooms_changed
 
 
 @no_autoflush
@@ -47,6 +48,7 @@ def update_room_availability(room, availability):
         db.session.add_all(
             [BookableHours(room=room, start_time=hours[0], end_time=hours[1]) for hours in unique_bh])
     if 'nonbookable_periods' in availability:
+        mark_rooms_changed([room.id])
         room.nonbookable_periods.order_by(False).delete()
         unique_nbp = {(period['start_dt'], period['end_dt']) for period in availability['nonbookable_periods']}
         db.session.add_all(
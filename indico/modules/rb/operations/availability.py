@@ -0,0 +1,121 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from collections import namedtuple
+from datetime import datetime, time
+from uuid import uuid4
+
+from flask import g
+
+from indico.core.db import db
+from indico.modules.rb import rb_cache
+from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
+from indico.modules.rb.models.reservations import Reservation, ReservationState
+from indico.modules.rb.models.room_nonbookable_periods import NonBookablePeriod
+
+
+#: How long the availability of a room on a given day is kept in the cache
+AVAILABILITY_CACHE_TTL = 86400
+
+#: A period during which a room is booked or not bookable
+Period = namedtuple('Period', ('start_dt', 'end_dt'))
+
+
+def mark_rooms_changed(room_ids):
+    """Invalidate the cached availability of rooms.
+
+    The cached data is invalidated once the current transaction has
+    been committed. Until then, the availability of these rooms is
+    not taken from the cache in the current context.
+
+    :param room_ids: The IDs of the rooms whose bookings or nonbookable
+                     periods changed
+    """
+    g.setdefault('rb_changed_room_ids', set()).update(room_ids)
+
+
+def update_room_versions():
+    """Invalidate the cached availability of all rooms marked as changed.
+
+    This is called after each commit.
+    """
+    if room_ids := g.pop('rb_changed_room_ids', None):
+        rb_cache.set_many({f'room-version:{room_id}': uuid4().hex for room_id in room_ids})
+
+
+def _get_room_versions(room_ids):
+    keys = [f'room-version:{room_id}' for room_id in room_ids]
+    versions = dict(zip(room_ids, rb_cache.get_many(*keys)))
+    if missing := [room_id for room_id, version in versions.items() if version is None]:
+        for room_id in missing:
+            rb_cache.add(f'room-version:{room_id}', uuid4().hex)
+        # if the cache is not available the version stays `None`
+        versions.update(zip(missing, rb_cache.get_many(*(f'room-version:{room_id}' for room_id in missing))))
+    return versions
+
+
+def _load_rooms_daily_availability(room_ids, dates):
+    rv = {(room_id, day): {'bookings': [], 'pre_bookings': [], 'nonbookable_periods': []}
+          for room_id in room_ids
+          for day in dates}
+    query = (db.session.query(Reservation.room_id, Reservation.state, ReservationOccurrence.start_dt,
+                              ReservationOccurrence.end_dt)
+             .select_from(ReservationOccurrence)
+             .join(ReservationOccurrence.reservation)
+             .filter(Reservation.room_id.in_(room_ids),
+                     ReservationOccurrence.is_valid,
+                     ReservationOccurrence.date.in_(dates)))
+    for room_id, state, start_dt, end_dt in query:
+        key = 'bookings' if state == ReservationState.accepted else 'pre_bookings'
+        rv[room_id, start_dt.date()][key].append(Period(start_dt, end_dt))
+    periods = NonBookablePeriod.query.filter(NonBookablePeriod.room_id.in_(room_ids),
+                                             NonBookablePeriod.start_dt <= datetime.combine(max(dates), time(23, 59)),
+                                             NonBookablePeriod.end_dt >= datetime.combine(min(dates), time(0, 0)))
+    for period in periods:
+        for day in dates:
+            if period.start_dt.date() <= day <= period.end_dt.date():
+                rv[period.room_id, day]['nonbookable_periods'].append(Period(period.start_dt, period.end_dt))
+    return rv
+
+
+def get_rooms_daily_availability(rooms, dates):
+    """Get the bookings and nonbookable periods of rooms on certain days.
+
+    The data of each room and day is cached until the bookings or the
+    nonbookable periods of the room change.
+
+    :param rooms: The rooms to get the data for
+    :param dates: The dates to get the data for
+    :return: A dict mapping room IDs to dicts mapping each date to a dict
+             containing lists of `Period` tuples for the ``bookings``,
+             ``pre_bookings`` and ``nonbookable_periods`` on that day.
+    """
+    room_ids = [room.id for room in rooms]
+    dates = sorted(set(dates))
+    if not room_ids or not dates:
+        return {}
+    changed_room_ids = g.get('rb_changed_room_ids', set())
+    versions = _get_room_versions(room_ids)
+    keys = {(room_id, day): f'availability:{room_id}:{versions[room_id]}:{day.isoformat()}'
+            for room_id in room_ids
+            if versions[room_id] is not None and room_id not in changed_room_ids
+            for day in dates}
+    cached = dict(zip(keys, rb_cache.get_many(*keys.values()))) if keys else {}
+    rv = {room_id: {} for room_id in room_ids}
+    missing = set()
+    for room_id in room_ids:
+        for day in dates:
+            if (data := cached.get((room_id, day))) is not None:
+                rv[room_id][day] = data
+            else:
+                missing.add((room_id, day))
+    if missing:
+        loaded = _load_rooms_daily_availability({room_id for room_id, __ in missing}, {day for __, day in missing})
+        for room_id, day in missing:
+            rv[room_id][day] = loaded[room_id, day]
+        rb_cache.set_many({keys[key]: loaded[key] for key in missing if key in keys}, timeout=AVAILABILITY_CACHE_TTL)
+    return rv
@@ -0,0 +1,58 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import date, datetime, timedelta
+
+from indico.core import signals
+from indico.modules.rb.models.reservations import ReservationState
+from indico.modules.rb.models.room_nonbookable_periods import NonBookablePeriod
+from indico.modules.rb.operations.availability import Period, get_rooms_daily_availability, mark_rooms_changed
+
+
+pytest_plugins = 'indico.modules.rb.testing.fixtures'
+
+
+def test_get_rooms_daily_availability(db, create_reservation, create_room, dummy_room, count_queries):
+    other_room = create_room()
+    day = date(2022, 2, 1)
+    next_day = day + timedelta(days=1)
+    start_dt = datetime.combine(day, datetime.min.time())
+    create_reservation(start_dt=start_dt.replace(hour=8), end_dt=start_dt.replace(hour=10))
+    create_reservation(start_dt=start_dt.replace(hour=11), end_dt=start_dt.replace(hour=12),
+                       state=ReservationState.pending)
+    db.session.add(NonBookablePeriod(room=other_room, start_dt=start_dt, end_dt=start_dt + timedelta(days=1, hours=23)))
+    db.session.flush()
+
+    with count_queries() as cnt:
+        availability = get_rooms_daily_availability([dummy_room, other_room], [day, next_day])
+    assert cnt() == 2
+    assert availability[dummy_room.id][day] == {
+        'bookings': [Period(start_dt.replace(hour=8), start_dt.replace(hour=10))],
+        'pre_bookings': [Period(start_dt.replace(hour=11), start_dt.replace(hour=12))],
+        'nonbookable_periods': []
+    }
+    assert availability[dummy_room.id][next_day] == {'bookings': [], 'pre_bookings': [], 'nonbookable_periods': []}
+    nonbookable_period = Period(start_dt, start_dt + timedelta(days=1, hours=23))
+    assert availability[other_room.id][day]['nonbookable_periods'] == [nonbookable_period]
+    assert availability[other_room.id][next_day]['nonbookable_periods'] == [nonbookable_period]
+
+    # cached data is used until the room changes
+    create_reservation(start_dt=start_dt.replace(hour=14), end_dt=start_dt.replace(hour=15))
+    with count_queries() as cnt:
+        assert get_rooms_daily_availability([dummy_room, other_room], [day, next_day]) == availability
+    assert cnt() == 0
+
+    # changed rooms are loaded from the database until the changes have been committed
+    mark_rooms_changed([dummy_room.id])
+    with count_queries() as cnt:
+        assert len(get_rooms_daily_availability([dummy_room, other_room], [day])[dummy_room.id][day]['bookings']) == 2
+    assert cnt() == 2
+    signals.core.after_commit.send()
+    get_rooms_daily_availability([dummy_room], [day])
+    with count_queries() as cnt:
+        assert len(get_rooms_daily_availability([dummy_room], [day])[dummy_room.id][day]['bookings']) == 2
+    assert cnt() == 0
@@ -14,6 +14,7 @@ from flask import flash, session
 from pytz import timezone
 from sqlalchemy.orm import contains_eager, joinedload
 
+from indico.core import signals
 from indico.core.config import config
 from indico.core.db import db
 from indico.core.db.sqlalchemy.principals import PrincipalType
@@ -23,14 +24,16 @@ from indico.modules.events.models.events import Event
 from indico.modules.events.models.principals import EventPrincipal
 from indico.modules.rb import rb_settings
 from indico.modules.rb.models.reservation_edit_logs import ReservationEditLog
-from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
+from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence, ReservationOccurrenceState
 from indico.modules.rb.models.reservations import RepeatFrequency, Reservation, ReservationLink
 from indico.modules.rb.models.room_nonbookable_periods import NonBookablePeriod
 from indico.modules.rb.models.rooms import Room
+from indico.modules.rb.notifications.reservations import notify_creation
 from indico.modules.rb.operations.blockings import filter_blocked_rooms, get_rooms_blockings, group_blocked_rooms
-from indico.modules.rb.operations.conflicts import get_concurrent_pre_bookings, get_rooms_conflicts
+from indico.modules.rb.operations.conflicts import (get_concurrent_pre_bookings, get_rooms_conflicts,
+                                                    iter_overlapping_indices)
 from indico.modules.rb.operations.misc import get_rooms_nonbookable_periods, get_rooms_unbookable_hours
-from indico.modules.rb.util import (group_by_occurrence_date, serialize_availability, serialize_blockings,
+from indico.modules.rb.util import (group_by_occurrence_date, rb_is_admin, serialize_availability, serialize_blockings,
                                     serialize_booking_details, serialize_nonbookable_periods, serialize_occurrences,
                                     serialize_unbookable_hours)
 from indico.util.date_time import iterdays, overlaps, server_to_utc
@@ -152,8 +155,8 @@ def get_rooms_availability(rooms, start_dt, end_dt, repeat_frequency, repeat_int
 
 
 def get_room_candidates(candidates, conflicts):
-    return [candidate for candidate in candidates
-            if not (any(candidate.overlaps(conflict) for conflict in conflicts))]
+    conflicting = {i for i, __ in iter_overlapping_indices(candidates, conflicts)}
+    return [candidate for i, candidate in enumerate(candidates) if i not in conflicting]
 
 
 def _bookings_query(filters, noload_room=False):
@@ -336,6 +339,133 @@ def create_booking_for_event(room_id, event):
         return None
 
 
+def _skip_occurrence(occurrence, reason):
+    occurrence.state = ReservationOccurrenceState.cancelled
+    occurrence.rejection_reason = reason
+
+
+def create_bookings(bookings_data, user, prebook=None, ignore_admin=False):
+    """Create many bookings at once.
+
+    This is equivalent to calling :meth:`.Reservation.create_from_data`
+    for each booking, but conflicts with existing bookings, blockings
+    and nonbookable periods are checked for all bookings at once and
+    the occurrences are inserted in bulk.  When the new bookings
+    conflict with each other, earlier bookings take precedence.
+
+    :param bookings_data: A list of dicts containing the data of each
+                          booking as expected by :meth:`.Reservation.create_from_data`
+                          and the :class:`.Room` to book in ``room``.
+    :param user: The :class:`.User` who creates the bookings.
+    :param prebook: Instead of determining the booking type from the user's
+                    permissions, always use the given mode.
+    :param ignore_admin: Whether to ignore the user's admin status.
+    :return: A list containing the created :class:`.Reservation` for each
+             entry of `bookings_data`, or ``None`` if none of the booking's
+             occurrences were available and it has not been created.
+    """
+    if not bookings_data:
+        return []
+    allow_admin = not ignore_admin
+    admin = allow_admin and rb_is_admin(user)
+    rooms = {data['room'] for data in bookings_data}
+    rooms_prebook = {}
+    for room in rooms:
+        if prebook is not None:
+            rooms_prebook[room] = prebook
+        elif room.can_book(user, allow_admin=allow_admin):
+            rooms_prebook[room] = False
+        elif room.can_prebook(user, allow_admin=allow_admin):
+            rooms_prebook[room] = True
+        else:
+            raise NoReportError('You cannot book this room')
+
+    bookings_occurrences = []
+    rooms_candidates = defaultdict(list)
+    for data in bookings_data:
+        Reservation.check_data(data['room'], data, user)
+        occurrences = ReservationOccurrence.create_series(data['start_dt'], data['end_dt'],
+                                                          (data['repeat_frequency'], data.get('repeat_interval', 0)))
+        for occurrence in occurrences:
+            occurrence.state = ReservationOccurrenceState.valid
+        bookings_occurrences.append(occurrences)
+        # the candidates of each room are ordered by booking so earlier ones are handled first
+        rooms_candidates[data['room']].extend(occurrences)
+
+    start_dt = min(data['start_dt'] for data in bookings_data)
+    end_dt = max(data['end_dt'] for data in bookings_data)
+    existing_occurrences = get_existing_rooms_occurrences(rooms, start_dt, end_dt, RepeatFrequency.NEVER, None,
+                                                          allow_overlapping=True)
+    blocked_rooms = group_blocked_rooms(get_rooms_blockings(rooms, start_dt.date(), end_dt.date()))
+    nonbookable_periods = get_rooms_nonbookable_periods(rooms, start_dt, end_dt)
+    rejected_occurrences = set()
+
+    for room, candidates in rooms_candidates.items():
+        accepted = not rooms_prebook[room]
+        if not admin and not room.can_manage(user, permission='override'):
+            for i, __ in iter_overlapping_indices(candidates, nonbookable_periods.get(room.id, [])):
+                if candidates[i].is_valid:
+                    _skip_occurrence(candidates[i], 'Skipped due to nonbookable date')
+
+        blockings = [br.blocking for br in blocked_rooms.get(room.id, [])
+                     if not br.blocking.can_override(user, room=room, allow_admin=allow_admin)]
+        for blocking in blockings:
+            for candidate in candidates:
+                if candidate.is_valid and blocking.is_active_at(candidate.start_dt.date()):
+                    _skip_occurrence(candidate, f'Skipped due to collision with a blocking ({blocking.reason})')
+
+        occurrences = existing_occurrences.get(room.id, [])
+        num_conflicts = defaultdict(int)
+        pending_conflicts = defaultdict(list)
+        for i, j in iter_overlapping_indices(candidates, occurrences):
+            if occurrences[j].reservation.is_accepted:
+                num_conflicts[i] += 1
+            else:
+                pending_conflicts[i].append(occurrences[j])
+        earlier_candidates = defaultdict(list)
+        if accepted:
+            # new bookings in the same room are all either accepted or pending, and only accepted
+            # ones conflict with each other
+            for i, j in iter_overlapping_indices(candidates, candidates):
+                if j < i:
+                    earlier_candidates[i].append(candidates[j])
+        for i, candidate in enumerate(candidates):
+            if not candidate.is_valid:
+                continue
+            conflicts = num_conflicts[i] + sum(1 for x in earlier_candidates[i] if x.is_valid)
+            if conflicts:
+                _skip_occurrence(candidate, f'Skipped due to collision with {conflicts} reservation(s)')
+            elif accepted:
+                rejected_occurrences.update(pending_conflicts[i])
+
+    bookings = []
+    for data, occurrences in zip(bookings_data, bookings_occurrences):
+        if not any(occ.is_valid for occ in occurrences):
+            bookings.append(None)
+            continue
+        bookings.append(Reservation.build_from_data(data['room'], data, user, prebook=rooms_prebook[data['room']],
+                                                    ignore_admin=ignore_admin))
+    created = [booking for booking in bookings if booking is not None]
+    if not created:
+        # an empty bulk insert would try to insert a single row with only default values
+        return bookings
+    db.session.add_all(created)
+    db.session.flush()
+    db.session.execute(ReservationOccurrence.__table__.insert(), [
+        {'reservation_id': booking.id, 'start_dt': occ.start_dt, 'end_dt': occ.end_dt, 'state': occ.state,
+         'rejection_reason': occ.rejection_reason, 'notification_sent': False}
+        for booking, occurrences in zip(bookings, bookings_occurrences) if booking is not None
+        for occ in occurrences
+    ])
+    for occurrence in rejected_occurrences:
+        if occurrence.is_valid:
+            occurrence.reject(user, 'Rejected due to collision with a confirmed reservation')
+    for booking in created:
+        signals.rb.booking_created.send(booking)
+        notify_creation(booking)
+    return bookings
+
+
 def get_active_bookings(limit, start_dt, last_reservation_id=None, **filters):
     criteria = [ReservationOccurrence.start_dt > start_dt]
     if last_reservation_id is not None:
@@ -5,11 +5,12 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 
 import pytest
 
-from indico.modules.rb.models.reservations import RepeatFrequency
+from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
+from indico.modules.rb.models.reservations import RepeatFrequency, ReservationState
 
 
 pytest_plugins = 'indico.modules.rb.testing.fixtures'
@@ -61,3 +62,55 @@ def past_booking_occurrences_are_cancelled(dummy_user, create_reservation):
     number_of_cancelled_occurrences = [occ for occ in reservation.occurrences if occ.is_cancelled]
     assert number_of_cancelled_occurrences == 2
     assert len(new_reservation.occurrences) == 4
+
+
+@pytest.mark.usefixtures('smtp')
+def test_create_bookings(create_reservation, create_room, dummy_room, dummy_user, create_user):
+    from indico.modules.rb.operations.bookings import create_bookings
+
+    other_room = create_room()
+    today = datetime.combine(date.today(), time())
+    monday = today + timedelta(days=(7 - today.weekday()))
+    next_monday = monday + timedelta(days=7)
+    existing = create_reservation(start_dt=monday.replace(hour=10), end_dt=monday.replace(hour=12))
+    pending = create_reservation(start_dt=next_monday.replace(hour=8), end_dt=next_monday.replace(hour=9, minute=30),
+                                 state=ReservationState.pending, booked_for_user=create_user(123))
+    common = {'booking_reason': 'Testing', 'booked_for_user': dummy_user, 'repeat_frequency': RepeatFrequency.NEVER}
+    bookings = create_bookings([
+        # conflicts with the existing booking in the first week
+        dict(common, room=dummy_room, start_dt=monday.replace(hour=9),
+             end_dt=(next_monday + timedelta(days=7)).replace(hour=11),
+             repeat_frequency=RepeatFrequency.WEEK, repeat_interval=1),
+        # conflicts with the previous booking
+        dict(common, room=dummy_room, start_dt=next_monday.replace(hour=10), end_dt=next_monday.replace(hour=12)),
+        # no conflicts in a different room
+        dict(common, room=other_room, start_dt=monday.replace(hour=10), end_dt=monday.replace(hour=12)),
+    ], dummy_user)
+
+    weekly, conflicting, other = bookings
+    assert conflicting is None
+    assert weekly.is_accepted
+    occurrences = weekly.occurrences.order_by(ReservationOccurrence.start_dt).all()
+    assert [occ.is_valid for occ in occurrences] == [False, True, True]
+    assert occurrences[0].rejection_reason == 'Skipped due to collision with 1 reservation(s)'
+    assert other.room == other_room
+    assert other.occurrences.one().is_valid
+    assert existing.occurrences.one().is_valid
+    # pre-bookings conflicting with the new bookings are rejected
+    assert pending.is_rejected
+
+
+def test_create_bookings_all_conflicting(create_reservation, dummy_room, dummy_user):
+    from indico.modules.rb.operations.bookings import create_bookings
+
+    today = datetime.combine(date.today(), time())
+    monday = today + timedelta(days=(7 - today.weekday()))
+    existing = create_reservation(start_dt=monday.replace(hour=10), end_dt=monday.replace(hour=12))
+    common = {'booking_reason': 'Testing', 'booked_for_user': dummy_user, 'room': dummy_room,
+              'repeat_frequency': RepeatFrequency.NEVER}
+    bookings = create_bookings([
+        dict(common, start_dt=monday.replace(hour=9), end_dt=monday.replace(hour=11)),
+        dict(common, start_dt=monday.replace(hour=11), end_dt=monday.replace(hour=13)),
+    ], dummy_user)
+    assert bookings == [None, None]
+    assert dummy_room.reservations.all() == [existing]
@@ -7,7 +7,8 @@
 
 from collections import defaultdict
 from datetime import datetime
-from itertools import combinations
+from heapq import heappop, heappush
+from operator import itemgetter
 
 from flask import session
 from sqlalchemy.orm import contains_eager
@@ -72,50 +73,93 @@ def get_rooms_conflicts(rooms, start_dt, end_dt, repeat_frequency, repeat_interv
     return rooms_conflicts, rooms_pre_conflicts, rooms_conflicting_candidates
 
 
+def iter_overlapping_indices(items, others):
+    """Find all overlapping pairs between two lists of time ranges.
+
+    Rather than comparing every item with every other object, both
+    lists are sorted by their start time and swept once while keeping
+    a heap of the objects which are still "open" at the current point.
+    This takes O((n+m) log m + k) time for ``k`` overlapping pairs.
+
+    :param items: objects with ``start_dt`` and ``end_dt`` attributes
+    :param others: objects with ``start_dt`` and ``end_dt`` attributes
+    :return: an iterator yielding ``(i, j)`` tuples of the indices of
+             ``items[i]`` and ``others[j]`` which overlap (in the same
+             sense as :func:`~indico.util.date_time.overlaps`)
+    """
+    sorted_others = sorted(((other.start_dt, other.end_dt, j) for j, other in enumerate(others)), key=itemgetter(0))
+    sorted_items = sorted(((item.start_dt, item.end_dt, i) for i, item in enumerate(items)), key=itemgetter(0))
+    active = []
+    pos = 0
+    for start_dt, end_dt, i in sorted_items:
+        while pos < len(sorted_others) and sorted_others[pos][0] < end_dt:
+            other_start_dt, other_end_dt, j = sorted_others[pos]
+            heappush(active, (other_end_dt, other_start_dt, j))
+            pos += 1
+        # items are processed by ascending start time, so anything which ends before the
+        # current item starts cannot overlap with any of the remaining items either
+        while active and active[0][0] <= start_dt:
+            heappop(active)
+        for __, other_start_dt, j in active:
+            # the item may end before something added for a previous (longer) item starts
+            if other_start_dt < end_dt:
+                yield i, j
+
+
+def iter_overlapping(items, others):
+    """Find all overlapping pairs between two lists of time ranges.
+
+    This is a convenience wrapper around :func:`iter_overlapping_indices`
+    which yields ``(item, other)`` tuples instead of indices.
+    """
+    items = list(items)
+    others = list(others)
+    for i, j in iter_overlapping_indices(items, others):
+        yield items[i], others[j]
+
+
 def get_room_bookings_conflicts(candidates, occurrences, skip_conflicts_with=frozenset()):
     conflicts = set()
     pre_conflicts = set()
     conflicting_candidates = set()
-    for candidate in candidates:
-        for occurrence in occurrences:
-            if occurrence.reservation.id in skip_conflicts_with:
-                continue
-            if candidate.overlaps(occurrence):
-                overlap = candidate.get_overlap(occurrence)
-                obj = TempReservationOccurrence(*overlap, reservation=occurrence.reservation)
-                if occurrence.reservation.is_accepted:
-                    conflicting_candidates.add(candidate)
-                    conflicts.add(obj)
-                else:
-                    pre_conflicts.add(obj)
+    occurrences = [occ for occ in occurrences if occ.reservation.id not in skip_conflicts_with]
+    for candidate, occurrence in iter_overlapping(candidates, occurrences):
+        overlap = candidate.get_overlap(occurrence)
+        obj = TempReservationOccurrence(*overlap, reservation=occurrence.reservation)
+        if occurrence.reservation.is_accepted:
+            conflicting_candidates.add(candidate)
+            conflicts.add(obj)
+        else:
+            pre_conflicts.add(obj)
     return conflicts, pre_conflicts, conflicting_candidates
 
 
 def get_room_blockings_conflicts(room_id, candidates, occurrences, allow_admin):
     conflicts = set()
     conflicting_candidates = set()
+    room = Room.get(room_id)
+    # whether a blocking can be overridden does not depend on the candidate
+    blockings = [occurrence.blocking for occurrence in occurrences
+                 if not occurrence.blocking.can_override(session.user, room=room, allow_admin=allow_admin)]
+    if not blockings:
+        return conflicts, conflicting_candidates
     for candidate in candidates:
-        for occurrence in occurrences:
-            blocking = occurrence.blocking
-            if blocking.start_date <= candidate.start_dt.date() <= blocking.end_date:
-                if blocking.can_override(session.user, room=Room.get(room_id), allow_admin=allow_admin):
-                    continue
-                conflicting_candidates.add(candidate)
-                obj = TempReservationOccurrence(candidate.start_dt, candidate.end_dt, None)
-                conflicts.add(obj)
+        candidate_date = candidate.start_dt.date()
+        if any(blocking.start_date <= candidate_date <= blocking.end_date for blocking in blockings):
+            conflicting_candidates.add(candidate)
+            obj = TempReservationOccurrence(candidate.start_dt, candidate.end_dt, None)
+            conflicts.add(obj)
     return conflicts, conflicting_candidates
 
 
 def get_room_nonbookable_periods_conflicts(candidates, occurrences):
     conflicts = set()
     conflicting_candidates = set()
-    for candidate in candidates:
-        for occurrence in occurrences:
-            overlap = get_overlap((candidate.start_dt, candidate.end_dt), (occurrence.start_dt, occurrence.end_dt))
-            if overlap.count(None) != len(overlap):
-                conflicting_candidates.add(candidate)
-                obj = TempReservationOccurrence(overlap[0], overlap[1], None)
-                conflicts.add(obj)
+    for candidate, occurrence in iter_overlapping(candidates, occurrences):
+        overlap = get_overlap((candidate.start_dt, candidate.end_dt), (occurrence.start_dt, occurrence.end_dt))
+        conflicting_candidates.add(candidate)
+        obj = TempReservationOccurrence(overlap[0], overlap[1], None)
+        conflicts.add(obj)
     return conflicts, conflicting_candidates
 
 
@@ -137,12 +181,13 @@ def get_room_unbookable_hours_conflicts(candidates, occurrences):
 
 
 def get_concurrent_pre_bookings(pre_bookings, skip_conflicts_with=frozenset()):
+    pre_bookings = [x for x in pre_bookings if x.reservation.id not in skip_conflicts_with]
+    # keep the order in which the pairs used to be generated by `combinations`
+    pairs = sorted((i, j) for i, j in iter_overlapping_indices(pre_bookings, pre_bookings) if i < j)
     concurrent_pre_bookings = []
-    for (x, y) in combinations(pre_bookings, 2):
-        if any(pre_booking.reservation.id in skip_conflicts_with for pre_booking in [x, y]):
-            continue
-        if x.overlaps(y):
-            overlap = x.get_overlap(y)
-            obj = TempReservationConcurrentOccurrence(*overlap, reservations=[x.reservation, y.reservation])
-            concurrent_pre_bookings.append(obj)
+    for i, j in pairs:
+        x, y = pre_bookings[i], pre_bookings[j]
+        overlap = x.get_overlap(y)
+        obj = TempReservationConcurrentOccurrence(*overlap, reservations=[x.reservation, y.reservation])
+        concurrent_pre_bookings.append(obj)
     return concurrent_pre_bookings
@@ -0,0 +1,44 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from indico.modules.rb.operations.conflicts import iter_overlapping, iter_overlapping_indices
+from indico.util.date_time import overlaps
+
+
+def _make_range(start, duration):
+    start_dt = datetime(2022, 1, 1) + timedelta(minutes=start)
+    return SimpleNamespace(start_dt=start_dt, end_dt=start_dt + timedelta(minutes=duration))
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_iter_overlapping_indices(seed):
+    rnd = random.Random(seed)
+    items = [_make_range(rnd.randrange(0, 2000, 15), rnd.randrange(15, 300, 15)) for __ in range(50)]
+    others = [_make_range(rnd.randrange(0, 2000, 15), rnd.randrange(15, 300, 15)) for __ in range(50)]
+    expected = {(i, j)
+                for i, item in enumerate(items)
+                for j, other in enumerate(others)
+                if overlaps((item.start_dt, item.end_dt), (other.start_dt, other.end_dt))}
+    result = list(iter_overlapping_indices(items, others))
+    assert len(result) == len(expected)
+    assert set(result) == expected
+
+
+def test_iter_overlapping_edges():
+    first = _make_range(0, 60)
+    adjacent = _make_range(60, 60)
+    inside = _make_range(10, 20)
+    assert list(iter_overlapping([first], [adjacent])) == []
+    assert list(iter_overlapping([first], [inside])) == [(first, inside)]
+    assert list(iter_overlapping([inside, adjacent], [first])) == [(inside, first)]
+    assert list(iter_overlapping([], [first])) == []
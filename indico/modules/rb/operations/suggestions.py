@@ -8,17 +8,20 @@
 from datetime import datetime, timedelta
 from functools import cmp_to_key
 
+from flask import session
+
 from indico.modules.rb import rb_settings
 from indico.modules.rb.models.blocked_rooms import BlockedRoomState
 from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
 from indico.modules.rb.models.reservations import RepeatFrequency
+from indico.modules.rb.operations.availability import get_rooms_daily_availability
 from indico.modules.rb.operations.blockings import get_blocked_rooms, get_rooms_blockings, group_blocked_rooms
-from indico.modules.rb.operations.bookings import get_existing_rooms_occurrences
-from indico.modules.rb.operations.conflicts import get_rooms_conflicts
-from indico.modules.rb.operations.misc import get_rooms_nonbookable_periods, get_rooms_unbookable_hours
+from indico.modules.rb.operations.conflicts import (get_room_blockings_conflicts,
+                                                    get_room_nonbookable_periods_conflicts,
+                                                    get_room_unbookable_hours_conflicts, iter_overlapping)
+from indico.modules.rb.operations.misc import get_rooms_unbookable_hours
 from indico.modules.rb.operations.rooms import search_for_rooms
-from indico.modules.rb.util import group_by_occurrence_date
-from indico.util.date_time import overlaps
+from indico.util.date_time import iterdays, overlaps
 
 
 BOOKING_TIME_DIFF = 20  # (minutes)
@@ -44,21 +47,24 @@ def get_single_booking_suggestions(rooms, start_dt, end_dt, limit=None):
     data = []
     new_start_dt = start_dt - timedelta(minutes=BOOKING_TIME_DIFF)
     new_end_dt = end_dt + timedelta(minutes=BOOKING_TIME_DIFF)
-    nonbookable_periods = get_rooms_nonbookable_periods(rooms, start_dt, end_dt)
-    rooms = [room for room in rooms if room.id not in nonbookable_periods]
+    dates = [dt.date() for dt in iterdays(new_start_dt, new_end_dt)]
+    availability = get_rooms_daily_availability(rooms, dates)
+    rooms = [room for room in rooms
+             if not any(availability[room.id][dt.date()]['nonbookable_periods'] for dt in iterdays(start_dt, end_dt))]
 
     if not rooms:
         return data
 
     unbookable_hours = get_rooms_unbookable_hours(rooms)
-    rooms_occurrences = get_existing_rooms_occurrences(rooms, new_start_dt, new_end_dt, RepeatFrequency.NEVER, None,
-                                                       allow_overlapping=True)
     for room in rooms:
         if limit and len(data) == limit:
             break
 
         suggestions = {}
-        taken_periods = [(occ.start_dt, occ.end_dt) for occ in rooms_occurrences.get(room.id, [])]
+        taken_periods = [(period.start_dt, period.end_dt)
+                         for day in availability[room.id].values()
+                         for period in day['bookings'] + day['pre_bookings']
+                         if period.start_dt < new_end_dt and period.end_dt > new_start_dt]
         if room.id in unbookable_hours:
             taken_periods.extend((datetime.combine(start_dt, uh.start_time), datetime.combine(end_dt, uh.end_time))
                                  for uh in unbookable_hours[room.id])
@@ -86,9 +92,7 @@ def get_recurring_booking_suggestions(rooms, start_dt, end_dt, repeat_frequency,
     candidates = ReservationOccurrence.create_series(start_dt, end_dt, (repeat_frequency, repeat_interval))
     blocked_rooms = group_blocked_rooms(get_rooms_blockings(rooms, start_dt.date(), end_dt.date()))
     unbookable_hours = get_rooms_unbookable_hours(rooms)
-    nonbookable_periods = get_rooms_nonbookable_periods(rooms, start_dt, end_dt)
-    conflicts = get_rooms_conflicts(rooms, start_dt, end_dt, repeat_frequency, repeat_interval, blocked_rooms,
-                                    nonbookable_periods, unbookable_hours)[0]
+    availability = get_rooms_daily_availability(rooms, [candidate.start_dt.date() for candidate in candidates])
     for room in rooms:
         if limit and len(data) == limit:
             break
@@ -101,7 +105,10 @@ def get_recurring_booking_suggestions(rooms, start_dt, end_dt, repeat_frequency,
             suggestions['shorten'] = excess_days
 
         if not limit_exceeded:
-            number_of_conflicting_days = len(group_by_occurrence_date(conflicts.get(room.id, [])))
+            conflicting_candidates = _get_room_conflicting_candidates(room, candidates, availability[room.id],
+                                                                      blocked_rooms.get(room.id),
+                                                                      unbookable_hours.get(room.id))
+            number_of_conflicting_days = len({candidate.start_dt.date() for candidate in conflicting_candidates})
             if number_of_conflicting_days and number_of_conflicting_days < len(candidates):
                 suggestions['skip'] = number_of_conflicting_days
         if suggestions:
@@ -109,6 +116,21 @@ def get_recurring_booking_suggestions(rooms, start_dt, end_dt, repeat_frequency,
     return data
 
 
+def _get_room_conflicting_candidates(room, candidates, availability, blocked_rooms, unbookable_hours):
+    bookings = [period for day in availability.values() for period in day['bookings']]
+    conflicting_candidates = {candidate for candidate, __ in iter_overlapping(candidates, bookings)}
+    if blocked_rooms:
+        conflicting_candidates |= get_room_blockings_conflicts(room.id, candidates, blocked_rooms, allow_admin=False)[1]
+    # nonbookable periods spanning several days show up on each of these days
+    nonbookable_periods = {period for day in availability.values() for period in day['nonbookable_periods']}
+    if (nonbookable_periods or unbookable_hours) and not room.can_override(session.user, allow_admin=False):
+        if nonbookable_periods:
+            conflicting_candidates |= get_room_nonbookable_periods_conflicts(candidates, nonbookable_periods)[1]
+        if unbookable_hours:
+            conflicting_candidates |= get_room_unbookable_hours_conflicts(candidates, unbookable_hours)[1]
+    return conflicting_candidates
+
+
 def get_start_time_suggestion(occurrences, from_, to):
     duration = (to - from_).total_seconds() / 60
     new_start_dt = from_ - timedelta(minutes=BOOKING_TIME_DIFF)
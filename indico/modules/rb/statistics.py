@@ -8,10 +8,12 @@
 from datetime import date, datetime, time
 
 from dateutil.relativedelta import relativedelta
+from sqlalchemy.dialects.postgresql import insert
 
 from indico.core.db import db
 from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
 from indico.modules.rb.models.reservations import Reservation
+from indico.modules.rb.models.room_occupancy import RoomOccupancy
 from indico.util.date_time import iterdays
 
 
@@ -35,27 +37,76 @@ def calculate_rooms_booked_time(rooms, start_date=None, end_date=None):
     if start_date is None:
         start_date = end_date - relativedelta(days=29)
     # Reservations on working days
-    reservations_query = (Reservation.query
-                          .filter(Reservation.room_id.in_(r.id for r in rooms),
-                                  db.extract('dow', ReservationOccurrence.start_dt).between(1, 5),
-                                  db.cast(ReservationOccurrence.start_dt, db.Date) >= start_date,
-                                  db.cast(ReservationOccurrence.end_dt, db.Date) <= end_date,
-                                  ReservationOccurrence.is_valid)
-                          .join(Reservation.occurrences))
+    return (db.session.query(db.func.sum(RoomOccupancy.booked_time))
+            .filter(RoomOccupancy.room_id.in_(r.id for r in rooms),
+                    db.extract('dow', RoomOccupancy.date).between(1, 5),
+                    RoomOccupancy.date.between(start_date, end_date))
+            .scalar() or 0)
 
+
+def calculate_rooms_occurrence_count(rooms, start_date, end_date):
+    return (db.session.query(db.func.sum(RoomOccupancy.occurrence_count))
+            .filter(RoomOccupancy.room_id.in_(r.id for r in rooms),
+                    RoomOccupancy.date.between(start_date, end_date))
+            .scalar() or 0)
+
+
+def _get_working_time_overlap():
     rsv_start = db.cast(ReservationOccurrence.start_dt, db.TIME)
     rsv_end = db.cast(ReservationOccurrence.end_dt, db.TIME)
     slots = ((db.cast(start, db.TIME), db.cast(end, db.TIME)) for start, end in WORKING_TIME_PERIODS)
 
     # this basically handles all possible ways an occurrence overlaps with each one of the working time slots
-    overlaps = sum(db.case([
+    return sum(db.case([
         ((rsv_start < start) & (rsv_end > end), db.extract('epoch', end - start)),
         ((rsv_start < start) & (rsv_end > start) & (rsv_end <= end), db.extract('epoch', rsv_end - start)),
         ((rsv_start >= start) & (rsv_start < end) & (rsv_end > end), db.extract('epoch', end - rsv_start)),
         ((rsv_start >= start) & (rsv_end <= end), db.extract('epoch', rsv_end - rsv_start))
     ], else_=0) for start, end in slots)
 
-    return reservations_query.with_entities(db.func.sum(overlaps)).scalar() or 0
+
+def refresh_room_occupancy(room_ids=None, start_date=None, end_date=None, skip_reservation_id=None):
+    """Recalculate the daily occupancy totals of rooms.
+
+    All arguments are optional and restrict the part of the
+    :class:`RoomOccupancy` table which is recalculated; when called
+    without any arguments the whole table is rebuilt.
+
+    :param room_ids: The ids of the rooms to update.
+    :param start_date: The first day to update.
+    :param end_date: The last day to update.
+    :param skip_reservation_id: The id of a reservation to ignore, e.g.
+                                because it is about to be deleted.
+    """
+    occurrence_filters = [ReservationOccurrence.is_valid]
+    occupancy_filters = []
+    if room_ids is not None:
+        occurrence_filters.append(Reservation.room_id.in_(room_ids))
+        occupancy_filters.append(RoomOccupancy.room_id.in_(room_ids))
+    if start_date is not None:
+        occurrence_filters.append(ReservationOccurrence.date >= start_date)
+        occupancy_filters.append(RoomOccupancy.date >= start_date)
+    if end_date is not None:
+        occurrence_filters.append(ReservationOccurrence.date <= end_date)
+        occupancy_filters.append(RoomOccupancy.date <= end_date)
+    if skip_reservation_id is not None:
+        occurrence_filters.append(Reservation.id != skip_reservation_id)
+
+    db.session.flush()
+    RoomOccupancy.query.filter(*occupancy_filters).delete(synchronize_session=False)
+    query = (db.session.query(Reservation.room_id,
+                              ReservationOccurrence.date,
+                              db.cast(db.func.sum(_get_working_time_overlap()), db.Integer),
+                              db.func.count())
+             .join(Reservation.occurrences)
+             .filter(*occurrence_filters)
+             .group_by(Reservation.room_id, ReservationOccurrence.date))
+    cols = ('room_id', 'date', 'booked_time', 'occurrence_count')
+    stmt = insert(RoomOccupancy).from_select(cols, query)
+    # concurrent updates of the same room may have inserted the rows already
+    stmt = stmt.on_conflict_do_update(index_elements=['room_id', 'date'],
+                                      set_={col: stmt.excluded[col] for col in cols[2:]})
+    db.session.execute(stmt)
 
 
 def calculate_rooms_occupancy(rooms, start=None, end=None):
@@ -0,0 +1,43 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import datetime, timedelta
+
+from indico.modules.rb.models.room_occupancy import RoomOccupancy
+from indico.modules.rb.statistics import (calculate_rooms_booked_time, calculate_rooms_occurrence_count,
+                                          refresh_room_occupancy)
+
+
+pytest_plugins = 'indico.modules.rb.testing.fixtures'
+
+
+def test_room_occupancy(db, create_reservation, create_room, dummy_room, dummy_user):
+    other_room = create_room()
+    monday = datetime(2022, 1, 10)
+    saturday = monday + timedelta(days=5)
+    # 1.5h and 1h within the working hours
+    create_reservation(start_dt=monday.replace(hour=8), end_dt=monday.replace(hour=10))
+    create_reservation(start_dt=monday.replace(hour=12), end_dt=monday.replace(hour=14))
+    # weekends do not count towards the occupancy
+    weekend_reservation = create_reservation(start_dt=saturday.replace(hour=9), end_dt=saturday.replace(hour=11))
+    create_reservation(start_dt=monday.replace(hour=9), end_dt=monday.replace(hour=10), room=other_room)
+    assert not RoomOccupancy.query.has_rows()
+
+    refresh_room_occupancy()
+    start_date = monday.date()
+    end_date = saturday.date()
+    assert RoomOccupancy.query.count() == 3
+    assert calculate_rooms_booked_time([dummy_room], start_date, end_date) == 2.5 * 3600
+    assert calculate_rooms_booked_time([dummy_room, other_room], start_date, end_date) == 3.5 * 3600
+    assert calculate_rooms_booked_time([dummy_room], start_date + timedelta(days=1), end_date) == 0
+    assert calculate_rooms_occurrence_count([dummy_room], start_date, end_date) == 3
+    assert calculate_rooms_occurrence_count([dummy_room], start_date, start_date) == 2
+
+    # rejecting a booking updates the statistics right away
+    weekend_reservation.reject(dummy_user, 'Testing', silent=True)
+    assert calculate_rooms_occurrence_count([dummy_room], start_date, end_date) == 2
+    assert not RoomOccupancy.query.filter_by(date=end_date).has_rows()
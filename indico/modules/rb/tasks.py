@@ -10,6 +10,7 @@ from itertools import groupby
 from operator import attrgetter
 
 from celery.schedules import crontab
+from dateutil.relativedelta import relativedelta
 from sqlalchemy.orm import contains_eager, noload
 
 from indico.core.celery import celery
@@ -21,6 +22,7 @@ from indico.modules.rb.models.reservations import RepeatFrequency, Reservation
 from indico.modules.rb.models.rooms import Room
 from indico.modules.rb.notifications.reservation_occurrences import notify_upcoming_occurrences
 from indico.modules.rb.notifications.reservations import notify_about_finishing_bookings
+from indico.modules.rb.statistics import refresh_room_occupancy
 from indico.util.console import cformat
 
 
@@ -170,3 +172,18 @@ def roombooking_end_notifications():
             user_reservation.end_notification_sent = True
 
     db.session.commit()
+
+
+@celery.periodic_task(name='roombooking_occupancy', run_every=crontab(minute='30', hour='3'))
+def roombooking_occupancy():
+    """Recalculate the room occupancy statistics.
+
+    They are kept up to date when bookings change, but recalculating the
+    period shown in the room details regularly makes sure that changes
+    done outside the usual code paths (e.g. manually in the database) are
+    not reflected in the statistics forever.
+    """
+    if not config.ENABLE_ROOMBOOKING:
+        return
+    refresh_room_occupancy(start_date=(date.today() - relativedelta(years=1, days=1)))
+    db.session.commit()
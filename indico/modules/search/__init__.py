@@ -26,3 +26,39 @@ def _add_conference_search_box(event, **kwargs):
         request.endpoint != 'search.event_search'
     ):
         return render_template('search/event_search_bar.html', event=event)
+
+
+@signals.event.created.connect
+@signals.event.updated.connect
+@signals.event.restored.connect
+@signals.event.contribution_created.connect
+@signals.event.contribution_updated.connect
+@signals.attachments.attachment_created.connect
+@signals.attachments.attachment_updated.connect
+@signals.event.notes.note_added.connect
+@signals.event.notes.note_modified.connect
+@signals.event.notes.note_restored.connect
+def _update_search_document(sender, **kwargs):
+    from .util import update_search_document
+    update_search_document(sender)
+
+
+@signals.event.cloned.connect
+def _update_cloned_event_search_documents(sender, new_event, **kwargs):
+    from .util import update_event_search_documents
+    update_event_search_documents(new_event)
+
+
+@signals.event.imported.connect
+def _update_imported_event_search_documents(sender, **kwargs):
+    from .util import update_event_search_documents
+    update_event_search_documents(sender)
+
+
+@signals.event.deleted.connect
+@signals.event.contribution_deleted.connect
+@signals.attachments.attachment_deleted.connect
+@signals.event.notes.note_deleted.connect
+def _delete_search_document(sender, **kwargs):
+    from .util import delete_search_document
+    delete_search_document(sender)
@@ -7,10 +7,13 @@
 
 import itertools
 
+from sqlalchemy import select
 from sqlalchemy.orm import contains_eager, joinedload, load_only, raiseload, selectinload, subqueryload, undefer
 
+from indico.core import signals
 from indico.core.db import db
 from indico.core.db.sqlalchemy.links import LinkType
+from indico.core.db.sqlalchemy.principals import PrincipalType
 from indico.core.db.sqlalchemy.protection import ProtectionMode
 from indico.core.db.sqlalchemy.util.queries import get_n_matching
 from indico.modules.attachments.models.attachments import Attachment
@@ -28,6 +31,7 @@ from indico.modules.events.sessions.models.blocks import SessionBlock
 from indico.modules.events.sessions.models.principals import SessionPrincipal
 from indico.modules.events.sessions.models.sessions import Session
 from indico.modules.search.base import IndicoSearchProvider, SearchTarget
+from indico.modules.search.models.documents import SearchDocument
 from indico.modules.search.result_schemas import (AttachmentResultSchema, CategoryResultSchema,
                                                   ContributionResultSchema, EventNoteResultSchema, EventResultSchema)
 from indico.modules.search.schemas import (AttachmentSchema, DetailedCategorySchema, HTMLStrippingContributionSchema,
@@ -60,6 +64,80 @@ def _apply_contrib_access_strategy(rel):
     return rel
 
 
+def _make_acl_entry_criterion(principal_cls, user):
+    """Create a filter for ACL entries which may grant access to a user.
+
+    Entries for users, emails and local groups are checked in SQL. Any
+    other kind of principal (e.g. a multipass group or an event role)
+    may contain the user as well, so such entries always match and the
+    actual access check has to be done in Python.
+    """
+    simple_types = {PrincipalType.user, PrincipalType.local_group}
+    if principal_cls.allow_emails:
+        simple_types.add(PrincipalType.email)
+    criteria = [principal_cls.type.notin_(simple_types)]
+    if user is not None:
+        criteria.append((principal_cls.type == PrincipalType.user) & (principal_cls.user_id == user.id))
+        if user.local_groups:
+            criteria.append((principal_cls.type == PrincipalType.local_group) &
+                            principal_cls.local_group_id.in_(g.id for g in user.local_groups))
+        if principal_cls.allow_emails:
+            criteria.append((principal_cls.type == PrincipalType.email) & principal_cls.email.in_(user.all_emails))
+    return db.or_(*criteria)
+
+
+def _make_category_chain_criterion(category_id_column, category_ids):
+    if not category_ids:
+        return db.false()
+    cte = Category.get_tree_cte()
+    return category_id_column.in_(select([cte.c.id]).where(cte.c.path.overlap(list(category_ids))))
+
+
+class _AccessFilter:
+    """Build SQL filters which skip objects a user certainly cannot access.
+
+    The filters only take into account public objects and ACL entries
+    of the object itself and its parents, which is enough to exclude
+    almost all inaccessible objects without loading them.  They never
+    exclude an object the user may be able to access, so the results
+    still need to be checked using `can_access`.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.category_ids = {id_ for id_, in (db.session.query(CategoryPrincipal.category_id)
+                                              .filter(_make_acl_entry_criterion(CategoryPrincipal, user)))}
+
+    @staticmethod
+    def is_applicable(user, admin_override_enabled):
+        if user and user.is_admin and admin_override_enabled:
+            return False
+        # plugins may grant access regardless of the ACLs
+        return not any(signal.has_receivers_for(cls)
+                       for signal in (signals.acl.can_access, signals.acl.can_manage)
+                       for cls in (Category, Event, Session, Contribution))
+
+    def category_criterion(self):
+        return db.or_(Category.effective_protection_mode == ProtectionMode.public,
+                      _make_category_chain_criterion(Category.id, self.category_ids))
+
+    def event_criterion(self):
+        # unlisted events have no effective protection mode
+        return db.or_(Event.effective_protection_mode == ProtectionMode.public,
+                      Event.protection_mode == ProtectionMode.public,
+                      Event.access_key != '',
+                      Event.acl_entries.any(_make_acl_entry_criterion(EventPrincipal, self.user)),
+                      _make_category_chain_criterion(Event.category_id, self.category_ids))
+
+    def contribution_criterion(self):
+        return db.or_(Contribution.effective_protection_mode == ProtectionMode.public,
+                      Contribution.acl_entries.any(_make_acl_entry_criterion(ContributionPrincipal, self.user)),
+                      Contribution.session.has(
+                          Session.acl_entries.any(_make_acl_entry_criterion(SessionPrincipal, self.user))
+                      ),
+                      self.event_criterion())
+
+
 class InternalSearch(IndicoSearchProvider):
     def search(self, query, user=None, page=None, object_types=(), *, admin_override_enabled=False,
                **params):
@@ -88,7 +166,9 @@ class InternalSearch(IndicoSearchProvider):
             'results': results,
         }
 
-    def _paginate(self, query, page, column, user, admin_override_enabled):
+    def _paginate(self, query, page, column, user, admin_override_enabled, access_criterion=None):
+        # the pagination key is loaded along with each object since it may be computed in SQL
+        query = query.add_columns(column)
         reverse = False
         pagenav = {'prev': None, 'next': None}
         if not page:
@@ -103,6 +183,16 @@ class InternalSearch(IndicoSearchProvider):
             pagenav['next'] = -(page - 1)
             reverse = True
 
+        # most objects which are not filtered out in SQL are accessible, so there
+        # is no need to load many more objects than needed for a single page
+        prefetch_factor = 20
+        if access_criterion is not None and _AccessFilter.is_applicable(user, admin_override_enabled):
+            query = query.filter(access_criterion(_AccessFilter(user)))
+            prefetch_factor = 2
+
+        def _continue_after(query, row):
+            return query.filter(column > row[1] if reverse else column < row[1])
+
         preloaded_categories = set()
 
         def _preload_categories(objs):
@@ -161,21 +251,34 @@ class InternalSearch(IndicoSearchProvider):
             return (protection_mode == ProtectionMode.public or
                     obj.can_access(user, allow_admin=admin_override_enabled))
 
-        res = get_n_matching(query, self.RESULTS_PER_PAGE + 1, _can_access, prefetch_factor=20,
-                             preload_bulk=_preload_categories)
+        res = get_n_matching(query, self.RESULTS_PER_PAGE + 1, lambda row: _can_access(row[0]),
+                             prefetch_factor=prefetch_factor, continue_after=_continue_after,
+                             preload_bulk=lambda rows: _preload_categories([row[0] for row in rows]))
 
         if len(res) > self.RESULTS_PER_PAGE:
             # we queried 1 more so we can see if there are more results available
             del res[self.RESULTS_PER_PAGE:]
             if reverse:
-                pagenav['prev'] = -res[-1].id
+                pagenav['prev'] = -res[-1][1]
             else:
-                pagenav['next'] = res[-1].id
+                pagenav['next'] = res[-1][1]
 
         if reverse:
             res.reverse()
 
-        return res, pagenav
+        return [row[0] for row in res], pagenav
+
+    def _get_ranked_key(self, q, column):
+        # The rank and the ID are combined in a single integer so the results can be ordered
+        # by relevance while still supporting pagination with a simple numeric page value.
+        # The rank is between 0 and 1 and IDs are never larger than 2^31, so the key fits
+        # in the range of integers JavaScript can represent accurately.
+        rank = db.cast(db.func.floor(SearchDocument.rank(q) * 1000000), db.BigInteger)
+        return rank * 2**31 + column
+
+    def _join_search_document(self, query, object_type, column):
+        return query.join(SearchDocument, db.and_(SearchDocument.object_type == object_type,
+                                                  SearchDocument.object_id == column))
 
     def search_categories(self, q, user, page, category_id, admin_override_enabled):
         query = Category.query if not category_id else Category.get(category_id).deep_children_query
@@ -187,13 +290,14 @@ class InternalSearch(IndicoSearchProvider):
                           undefer(Category.effective_protection_mode),
                           subqueryload(Category.acl_entries)))
 
-        objs, pagenav = self._paginate(query, page, Category.id, user, admin_override_enabled)
+        objs, pagenav = self._paginate(query, page, Category.id, user, admin_override_enabled,
+                                       access_criterion=_AccessFilter.category_criterion)
         res = DetailedCategorySchema(many=True).dump(objs)
         return pagenav, CategoryResultSchema(many=True).load(res)
 
     def search_events(self, q, user, page, category_id, admin_override_enabled):
         filters = [
-            Event.title_matches(q),
+            SearchDocument.matches(q),
             ~Event.is_deleted
         ]
 
@@ -201,7 +305,7 @@ class InternalSearch(IndicoSearchProvider):
             filters.append(Event.category_chain_overlaps(category_id))
 
         query = (
-            Event.query
+            self._join_search_document(Event.query, SearchTarget.event, Event.id)
             .filter(*filters)
             .options(
                 load_only('id', 'category_id', 'access_key', 'protection_mode'),
@@ -209,7 +313,8 @@ class InternalSearch(IndicoSearchProvider):
                 _apply_acl_entry_strategy(selectinload(Event.acl_entries), EventPrincipal)
             )
         )
-        objs, pagenav = self._paginate(query, page, Event.id, user, admin_override_enabled)
+        objs, pagenav = self._paginate(query, page, self._get_ranked_key(q, Event.id), user, admin_override_enabled,
+                                       access_criterion=_AccessFilter.event_criterion)
 
         query = (
             Event.query
@@ -232,7 +337,7 @@ class InternalSearch(IndicoSearchProvider):
         # does not really work when we do not have a single unique ID
 
         contrib_filters = [
-            Contribution.title_matches(q) | Contribution.description_matches(q),
+            SearchDocument.matches(q),
             ~Contribution.is_deleted,
             ~Event.is_deleted
         ]
@@ -243,7 +348,7 @@ class InternalSearch(IndicoSearchProvider):
             contrib_filters.append(Contribution.event_id == event_id)
 
         query = (
-            Contribution.query
+            self._join_search_document(Contribution.query, SearchTarget.contribution, Contribution.id)
             .filter(*contrib_filters)
             .join(Contribution.event)
             .options(
@@ -260,7 +365,9 @@ class InternalSearch(IndicoSearchProvider):
             )
         )
 
-        objs, pagenav = self._paginate(query, page, Contribution.id, user, admin_override_enabled)
+        objs, pagenav = self._paginate(query, page, self._get_ranked_key(q, Contribution.id), user,
+                                       admin_override_enabled,
+                                       access_criterion=_AccessFilter.contribution_criterion)
 
         event_strategy = joinedload(Contribution.event)
         event_strategy.joinedload(Event.own_venue)
@@ -354,7 +461,7 @@ class InternalSearch(IndicoSearchProvider):
         _apply_acl_entry_strategy(session_strategy.selectinload(Session.acl_entries), SessionPrincipal)
 
         attachment_filters = [
-            Attachment.title_matches(q),
+            SearchDocument.matches(q),
             ~Attachment.is_deleted,
             ~AttachmentFolder.is_deleted,
             AttachmentFolder.link_type != LinkType.category,
@@ -386,7 +493,7 @@ class InternalSearch(IndicoSearchProvider):
             attachment_filters.append(AttachmentFolder.event_id == event_id)
 
         query = (
-            Attachment.query
+            self._join_search_document(Attachment.query, SearchTarget.attachment, Attachment.id)
             .join(Attachment.folder)
             .filter(*attachment_filters)
             .options(folder_strategy, attachment_strategy, joinedload(Attachment.user).joinedload('_affiliation'))
@@ -402,7 +509,8 @@ class InternalSearch(IndicoSearchProvider):
             .outerjoin(Session.event.of_type(session_event))
         )
 
-        objs, pagenav = self._paginate(query, page, Attachment.id, user, admin_override_enabled)
+        objs, pagenav = self._paginate(query, page, self._get_ranked_key(q, Attachment.id), user,
+                                       admin_override_enabled)
 
         query = (
             Attachment.query
@@ -475,7 +583,7 @@ class InternalSearch(IndicoSearchProvider):
         _apply_acl_entry_strategy(session_strategy.selectinload(Session.acl_entries), SessionPrincipal)
 
         note_filters = [
-            EventNote.html_matches(q),
+            SearchDocument.matches(q),
             ~EventNote.is_deleted,
             db.or_(
                 EventNote.link_type != LinkType.event,
@@ -505,7 +613,7 @@ class InternalSearch(IndicoSearchProvider):
             note_filters.append(EventNote.event_id == event_id)
 
         query = (
-            EventNote.query
+            self._join_search_document(EventNote.query, SearchTarget.event_note, EventNote.id)
             .filter(*note_filters)
             .options(note_strategy)
             .outerjoin(EventNote.linked_event)
@@ -520,7 +628,8 @@ class InternalSearch(IndicoSearchProvider):
             .outerjoin(Session.event.of_type(session_event))
         )
 
-        objs, pagenav = self._paginate(query, page, EventNote.id, user, admin_override_enabled)
+        objs, pagenav = self._paginate(query, page, self._get_ranked_key(q, EventNote.id), user,
+                                       admin_override_enabled)
 
         query = (
             EventNote.query
@@ -0,0 +1,80 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import pytest
+
+from indico.core.db.sqlalchemy.protection import ProtectionMode
+from indico.modules.events import Event
+
+
+@pytest.mark.parametrize('sql_filter', (False, True))
+def test_paginate_events(db, create_category, create_event, create_user, dummy_group, sql_filter):
+    # importing this module at collection time fails since not all models are loaded yet
+    from indico.modules.search.internal import InternalSearch, _AccessFilter
+    user = create_user(123)
+    dummy_group.group.members.add(user)
+    protected_category = create_category(title='Protected', protection_mode=ProtectionMode.protected)
+    shared_category = create_category(title='Shared', parent=protected_category)
+    shared_category.update_principal(user, read_access=True)
+    expected = set()
+    for i in range(60):
+        event = create_event(title=f'test {i}', category=protected_category)
+        if i % 10 == 0:
+            event.update_principal(dummy_group, read_access=True)
+            expected.add(event)
+        elif i % 10 == 5:
+            event.category = shared_category
+            expected.add(event)
+    expected.add(create_event(title='test public', protection_mode=ProtectionMode.public,
+                              category=protected_category))
+    create_event(title='test other', protection_mode=ProtectionMode.protected, category=shared_category)
+    db.session.flush()
+
+    search = InternalSearch()
+    access_criterion = _AccessFilter.event_criterion if sql_filter else None
+    if sql_filter:
+        query = Event.query.filter(access_criterion(_AccessFilter(user)))
+        # events which the user certainly cannot access are skipped in SQL
+        assert set(query) == expected | {e for e in shared_category.events if e.title == 'test other'}
+    results, pagenav = search._paginate(Event.query, None, Event.id, user, False, access_criterion=access_criterion)
+    assert len(results) == search.RESULTS_PER_PAGE
+    assert pagenav == {'prev': None, 'next': results[-1].id}
+    next_results, pagenav = search._paginate(Event.query, pagenav['next'], Event.id, user, False,
+                                             access_criterion=access_criterion)
+    assert pagenav == {'prev': -(results[-1].id - 1), 'next': None}
+    assert set(results) | set(next_results) == expected
+    assert [e.id for e in results + next_results] == sorted((e.id for e in expected), reverse=True)
+
+
+def test_paginate_ranked(db, create_event, create_contribution):
+    from indico.modules.search.base import SearchTarget
+    from indico.modules.search.internal import InternalSearch
+    from indico.modules.search.models.documents import SearchDocument
+    from indico.modules.search.util import update_search_document
+
+    title_match = create_event(title='Annual meeting', protection_mode=ProtectionMode.public)
+    description_match = create_event(title='Workshop', description='<p>Our annual <b>meeting</b></p>',
+                                     protection_mode=ProtectionMode.public)
+    other = create_event(title='Annual workshop', protection_mode=ProtectionMode.public)
+    contrib = create_contribution(other, 'Annual meeting')
+    for obj in (title_match, description_match, other, contrib):
+        update_search_document(obj)
+    assert SearchDocument.query.count() == 4
+
+    search = InternalSearch()
+    query = search._join_search_document(Event.query, SearchTarget.event, Event.id).filter(
+        SearchDocument.matches('annual meeting')
+    )
+    results, pagenav = search._paginate(query, None, search._get_ranked_key('annual meeting', Event.id), None, False)
+    # matches in the title are more relevant than matches in the description
+    assert results == [title_match, description_match]
+    assert pagenav == {'prev': None, 'next': None}
+
+    # updating the text replaces the previous document
+    title_match.title = 'Something else'
+    update_search_document(title_match)
+    assert query.all() == [description_match]
@@ -0,0 +1,117 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from functools import reduce
+
+from sqlalchemy.dialects.postgresql import TSVECTOR, insert
+
+from indico.core.db import db
+from indico.core.db.sqlalchemy import PyIntEnum
+from indico.core.db.sqlalchemy.util.queries import preprocess_ts_string
+from indico.modules.search.base import SearchTarget
+from indico.util.iterables import grouper
+from indico.util.string import format_repr
+
+
+class SearchDocument(db.Model):
+    """The searchable text of an object used by the internal search.
+
+    The text is stored as a tsvector in which each part is weighted
+    according to its relevance (e.g. the title is more relevant than
+    the description), which allows ranking the search results.
+    """
+
+    __tablename__ = 'search_documents'
+    __table_args__ = (db.Index(None, 'search_vector', postgresql_using='gin'),
+                      {'schema': 'indico'})
+
+    #: The type of the object
+    object_type = db.Column(
+        PyIntEnum(SearchTarget),
+        primary_key=True
+    )
+    #: The ID of the object
+    object_id = db.Column(
+        db.Integer,
+        primary_key=True,
+        autoincrement=False
+    )
+    #: The weighted tsvector of the object's searchable text
+    search_vector = db.Column(
+        TSVECTOR,
+        nullable=False
+    )
+
+    def __repr__(self):
+        return format_repr(self, 'object_type', 'object_id')
+
+    @staticmethod
+    def make_search_vector(parts):
+        """Create a SQL expression for a weighted tsvector.
+
+        :param parts: An iterable of ``(weight, text)`` tuples, where
+                      the weight is one of ``A`` (most relevant), ``B``,
+                      ``C`` or ``D``.
+        """
+        vectors = [db.func.setweight(db.func.to_tsvector('simple', text), weight)
+                   for weight, text in parts
+                   if text]
+        if not vectors:
+            return db.func.to_tsvector('simple', '')
+        return reduce(lambda a, b: a.op('||')(b), vectors)
+
+    @classmethod
+    def update(cls, object_type, object_id, parts):
+        """Create or replace the search document of an object.
+
+        :param object_type: A :class:`.SearchTarget`
+        :param object_id: The ID of the object
+        :param parts: The weighted text of the object, see
+                      :meth:`make_search_vector`
+        """
+        cls.update_many(object_type, [(object_id, parts)])
+
+    @classmethod
+    def update_many(cls, object_type, documents, batch_size=1000):
+        """Create or replace the search documents of many objects.
+
+        The documents are written using one multi-row INSERT per batch.
+
+        :param object_type: A :class:`.SearchTarget`
+        :param documents: An iterable of ``(object_id, parts)`` tuples,
+                          see :meth:`update`
+        :param batch_size: The number of documents per INSERT
+        """
+        for batch in grouper(documents, batch_size, skip_missing=True):
+            stmt = insert(cls.__table__).values([{'object_type': object_type, 'object_id': object_id,
+                                                  'search_vector': cls.make_search_vector(parts)}
+                                                 for object_id, parts in batch])
+            stmt = stmt.on_conflict_do_update(index_elements=[cls.object_type, cls.object_id],
+                                              set_={'search_vector': stmt.excluded.search_vector})
+            db.session.execute(stmt)
+
+    @classmethod
+    def delete(cls, object_type, object_id):
+        """Delete the search document of an object."""
+        cls.query.filter_by(object_type=object_type, object_id=object_id).delete()
+
+    @classmethod
+    def matches(cls, search_string):
+        """Check whether the search document matches a search string.
+
+        To be used in a SQLAlchemy `filter` call.
+        """
+        return cls.search_vector.match(preprocess_ts_string(search_string), postgresql_regconfig='simple')
+
+    @classmethod
+    def rank(cls, search_string):
+        """Get the relevance of the search document for a search string.
+
+        The rank is normalized to a value between 0 and 1.
+        """
+        query = db.func.to_tsquery('simple', preprocess_ts_string(search_string))
+        return db.func.ts_rank(cls.search_vector, query, 32)
@@ -0,0 +1,86 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from indico.core.db import db
+from indico.modules.attachments.models.attachments import Attachment, AttachmentType
+from indico.modules.attachments.models.folders import AttachmentFolder
+from indico.modules.events import Event
+from indico.modules.events.contributions.models.contributions import Contribution
+from indico.modules.events.contributions.models.persons import ContributionPersonLink
+from indico.modules.events.notes.models.notes import EventNote
+from indico.modules.search.base import SearchTarget
+from indico.modules.search.models.documents import SearchDocument
+from indico.util.string import strip_tags
+
+
+_object_types = {
+    Event: SearchTarget.event,
+    Contribution: SearchTarget.contribution,
+    Attachment: SearchTarget.attachment,
+    EventNote: SearchTarget.event_note,
+}
+
+
+def _get_person_names(obj):
+    return ' '.join(link.full_name for link in obj.person_links)
+
+
+def get_search_document_parts(obj):
+    """Get the weighted searchable text of an object.
+
+    :param obj: An :class:`.Event`, :class:`.Contribution`,
+                :class:`.Attachment` or :class:`.EventNote`
+    :return: A list of ``(weight, text)`` tuples as expected by
+             :meth:`.SearchDocument.make_search_vector`.
+    """
+    if isinstance(obj, (Event, Contribution)):
+        return [('A', obj.title),
+                ('B', strip_tags(obj.description or '')),
+                ('B', _get_person_names(obj))]
+    elif isinstance(obj, Attachment):
+        return [('A', obj.title),
+                ('C', obj.file.filename if obj.type == AttachmentType.file else None)]
+    elif isinstance(obj, EventNote):
+        return [('B', strip_tags(obj.html or ''))]
+    raise TypeError(f'Unexpected object: {obj}')
+
+
+def update_search_document(obj):
+    """Update the search document of an object after it changed."""
+    if obj.id is None:
+        db.session.flush()
+    SearchDocument.update(_object_types[type(obj)], obj.id, get_search_document_parts(obj))
+
+
+def delete_search_document(obj):
+    """Delete the search document of an object which has been deleted."""
+    SearchDocument.delete(_object_types[type(obj)], obj.id)
+
+
+def update_event_search_documents(event):
+    """Update the search documents of an event and all its contents.
+
+    This is used when many objects are copied into an event at once
+    (e.g. when cloning it), since they are not indexed individually
+    in that case.
+    """
+    db.session.flush()
+    update_search_document(event)
+    contributions = (Contribution.query.with_parent(event)
+                     .filter(~Contribution.is_deleted)
+                     .options(selectinload(Contribution.person_links).joinedload(ContributionPersonLink.person)))
+    attachments = (Attachment.query
+                   .join(Attachment.folder)
+                   .filter(AttachmentFolder.event_id == event.id, ~AttachmentFolder.is_deleted, ~Attachment.is_deleted)
+                   .options(joinedload(Attachment.file)))
+    notes = event.all_notes.filter_by(is_deleted=False)
+    for object_type, query in ((SearchTarget.contribution, contributions),
+                               (SearchTarget.attachment, attachments),
+                               (SearchTarget.event_note, notes)):
+        SearchDocument.update_many(object_type, ((obj.id, get_search_document_parts(obj)) for obj in query))
@@ -0,0 +1,69 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import timedelta
+
+import pytest
+from flask import session
+
+from indico.modules.attachments.models.attachments import Attachment, AttachmentType
+from indico.modules.attachments.models.folders import AttachmentFolder
+from indico.modules.events.notes.models.notes import EventNote, RenderMode
+from indico.modules.search.base import SearchTarget
+from indico.modules.search.models.documents import SearchDocument
+
+
+def _get_matches(object_type, search_string):
+    return {object_id for object_id, in (SearchDocument.query
+                                         .filter_by(object_type=object_type)
+                                         .filter(SearchDocument.matches(search_string))
+                                         .with_entities(SearchDocument.object_id))}
+
+
+def test_update_event_search_documents(db, dummy_event, create_contribution, dummy_user):
+    from indico.modules.search.util import update_event_search_documents
+
+    dummy_event.title = 'Collaboration week'
+    contrib = create_contribution(dummy_event, 'Annual meeting', description='<p>Our <b>yearly</b> meeting</p>')
+    deleted_contrib = create_contribution(dummy_event, 'Annual meeting', is_deleted=True)
+    attachment = Attachment(folder=AttachmentFolder.get_or_create_default(contrib), user=dummy_user,
+                            title='Annual report', type=AttachmentType.link, link_url='https://example.com')
+    note = EventNote(object=dummy_event)
+    note.create_revision(RenderMode.html, '<p>Minutes of the annual meeting</p>', dummy_user)
+    db.session.flush()
+    SearchDocument.query.delete()
+
+    update_event_search_documents(dummy_event)
+    assert _get_matches(SearchTarget.event, 'collaboration') == {dummy_event.id}
+    assert _get_matches(SearchTarget.contribution, 'yearly') == {contrib.id}
+    assert deleted_contrib.id not in _get_matches(SearchTarget.contribution, 'annual')
+    assert _get_matches(SearchTarget.attachment, 'report') == {attachment.id}
+    assert _get_matches(SearchTarget.event_note, 'minutes') == {note.id}
+
+    # existing documents are replaced
+    contrib.title = 'Board meeting'
+    update_event_search_documents(dummy_event)
+    assert _get_matches(SearchTarget.contribution, 'annual') == set()
+    assert _get_matches(SearchTarget.contribution, 'board') == {contrib.id}
+
+
+@pytest.mark.usefixtures('request_context')
+def test_cloned_event_search_documents(db, dummy_event, dummy_user):
+    from indico.modules.events.operations import clone_event
+
+    session.set_session_user(dummy_user)
+    Attachment(folder=AttachmentFolder.get_or_create_default(dummy_event), user=dummy_user,
+               title='Annual report', type=AttachmentType.link, link_url='https://example.com')
+    note = EventNote(object=dummy_event)
+    note.create_revision(RenderMode.html, '<p>Minutes of the annual meeting</p>', dummy_user)
+    db.session.flush()
+
+    new_event = clone_event(dummy_event, 0, dummy_event.start_dt + timedelta(days=7), {'attachments', 'notes'})
+    new_attachment = new_event.attachment_folders.one().attachments[0]
+    new_note = EventNote.get_for_linked_object(new_event, preload_event=False)
+    assert new_attachment.id in _get_matches(SearchTarget.attachment, 'report')
+    assert new_note.id in _get_matches(SearchTarget.event_note, 'minutes')
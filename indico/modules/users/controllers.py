@@ -42,9 +42,10 @@ from indico.modules.users.models.emails import UserEmail
 from indico.modules.users.models.users import ProfilePictureSource
 from indico.modules.users.operations import create_user
 from indico.modules.users.schemas import BasicCategorySchema
-from indico.modules.users.util import (get_avatar_url_from_name, get_gravatar_for_user, get_linked_events,
-                                       get_related_categories, get_suggested_categories, get_unlisted_events,
-                                       merge_users, search_users, send_avatar, serialize_user, set_user_avatar)
+from indico.modules.users.util import (build_user_search_query, get_avatar_url_from_name, get_gravatar_for_user,
+                                       get_linked_events, get_related_categories, get_suggested_categories,
+                                       get_unlisted_events, merge_users, search_users, send_avatar, serialize_user,
+                                       set_user_avatar)
 from indico.modules.users.views import WPUser, WPUserDashboard, WPUserFavorites, WPUserProfilePic, WPUsersAdmin
 from indico.util.date_time import now_utc
 from indico.util.i18n import _
@@ -752,8 +753,10 @@ class RHUserSearch(RHProtected):
         'No criteria provided'
     ), location='query')
     def _process(self, exact, external, favorites_first, **criteria):
-        matches = search_users(exact=exact, include_pending=True, external=external, **criteria)
         self.externals = {}
+        if not external:
+            return self._process_local(exact, favorites_first, criteria)
+        matches = search_users(exact=exact, include_pending=True, external=external, **criteria)
         results = sorted((self._serialize_entry(entry) for entry in matches), key=itemgetter('full_name', 'email'))
         if favorites_first:
             favorites = {u.id for u in session.user.favorite_users}
@@ -763,6 +766,19 @@ class RHUserSearch(RHProtected):
         self._process_pending_users(results)
         return jsonify(users=results, total=total)
 
+    def _process_local(self, exact, favorites_first, criteria):
+        # without external users we can do the sorting and limiting in SQL
+        # and only load the users which are actually displayed
+        criteria = {key: value.strip() for key, value in criteria.items() if value.strip()}
+        if not criteria:
+            return jsonify(users=[], total=0)
+        query = (build_user_search_query(criteria, exact=exact, include_pending=True,
+                                         favorites_first=favorites_first, ranked=True)
+                 .filter(~User.is_system))
+        total = query.order_by(None).count()
+        results = [self._serialize_entry(user) for user in query.limit(10)]
+        return jsonify(users=results, total=total)
+
 
 class RHUserSearchInfo(RHProtected):
     def _process(self):
@@ -195,10 +195,40 @@ def _build_name_search(name_list):
                   db.func.indico.indico_unaccent(db.func.concat(User.last_name, ' ', User.first_name)).ilike(text))
 
 
+def _build_prefix_rank(criteria):
+    # the number of criteria which match the beginning of the value instead of
+    # just somewhere inside it, e.g. "jo" is more likely to be "John" than "Bojan"
+    ranks = []
+    for key, value in criteria.items():
+        if key == 'affiliation':
+            crit = User._affiliation.has(unaccent_match(UserAffiliation.name, value, False, prefix=True))
+        elif key == 'email':
+            crit = User._all_emails.any(unaccent_match(UserEmail.email, value, False, prefix=True))
+        elif key == 'name':
+            first_word = value.replace(',', '').split()[0]
+            crit = db.or_(unaccent_match(User.first_name, first_word, False, prefix=True),
+                          unaccent_match(User.last_name, first_word, False, prefix=True))
+        else:
+            crit = unaccent_match(getattr(User, key), value, False, prefix=True)
+        ranks.append(db.case([(crit, 1)], else_=0))
+    return sum(ranks) if ranks else None
+
+
 def build_user_search_query(criteria, exact=False, include_deleted=False, include_pending=False,
-                            include_blocked=False, favorites_first=False):
+                            include_blocked=False, favorites_first=False, ranked=False):
+    """Build a query to search for Indico users.
+
+    Only users matching all the criteria are returned.  The related
+    tables are only checked using subqueries, so each user is returned
+    at most once and the query can be limited in SQL.
+
+    :param criteria: A dict containing the criteria as in :func:`search_users`
+    :param ranked: Whether to sort users matching the beginning of the
+                   criteria before those only matching somewhere inside.
+    """
     unspecified = object()
-    query = User.query.distinct(User.id).options(db.joinedload(User._all_emails))
+    rank = _build_prefix_rank(criteria) if ranked and not exact else None
+    query = User.query.options(db.selectinload(User._all_emails))
 
     if not include_pending:
         query = query.filter(~User.is_pending)
@@ -209,11 +239,11 @@ def build_user_search_query(criteria, exact=False, include_deleted=False, includ
 
     affiliation = criteria.pop('affiliation', unspecified)
     if affiliation is not unspecified:
-        query = query.join(UserAffiliation).filter(unaccent_match(UserAffiliation.name, affiliation, exact))
+        query = query.filter(User._affiliation.has(unaccent_match(UserAffiliation.name, affiliation, exact)))
 
     email = criteria.pop('email', unspecified)
     if email is not unspecified:
-        query = query.join(UserEmail).filter(unaccent_match(UserEmail.email, email, exact))
+        query = query.filter(User._all_emails.any(unaccent_match(UserEmail.email, email, exact)))
 
     # search on any of the name fields (first_name OR last_name)
     name = criteria.pop('name', unspecified)
@@ -227,13 +257,12 @@ def build_user_search_query(criteria, exact=False, include_deleted=False, includ
     for k, v in criteria.items():
         query = query.filter(unaccent_match(getattr(User, k), v, exact))
 
-    # wrap as subquery so we can apply order regardless of distinct-by-id
-    query = query.from_self()
-
     if favorites_first:
         query = (query.outerjoin(favorite_user_table, db.and_(favorite_user_table.c.user_id == session.user.id,
                                                               favorite_user_table.c.target_id == User.id))
                  .order_by(nullslast(favorite_user_table.c.user_id)))
+    if rank is not None:
+        query = query.order_by(rank.desc())
     query = query.order_by(db.func.lower(db.func.indico.indico_unaccent(User.first_name)),
                            db.func.lower(db.func.indico.indico_unaccent(User.last_name)),
                            User.id)
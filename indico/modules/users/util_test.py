@@ -0,0 +1,27 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from indico.modules.users.util import build_user_search_query, search_users
+
+
+def test_build_user_search_query_ranked(db, create_user):
+    inside = create_user(1, first_name='Bojan', last_name='Jones', email='bojan@example.com')
+    prefix = create_user(2, first_name='Johann', last_name='Müller', email='johann@example.com')
+    prefix.secondary_emails.add('jo@example.org')
+    create_user(3, first_name='Alice', last_name='Smith', email='alice@example.com')
+    db.session.flush()
+
+    query = build_user_search_query({'first_name': 'jo'}, ranked=True)
+    # matches at the beginning of the value come first
+    assert query.all() == [prefix, inside]
+    assert query.limit(1).all() == [prefix]
+    # without ranking the users are sorted by name
+    assert build_user_search_query({'first_name': 'jo'}).all() == [inside, prefix]
+    # a user with several matching emails is only returned once
+    assert build_user_search_query({'email': 'jo'}, ranked=True).all() == [prefix, inside]
+    assert build_user_search_query({'last_name': 'muller'}, ranked=True).order_by(None).count() == 1
+    assert {u.id for u in search_users(email='example')} == {1, 2, 3}
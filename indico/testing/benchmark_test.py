@@ -0,0 +1,89 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import timedelta
+
+import pytest
+
+from indico.util.date_time import now_utc
+
+
+pytestmark = pytest.mark.benchmark
+
+
+def _assert_no_query_regression(small, large, slack=0):
+    """Ensure the number of queries does not depend on the amount of data.
+
+    If displaying a large object needs more queries than displaying a
+    small one, some queries are executed once per object, which is
+    almost always a bug.
+    """
+    __tracebackhide__ = True
+    repeated = '\n'.join(f'{count}x {sql}' for sql, count, duration in large['repeated_queries'])
+    assert large['query_count'] <= small['query_count'] + slack, \
+        f'{large["query_count"]} queries for large dataset, {small["query_count"]} for small one\n{repeated}'
+
+
+def test_category_display(benchmark_data, profile_request):
+    results = []
+    for category in (benchmark_data.small_category, benchmark_data.large_category):
+        resp, stats = profile_request(f'/category/{category.id}/')
+        assert resp.status_code == 200
+        results.append(stats)
+    _assert_no_query_regression(*results)
+
+
+def test_timetable(benchmark_data, profile_request):
+    results = []
+    for event in (benchmark_data.small_conference, benchmark_data.large_conference):
+        resp, stats = profile_request(f'/event/{event.id}/timetable/')
+        assert resp.status_code == 200
+        results.append(stats)
+    _assert_no_query_regression(*results)
+
+
+def test_room_search(benchmark_data, profile_request):
+    start_dt = now_utc(exact=False).replace(tzinfo=None, hour=9, minute=0) + timedelta(days=1)
+    end_dt = start_dt + timedelta(hours=1)
+    results = []
+    for building in ('quiet', 'busy'):
+        resp, stats = profile_request('/rooms/api/rooms/search', user=benchmark_data.user, query_string={
+            'building': building,
+            'start_dt': start_dt.isoformat(),
+            'end_dt': end_dt.isoformat(),
+            'repeat_frequency': 'NEVER',
+            'repeat_interval': 0,
+        })
+        assert resp.status_code == 200
+        # all rooms are booked at that time
+        assert resp.json['rooms'] == []
+        assert resp.json['total'] == len(benchmark_data.rooms[building])
+        results.append(stats)
+    _assert_no_query_regression(*results)
+
+
+def test_http_api_export(benchmark_data, profile_request):
+    results = []
+    for category in (benchmark_data.small_category, benchmark_data.large_category):
+        resp, stats = profile_request(f'/export/categ/{category.id}.json', query_string={
+            'from': 'today',
+            'to': '+30d',
+            'detail': 'contributions',
+        })
+        assert resp.status_code == 200
+        results.append(stats)
+    _assert_no_query_regression(*results)
+
+
+def test_registration_list(benchmark_data, profile_request):
+    results = []
+    for regform in (benchmark_data.small_regform, benchmark_data.large_regform):
+        resp, stats = profile_request(f'/event/{regform.event_id}/manage/registration/{regform.id}/registrations/',
+                                      user=benchmark_data.user)
+        assert resp.status_code == 200
+        results.append(stats)
+    _assert_no_query_regression(*results)
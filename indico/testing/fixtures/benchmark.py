@@ -0,0 +1,161 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import datetime, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+from flask import request_tearing_down
+
+from indico.modules.categories import Category
+from indico.modules.events import Event
+from indico.modules.events.contributions.models.contributions import Contribution
+from indico.modules.events.contributions.models.persons import ContributionPersonLink
+from indico.modules.events.models.events import EventType
+from indico.modules.events.models.persons import EventPerson
+from indico.modules.events.registration.models.forms import RegistrationForm
+from indico.modules.events.registration.models.registrations import Registration, RegistrationState
+from indico.modules.events.registration.util import create_personal_data_fields
+from indico.modules.events.sessions.models.blocks import SessionBlock
+from indico.modules.events.sessions.models.sessions import Session
+from indico.modules.events.timetable.models.entries import TimetableEntry
+from indico.modules.rb.models.locations import Location
+from indico.modules.rb.models.reservations import RepeatFrequency, Reservation
+from indico.modules.rb.models.rooms import Room
+from indico.util.benchmark import Benchmark
+from indico.util.date_time import now_utc
+from indico.web.flask.stats import get_repeated_queries, get_request_stats
+
+
+@pytest.fixture
+def benchmark_scale(request):
+    """The factor by which the size of the benchmark dataset is multiplied."""
+    return request.config.getoption('benchmark_scale')
+
+
+@pytest.fixture
+def benchmark_data(db, create_user, benchmark_scale):
+    """Create a large dataset for benchmarks.
+
+    For each kind of data there is a small and a large variant which
+    are structurally identical, so the number of queries needed to
+    display them can be compared to spot queries which are executed
+    once per object.
+    """
+    user = create_user(1, admin=True)
+    root = Category.get_root()
+    now = now_utc(exact=False).replace(hour=0, minute=0)
+
+    # a deep category tree with a few siblings on each level
+    parent = root
+    for depth in range(8):
+        siblings = [Category(parent=parent, title=f'Level {depth} #{i}', timezone='UTC', acl_entries=set())
+                    for i in range(4)]
+        parent = siblings[0]
+    small_category = Category(parent=parent, title='Small category', timezone='UTC', acl_entries=set())
+    large_category = Category(parent=parent, title='Large category', timezone='UTC', acl_entries=set())
+    db.session.flush()
+
+    def _create_events(category, count):
+        for i in range(count):
+            start_dt = now + timedelta(days=i % 14, hours=8 + i % 8)
+            db.session.add(Event(category=category, creator=user, type_=EventType.meeting, title=f'Meeting {i}',
+                                 start_dt=start_dt, end_dt=start_dt + timedelta(hours=1), timezone='UTC',
+                                 acl_entries=set()))
+
+    _create_events(small_category, 2)
+    _create_events(large_category, 200 * benchmark_scale)
+
+    def _create_conference(category, num_sessions, num_contributions, num_registrations):
+        event = Event(category=category, creator=user, type_=EventType.conference, title='Conference',
+                      start_dt=now + timedelta(hours=8), end_dt=now + timedelta(days=5, hours=18), timezone='UTC',
+                      acl_entries=set())
+        days = (event.end_dt - event.start_dt).days + 1
+        per_session = num_contributions // num_sessions
+        for i in range(num_sessions):
+            session = Session(event=event, title=f'Session {i}')
+            block_start_dt = event.start_dt + timedelta(days=i % days)
+            block = SessionBlock(session=session, title=f'Block {i}',
+                                 duration=timedelta(minutes=per_session * 5))
+            block_entry = TimetableEntry(event=event, object=block, start_dt=block_start_dt)
+            for j in range(per_session):
+                contribution = Contribution(event=event, session=session, session_block=block,
+                                            title=f'Contribution {i}.{j}', duration=timedelta(minutes=5))
+                person = EventPerson(event=event, first_name='Speaker', last_name=f'{i}.{j}',
+                                     email=f'speaker-{i}-{j}@example.com')
+                contribution.person_links.append(ContributionPersonLink(person=person, is_speaker=True))
+                TimetableEntry(event=event, object=contribution, parent=block_entry,
+                               start_dt=block_start_dt + timedelta(minutes=j * 5))
+        regform = RegistrationForm(event=event, title='Registration Form', currency='EUR')
+        create_personal_data_fields(regform)
+        for i in range(num_registrations):
+            event.registrations.append(Registration(registration_form=regform, first_name='Participant',
+                                                    last_name=str(i), email=f'participant-{i}@example.com',
+                                                    state=RegistrationState.complete, currency='EUR'))
+        db.session.add(event)
+        return event, regform
+
+    small_conference, small_regform = _create_conference(small_category, 2, 10, 5)
+    large_conference, large_regform = _create_conference(large_category, 20 * benchmark_scale,
+                                                         2000 * benchmark_scale, 1000 * benchmark_scale)
+
+    # rooms which are booked every day for a month
+    location = Location(name='Benchmark')
+    rooms = {}
+    for building, num_rooms in (('quiet', 2), ('busy', 50 * benchmark_scale)):
+        rooms[building] = [Room(location=location, building=building, floor='1', number=str(i), owner=user,
+                                verbose_name=None)
+                           for i in range(num_rooms)]
+        for room in rooms[building]:
+            reservation = Reservation(room=room, start_dt=datetime.combine(now.date(), time(8)),
+                                      end_dt=datetime.combine(now.date() + timedelta(days=30), time(12)),
+                                      repeat_frequency=RepeatFrequency.DAY, repeat_interval=1,
+                                      booking_reason='Benchmark', booked_for_user=user, created_by_user=user)
+            reservation.create_occurrences(skip_conflicts=False)
+            db.session.add(reservation)
+
+    db.session.flush()
+    return SimpleNamespace(user=user, small_category=small_category, large_category=large_category,
+                           small_conference=small_conference, large_conference=large_conference,
+                           small_regform=small_regform, large_regform=large_regform, rooms=rooms)
+
+
+@pytest.fixture
+def profile_request(request, app, db, make_test_client, mocker):
+    """Return a callable which performs a request and profiles it.
+
+    The callable takes the URL and optionally the user who should be
+    logged in, and returns the response and the request stats (see
+    :func:`~indico.web.flask.stats.get_request_stats`), which also
+    contain the statements which were repeated suspiciously often.
+
+    All objects are removed from the SQLAlchemy session before the
+    request, so objects loaded while setting up the test data do not
+    hide any queries.
+    """
+    client = make_test_client()
+    results = request.config.indico_benchmark_results
+    # collect the per-statement stats which are usually only collected for sampled requests
+    mocker.patch('indico.web.flask.stats._sample_request', return_value=(True, False))
+
+    def _profile_request(url, user=None, **kwargs):
+        stats = {}
+
+        def _collect_stats(sender, **unused):
+            # the test client handles the request in its own app context, so
+            # the stats need to be collected before it is torn down
+            stats.update(get_request_stats(), repeated_queries=get_repeated_queries())
+
+        with client.session_transaction() as sess:
+            sess.set_session_user(user)
+        db.session.expunge_all()
+        with request_tearing_down.connected_to(_collect_stats, app), Benchmark() as bench:
+            resp = client.get(url, **kwargs)
+        results.append((request.node.nodeid, url, stats['query_count'], float(bench)))
+        return resp, stats
+
+    return _profile_request
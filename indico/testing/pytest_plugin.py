@@ -12,12 +12,14 @@ import sys
 import tempfile
 
 import py
+import pytest
 
 
 # Ignore config file in case there is one
 os.environ['INDICO_CONFIG'] = os.devnull
 
-pytest_plugins = ('indico.testing.fixtures.app', 'indico.testing.fixtures.cache', 'indico.testing.fixtures.category',
+pytest_plugins = ('indico.testing.fixtures.app', 'indico.testing.fixtures.benchmark',
+                  'indico.testing.fixtures.cache', 'indico.testing.fixtures.category',
                   'indico.testing.fixtures.contribution', 'indico.testing.fixtures.database',
                   'indico.testing.fixtures.disallow', 'indico.testing.fixtures.person', 'indico.testing.fixtures.user',
                   'indico.testing.fixtures.event', 'indico.testing.fixtures.smtp', 'indico.testing.fixtures.storage',
@@ -30,6 +32,8 @@ def pytest_configure(config):
     config.indico_temp_dir = py.path.local(tempfile.mkdtemp(prefix='indicotesttmp.'))
     config.indico_plugins = [_f for _f in [x.strip() for x in re.split(r'[\s,;]+', config.getini('indico_plugins'))]
                              if _f]
+    config.indico_benchmark_results = []
+    config.addinivalue_line('markers', 'benchmark: slow test using a large dataset; only runs with --benchmark')
     # Make sure we don't write any log files (or worse: send emails)
     assert not logging.root.handlers
     logging.root.addHandler(logging.NullHandler())
@@ -43,3 +47,23 @@ def pytest_unconfigure(config):
 
 def pytest_addoption(parser):
     parser.addini('indico_plugins', 'List of indico plugins to load')
+    parser.addoption('--benchmark', action='store_true', help='Run the benchmarks')
+    parser.addoption('--benchmark-scale', type=int, default=1, metavar='N',
+                     help='Multiply the size of the benchmark dataset by N')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('benchmark'):
+        return
+    skip = pytest.mark.skip(reason='benchmarks only run with --benchmark')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not config.indico_benchmark_results:
+        return
+    terminalreporter.section('benchmark results')
+    for nodeid, url, query_count, duration in config.indico_benchmark_results:
+        terminalreporter.write_line(f'{query_count:5d} queries  {duration:8.3f}s  {url}  ({nodeid})')
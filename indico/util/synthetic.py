@@ -0,0 +1,352 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import random
+from datetime import datetime, time, timedelta
+
+from indico.core.db import db
+from indico.core.db.sqlalchemy.links import LinkType
+from indico.core.db.sqlalchemy.protection import ProtectionMode
+from indico.modules.attachments.models.attachments import Attachment, AttachmentType
+from indico.modules.attachments.models.folders import AttachmentFolder
+from indico.modules.categories import Category
+from indico.modules.categories.util import update_category_stats
+from indico.modules.events import Event
+from indico.modules.events.contributions.models.contributions import Contribution
+from indico.modules.events.models.events import EventType
+from indico.modules.events.registration.models.forms import RegistrationForm
+from indico.modules.events.registration.models.items import PersonalDataType
+from indico.modules.events.registration.models.registrations import Registration, RegistrationData, RegistrationState
+from indico.modules.events.registration.util import create_personal_data_fields
+from indico.modules.events.sessions.models.blocks import SessionBlock
+from indico.modules.events.sessions.models.sessions import Session
+from indico.modules.events.timetable.models.entries import TimetableEntry, TimetableEntryType
+from indico.modules.rb.models.locations import Location
+from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
+from indico.modules.rb.models.reservations import RepeatFrequency, Reservation
+from indico.modules.rb.models.rooms import Room
+from indico.modules.rb.statistics import refresh_room_occupancy
+from indico.modules.search.base import SearchTarget
+from indico.modules.search.models.documents import SearchDocument
+from indico.modules.users import User
+from indico.util.date_time import as_utc, now_utc
+from indico.util.iterables import grouper
+
+
+#: How likely an event is of a given type
+EVENT_TYPE_WEIGHTS = {EventType.meeting: 70, EventType.conference: 20, EventType.lecture: 10}
+#: How many more contributions a conference has compared to a meeting
+CONFERENCE_CONTRIBUTION_WEIGHT = 20
+#: The duration of each contribution
+CONTRIBUTION_DURATION = timedelta(minutes=20)
+#: The number of one-hour slots per day which can be booked in a room
+ROOM_SLOTS = 10
+
+
+def _distribute(total, weights, rnd):
+    """Distribute `total` items according to `weights`.
+
+    :return: A list with the number of items for each weight.
+    """
+    weight_sum = sum(weights)
+    if not weight_sum:
+        return [0] * len(weights)
+    counts = [total * weight // weight_sum for weight in weights]
+    candidates = [i for i, weight in enumerate(weights) if weight]
+    for i in rnd.sample(candidates, min(len(candidates), total - sum(counts))):
+        counts[i] += 1
+    return counts
+
+
+def _allocate_ids(model, n):
+    """Reserve `n` primary keys from the sequence of a model's table."""
+    if not n:
+        return []
+    query = db.text('SELECT nextval(pg_get_serial_sequence(:table, :column)) FROM generate_series(1, :n)')
+    return [id_ for id_, in db.session.execute(query, {'table': model.__table__.fullname, 'column': 'id', 'n': n})]
+
+
+def _bulk_insert(model, rows):
+    """Insert rows using a single multi-row INSERT per batch.
+
+    Column defaults from the model are applied, but no ORM events or
+    signals are triggered.  All rows must contain the same keys, since
+    the statement is compiled based on the first one.
+    """
+    if rows:
+        db.session.execute(model.__table__.insert(), rows)
+
+
+class SyntheticDataGenerator:
+    """Generate large amounts of data for testing and benchmarks.
+
+    All the data is inserted using plain multi-row INSERT statements
+    instead of creating ORM objects, which is orders of magnitude
+    faster but also means no signals are triggered.  The data derived
+    from the created objects (category statistics, search documents
+    and room occupancy) is updated explicitly.  Anything created by
+    the generator is owned by the system user.
+
+    :param seed: The seed for the random number generator, to create
+                 the same data on each run.
+    """
+
+    def __init__(self, seed=None):
+        self.rnd = random.Random(seed)
+        system_user = User.get_system_user()
+        self.user_id = system_user.id
+        self.user_name = system_user.full_name
+        self.today = now_utc(exact=False).date()
+        self.category_ids = []
+
+    def create_categories(self, count, depth):
+        """Create a category tree.
+
+        :param count: The number of categories to create
+        :param depth: The maximum depth of the tree
+        """
+        root = Category.get_root()
+        levels = [[root.id]]
+        positions = {}
+        ids = _allocate_ids(Category, count)
+        rows = []
+        for i, id_ in enumerate(ids):
+            # the first categories form a chain so the tree has the full depth,
+            # the other ones are added on random levels
+            level = min(len(levels), depth) if i < depth else self.rnd.randint(1, min(len(levels), depth))
+            parent_id = self.rnd.choice(levels[level - 1])
+            positions[parent_id] = positions.get(parent_id, 0) + 1
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(id_)
+            rows.append({'id': id_, 'parent_id': parent_id, 'title': f'Category {id_}', 'timezone': 'UTC',
+                         'position': positions[parent_id]})
+        _bulk_insert(Category, rows)
+        self.category_ids += ids
+        db.session.commit()
+
+    def create_events(self, count, sessions=0, contributions=0, registrations=0, attachments=0, years=5,
+                      chunk_size=500):
+        """Create events including their contents.
+
+        The events are created in chunks which are committed separately.
+        This is a generator which yields the number of events created
+        in each chunk.
+
+        :param count: The number of events to create
+        :param sessions: The total number of sessions in conferences
+        :param contributions: The total number of contributions in
+                              conferences and meetings
+        :param registrations: The total number of registrations in
+                              conferences
+        :param attachments: The total number of attachments in events
+        :param years: The number of years in the past over which the
+                      events are spread
+        :param chunk_size: The number of events per chunk
+        """
+        if not self.category_ids:
+            self.category_ids = [id_ for id_, in db.session.query(Category.id).filter(~Category.is_deleted)]
+        types = self.rnd.choices(list(EVENT_TYPE_WEIGHTS), weights=list(EVENT_TYPE_WEIGHTS.values()), k=count)
+        is_conference = [type_ == EventType.conference for type_ in types]
+        session_counts = _distribute(sessions, is_conference, self.rnd)
+        contribution_counts = _distribute(contributions,
+                                          [CONFERENCE_CONTRIBUTION_WEIGHT if type_ == EventType.conference else
+                                           int(type_ == EventType.meeting) for type_ in types],
+                                          self.rnd)
+        registration_counts = _distribute(registrations, is_conference, self.rnd)
+        attachment_counts = _distribute(attachments, [1] * count, self.rnd)
+        data = zip(types, session_counts, contribution_counts, registration_counts, attachment_counts)
+        for chunk in grouper(data, chunk_size, skip_missing=True):
+            self._create_event_chunk(chunk, years)
+            db.session.commit()
+            db.session.expunge_all()
+            yield len(chunk)
+        update_category_stats(self.category_ids)
+        db.session.commit()
+
+    def _create_event_chunk(self, chunk, years):
+        event_ids = _allocate_ids(Event, len(chunk))
+        event_rows = []
+        contents = []
+        for event_id, (type_, num_sessions, num_contributions, num_registrations, num_attachments) in zip(event_ids,
+                                                                                                          chunk):
+            day = self.today + timedelta(days=self.rnd.randint(-365 * years, 365))
+            start_dt = as_utc(datetime.combine(day, time(8)))
+            if type_ == EventType.lecture:
+                end_dt = start_dt + timedelta(hours=1)
+            elif type_ == EventType.meeting:
+                end_dt = start_dt + timedelta(hours=10)
+            else:
+                end_dt = start_dt + timedelta(days=2, hours=10)
+            contents.append(self._create_event_contents(event_id, start_dt, num_sessions, num_contributions))
+            end_dt = max([end_dt] + [entry['start_dt'] + CONTRIBUTION_DURATION
+                                     for entry in contents[-1]['timetable_entries']])
+            event_rows.append({'id': event_id, 'category_id': self.rnd.choice(self.category_ids),
+                               'creator_id': self.user_id, 'title': f'{type_.name.title()} {event_id}', 'type': type_,
+                               'start_dt': start_dt, 'end_dt': end_dt, 'timezone': 'UTC',
+                               'created_dt': start_dt - timedelta(days=self.rnd.randint(1, 180)),
+                               'last_friendly_session_id': num_sessions,
+                               'last_friendly_contribution_id': num_contributions,
+                               'last_friendly_registration_id': num_registrations})
+        _bulk_insert(Event, event_rows)
+        for model in (Session, SessionBlock, Contribution, TimetableEntry):
+            _bulk_insert(model, [row for item in contents for row in item[model.__tablename__]])
+        self._create_registrations(event_ids, [item[3] for item in chunk])
+        attachment_rows = self._create_attachments(event_ids, [item[4] for item in chunk])
+        # the generated objects only have a title, so it is all their search documents contain
+        for object_type, rows in ((SearchTarget.event, event_rows),
+                                  (SearchTarget.contribution, [row for item in contents
+                                                               for row in item['contributions']]),
+                                  (SearchTarget.attachment, attachment_rows)):
+            SearchDocument.update_many(object_type, [(row['id'], [('A', row['title'])]) for row in rows])
+
+    def _create_event_contents(self, event_id, start_dt, num_sessions, num_contributions):
+        session_ids = _allocate_ids(Session, num_sessions)
+        block_ids = _allocate_ids(SessionBlock, num_sessions)
+        contribution_ids = _allocate_ids(Contribution, num_contributions)
+        entry_ids = _allocate_ids(TimetableEntry, num_sessions + num_contributions)
+        friendly_ids = {id_: i for i, id_ in enumerate(contribution_ids, 1)}
+        rows = {'sessions': [], 'session_blocks': [], 'contributions': [], 'timetable_entries': []}
+        # the contributions of each session block (or of the event if there are no sessions)
+        blocks = [{'session_id': None, 'block_id': None, 'entry_id': None, 'start_dt': start_dt,
+                   'contribution_ids': contribution_ids}]
+        if num_sessions:
+            blocks = []
+            for i, (session_id, block_id) in enumerate(zip(session_ids, block_ids)):
+                entry_id = entry_ids.pop()
+                block_start_dt = start_dt + timedelta(days=i % 3)
+                block_contribution_ids = contribution_ids[i::num_sessions]
+                rows['sessions'].append({'id': session_id, 'event_id': event_id, 'friendly_id': i + 1,
+                                         'title': f'Session {i + 1}'})
+                rows['session_blocks'].append({'id': block_id, 'session_id': session_id,
+                                               'duration': CONTRIBUTION_DURATION * max(1, len(block_contribution_ids))})
+                rows['timetable_entries'].append({'id': entry_id, 'event_id': event_id,
+                                                  'type': TimetableEntryType.SESSION_BLOCK,
+                                                  'session_block_id': block_id, 'contribution_id': None,
+                                                  'parent_id': None, 'start_dt': block_start_dt})
+                blocks.append({'session_id': session_id, 'block_id': block_id, 'entry_id': entry_id,
+                               'start_dt': block_start_dt, 'contribution_ids': block_contribution_ids})
+        for block in blocks:
+            for i, contribution_id in enumerate(block['contribution_ids']):
+                rows['contributions'].append({'id': contribution_id, 'event_id': event_id,
+                                              'friendly_id': friendly_ids[contribution_id],
+                                              'title': f'Contribution {contribution_id}',
+                                              'duration': CONTRIBUTION_DURATION,
+                                              'session_id': block['session_id'],
+                                              'session_block_id': block['block_id']})
+                rows['timetable_entries'].append({'id': entry_ids.pop(), 'event_id': event_id,
+                                                  'type': TimetableEntryType.CONTRIBUTION,
+                                                  'session_block_id': None, 'contribution_id': contribution_id,
+                                                  'parent_id': block['entry_id'],
+                                                  'start_dt': block['start_dt'] + i * CONTRIBUTION_DURATION})
+        return rows
+
+    def _create_registrations(self, event_ids, counts):
+        regforms = {event_id: RegistrationForm(event_id=event_id, title='Registration', currency='EUR')
+                    for event_id, count in zip(event_ids, counts) if count}
+        for regform in regforms.values():
+            create_personal_data_fields(regform)
+        db.session.add_all(regforms.values())
+        db.session.flush()
+        registration_ids = _allocate_ids(Registration, sum(counts))
+        registrations = []
+        data = []
+        for event_id, count in zip(event_ids, counts):
+            if not count:
+                continue
+            regform = regforms[event_id]
+            fields = {field.personal_data_type: field.current_data_id for field in regform.active_fields
+                      if field.personal_data_type}
+            for friendly_id in range(1, count + 1):
+                registration_id = registration_ids.pop()
+                values = {PersonalDataType.first_name: 'Participant',
+                          PersonalDataType.last_name: str(friendly_id),
+                          PersonalDataType.email: f'participant{registration_id}@example.com'}
+                registrations.append({'id': registration_id, 'event_id': event_id, 'friendly_id': friendly_id,
+                                      'registration_form_id': regform.id, 'state': RegistrationState.complete,
+                                      'currency': regform.currency, 'first_name': values[PersonalDataType.first_name],
+                                      'last_name': values[PersonalDataType.last_name],
+                                      'email': values[PersonalDataType.email]})
+                data += [{'registration_id': registration_id, 'field_data_id': fields[pd_type], 'data': value}
+                         for pd_type, value in values.items()]
+        _bulk_insert(Registration, registrations)
+        _bulk_insert(RegistrationData, data)
+
+    def _create_attachments(self, event_ids, counts):
+        event_ids = [event_id for event_id, count in zip(event_ids, counts) if count]
+        counts = [count for count in counts if count]
+        folder_ids = _allocate_ids(AttachmentFolder, len(event_ids))
+        _bulk_insert(AttachmentFolder, [{'id': folder_id, 'event_id': event_id, 'linked_event_id': event_id,
+                                         'link_type': LinkType.event, 'is_default': True,
+                                         'protection_mode': ProtectionMode.inheriting}
+                                        for folder_id, event_id in zip(folder_ids, event_ids)])
+        attachment_ids = _allocate_ids(Attachment, sum(counts))
+        rows = [{'id': attachment_ids.pop(), 'folder_id': folder_id, 'user_id': self.user_id,
+                 'type': AttachmentType.link, 'title': f'Link {i}', 'link_url': f'https://example.com/{folder_id}/{i}'}
+                for folder_id, count in zip(folder_ids, counts)
+                for i in range(1, count + 1)]
+        _bulk_insert(Attachment, rows)
+        return rows
+
+    def create_rooms(self, count, reservations=0, days=365, chunk_size=500):
+        """Create rooms and bookings.
+
+        Each room has a number of one-hour slots per day which are
+        booked without any conflicts, either for a single day or
+        for a whole week.  This is a generator which yields the number
+        of rooms created in each chunk.
+
+        :param count: The number of rooms to create
+        :param reservations: The total number of bookings
+        :param days: The number of days in the past over which the
+                     bookings are spread
+        :param chunk_size: The number of rooms per chunk
+        """
+        location = Location(name=f'Synthetic {now_utc().isoformat()}')
+        db.session.add(location)
+        db.session.flush()
+        start_date = self.today - timedelta(days=days)
+        reservation_counts = _distribute(reservations, [1] * count, self.rnd)
+        for chunk in grouper(reservation_counts, chunk_size, skip_missing=True):
+            room_ids = _allocate_ids(Room, len(chunk))
+            _bulk_insert(Room, [{'id': room_id, 'location_id': location.id, 'owner_id': self.user_id,
+                                 'building': str(room_id // 100), 'floor': str(room_id // 10 % 10),
+                                 'number': str(room_id % 10)}
+                                for room_id in room_ids])
+            self._create_reservations(room_ids, chunk, start_date)
+            refresh_room_occupancy(room_ids)
+            db.session.commit()
+            yield len(chunk)
+
+    def _create_reservations(self, room_ids, counts, start_date):
+        reservation_ids = _allocate_ids(Reservation, sum(counts))
+        reservations = []
+        occurrences = []
+        for room_id, count in zip(room_ids, counts):
+            # the first free day for each slot
+            next_free = [start_date] * ROOM_SLOTS
+            for __ in range(count):
+                slot = self.rnd.randrange(ROOM_SLOTS)
+                first_day = next_free[slot]
+                num_days = 5 if self.rnd.random() < 0.2 else 1
+                next_free[slot] = first_day + timedelta(days=num_days)
+                start_time = time(8 + slot)
+                end_time = time(9 + slot)
+                reservation_id = reservation_ids.pop()
+                reservations.append({'id': reservation_id, 'room_id': room_id,
+                                     'start_dt': datetime.combine(first_day, start_time),
+                                     'end_dt': datetime.combine(first_day + timedelta(days=num_days - 1), end_time),
+                                     'repeat_frequency': RepeatFrequency.DAY if num_days > 1 else RepeatFrequency.NEVER,
+                                     'repeat_interval': int(num_days > 1), 'booked_for_id': self.user_id,
+                                     'booked_for_name': self.user_name, 'created_by_id': self.user_id,
+                                     'booking_reason': 'Synthetic booking'})
+                occurrences += [{'reservation_id': reservation_id,
+                                 'start_dt': datetime.combine(first_day + timedelta(days=i), start_time),
+                                 'end_dt': datetime.combine(first_day + timedelta(days=i), end_time)}
+                                for i in range(num_days)]
+        _bulk_insert(Reservation, reservations)
+        _bulk_insert(ReservationOccurrence, occurrences)
@@ -0,0 +1,67 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import random
+from datetime import time
+
+import pytest
+
+from indico.modules.categories import Category
+from indico.modules.events import Event
+from indico.modules.events.contributions.models.contributions import Contribution
+from indico.modules.events.registration.models.registrations import Registration
+from indico.modules.events.timetable.models.entries import TimetableEntry
+from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
+from indico.modules.rb.models.reservations import Reservation
+from indico.modules.rb.models.room_occupancy import RoomOccupancy
+from indico.modules.rb.models.rooms import Room
+from indico.modules.search.base import SearchTarget
+from indico.modules.search.models.documents import SearchDocument
+from indico.util.synthetic import SyntheticDataGenerator, _distribute
+
+
+@pytest.mark.parametrize(('total', 'weights'), (
+    (0, [1, 2, 3]),
+    (10, [1, 1, 1]),
+    (100, [0, 20, 1, 1, 0]),
+    (5, [0, 0]),
+))
+def test_distribute(total, weights):
+    counts = _distribute(total, weights, random.Random(42))
+    assert len(counts) == len(weights)
+    assert sum(counts) == (total if any(weights) else 0)
+    assert all(not count for count, weight in zip(counts, weights) if not weight)
+
+
+def test_synthetic_data(db, monkeypatch):
+    monkeypatch.setattr(db.session, 'expunge_all', lambda: None)
+    generator = SyntheticDataGenerator(seed=42)
+    generator.create_categories(20, 4)
+    list(generator.create_events(50, sessions=20, contributions=500, registrations=100, attachments=30,
+                                 chunk_size=20))
+    list(generator.create_rooms(5, reservations=50))
+    assert Category.query.count() == 21
+    assert max(len(cat.chain_ids) for cat in Category.query) == 5
+    assert Event.query.count() == 50
+    assert Contribution.query.count() == 500
+    assert TimetableEntry.query.filter(TimetableEntry.contribution_id.isnot(None)).count() == 500
+    assert Registration.query.count() == 100
+    for event in Event.query:
+        # events start at 8:00 UTC regardless of the server's local timezone
+        assert event.start_dt.time() == time(8)
+        assert event.end_dt >= max((entry.end_dt for entry in event.timetable_entries), default=event.start_dt)
+    assert Room.query.count() == 5
+    assert Reservation.query.count() == 50
+    # derived data which is usually updated when creating objects through the ORM
+    assert SearchDocument.query.filter_by(object_type=SearchTarget.event).count() == 50
+    assert SearchDocument.query.filter_by(object_type=SearchTarget.contribution).count() == 500
+    assert SearchDocument.query.filter_by(object_type=SearchTarget.attachment).count() == 30
+    assert (db.session.query(db.func.sum(RoomOccupancy.occurrence_count)).scalar() ==
+            ReservationOccurrence.query.filter(ReservationOccurrence.is_valid).count())
+    # no room is booked twice at the same time
+    occurrences = [(occ.reservation.room_id, occ.start_dt) for occ in ReservationOccurrence.query]
+    assert len(occurrences) == len(set(occurrences))
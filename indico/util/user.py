@@ -6,7 +6,7 @@
 # LICENSE file for more details.
 
 from indico.core.cache import make_scoped_cache
-from indico.core.db.sqlalchemy.principals import EmailPrincipal
+from indico.core.db.sqlalchemy.principals import EmailPrincipal, PrincipalType
 
 
 def iter_acl(acl):
@@ -25,6 +25,28 @@ def iter_acl(acl):
                                       not getattr(getattr(x, 'principal', x), 'is_local', None)))
 
 
+def is_user_in_acl(acl, user):
+    """Check whether a user is in any of the principals of an ACL.
+
+    The principals are checked in the order of :func:`iter_acl`, but
+    the cached memberships of all multipass groups are retrieved at
+    once instead of checking the groups one by one.
+
+    :param acl: any iterable containing users/groups or objects which
+                contain users/groups in a `principal` attribute
+    :param user: A :class:`.User` or ``None``
+    """
+    from indico.modules.groups.core import is_member_of_any_multipass_group
+    multipass_groups = []
+    for principal in iter_acl(acl):
+        principal = getattr(principal, 'principal', principal)
+        if getattr(principal, 'principal_type', None) == PrincipalType.multipass_group:
+            multipass_groups.append(principal)
+        elif user in principal:
+            return True
+    return is_member_of_any_multipass_group(user, multipass_groups)
+
+
 def principal_from_identifier(identifier, allow_groups=False, allow_external_users=False, allow_event_roles=False,
                               allow_category_roles=False, allow_registration_forms=False, allow_emails=False,
                               allow_networks=False, event_id=None, category_id=None, soft_fail=False):
@@ -8,9 +8,10 @@
 from unittest.mock import MagicMock
 
 from indico.modules.groups import GroupProxy
+from indico.modules.groups.core import _MultipassGroupProxy, get_multipass_group_memberships
 from indico.modules.networks.models.networks import IPNetworkGroup
 from indico.modules.users import User
-from indico.util.user import iter_acl
+from indico.util.user import is_user_in_acl, iter_acl
 
 
 def test_iter_acl():
@@ -27,3 +28,27 @@ def test_iter_acl():
                                          ipn, ipn_p,
                                          local_group_p, local_group,
                                          remote_group, remote_group_p]
+
+
+def test_is_user_in_acl_multipass_groups(mocker):
+    refresh = mocker.patch('indico.modules.groups.core._schedule_membership_refresh')
+    check = mocker.patch.object(_MultipassGroupProxy, 'check_membership', autospec=True,
+                                side_effect=lambda group, user: group.name == 'b')
+    user = User(id=123)
+    a, b, c = groups = [GroupProxy(name, 'ldap') for name in 'abc']
+    assert is_user_in_acl(groups, user)
+    # the remaining groups are not checked once the user has been found
+    assert check.call_count == 2
+    assert is_user_in_acl(groups, user)
+    assert check.call_count == 2
+    assert get_multipass_group_memberships(user, groups) == {a: False, b: True, c: False}
+    assert check.call_count == 3
+    assert c.has_member(user) is False
+    assert check.call_count == 3
+    assert not is_user_in_acl(groups, None)
+    assert not refresh.called
+    # memberships which are about to expire are refreshed in the background
+    mocker.patch('indico.modules.groups.core.MEMBERSHIP_REFRESH_AGE', -1)
+    assert b.has_member(user)
+    refresh.assert_called_once_with(user, [b])
+    assert check.call_count == 3
@@ -5,19 +5,73 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+import json
+import random
+import re
 import time
 
-from flask import g, request_started
+from flask import (before_render_template, g, has_app_context, has_request_context, request, request_started,
+                   request_tearing_down, template_rendered)
 from sqlalchemy.engine import Engine
 from sqlalchemy.event import listens_for
 
+from indico.core.config import config
+from indico.core.logger import Logger
+
+
+#: The number of executions of the same statement in a single request
+#: after which it is reported as a likely N+1 query problem
+REPEATED_QUERY_THRESHOLD = 10
+
+_string_literal_re = re.compile(r"'(?:[^']|'')*'")
+_number_literal_re = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_placeholder_list_re = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_param_re = re.compile(r'%\(\w+\)s|%s|\$\d+')
+_whitespace_re = re.compile(r'\s+')
+
+
+def fingerprint_sql(statement):
+    """Normalize an SQL statement so similar queries can be grouped.
+
+    Literals and bind parameters are replaced with ``?``, lists of
+    them (e.g. in ``IN`` clauses) are collapsed to ``(...)``, and any
+    whitespace is normalized.
+    """
+    statement = _string_literal_re.sub('?', statement)
+    statement = _param_re.sub('?', statement)
+    statement = _number_literal_re.sub('?', statement)
+    statement = _placeholder_list_re.sub('(...)', statement)
+    return _whitespace_re.sub(' ', statement).strip()
+
+
+def _sample_request():
+    """Decide whether the current request should be profiled.
+
+    Collecting the per-statement stats is fairly expensive, so it is only
+    done for requests whose profile is logged and in debug mode.
+
+    :return: A ``(profile, log)`` tuple indicating whether per-statement
+             stats should be collected and whether the profile should
+             be logged at the end of the request.
+    """
+    rate = config.REQUEST_PROFILE_LOG_RATE
+    log = bool(rate) and random.random() < rate
+    return (log or config.DEBUG), log
+
 
 def request_stats_request_started():
     if g.get('request_stats_initialized'):
         return
     g.request_stats_initialized = True
+    g.request_profile_enabled, g.request_profile_log = _sample_request()
     g.query_count = 0
     g.query_duration = 0
+    g.query_stats = {}
+    g.settings_query_count = 0
+    g.cache_hits = 0
+    g.cache_misses = 0
+    g.template_duration = 0
+    g.template_render_starts = []
     g.req_start_ts = time.time()
 
 
@@ -33,12 +87,58 @@ def setup_request_stats(app):
         context._query_start_time = time.time()
 
     @listens_for(Engine, 'after_cursor_execute', named=True)
-    def after_cursor_execute(context, **unused):
+    def after_cursor_execute(context, statement, **unused):
         if not g.get('request_stats_initialized'):
             return
         total = time.time() - context._query_start_time
         g.query_count += 1
         g.query_duration += total
+        if not g.request_profile_enabled:
+            return
+        stats = g.query_stats.setdefault(fingerprint_sql(statement), [0, 0])
+        stats[0] += 1
+        stats[1] += total
+
+    @before_render_template.connect_via(app)
+    def _before_render_template(sender, **kwargs):
+        if g.get('request_stats_initialized'):
+            g.template_render_starts.append(time.time())
+
+    @template_rendered.connect_via(app)
+    def _template_rendered(sender, **kwargs):
+        if not g.get('request_stats_initialized') or not g.template_render_starts:
+            return
+        start = g.template_render_starts.pop()
+        # templates rendered while rendering another one are already
+        # included in the render time of the outer template
+        if not g.template_render_starts:
+            g.template_duration += time.time() - start
+
+    @app.after_request
+    def _add_server_timing_header(response):
+        if config.REQUEST_PROFILE_SERVER_TIMING and g.get('request_stats_initialized'):
+            response.headers['Server-Timing'] = _format_server_timing(get_request_stats())
+        return response
+
+    @request_tearing_down.connect_via(app)
+    def _log_request_profile(sender, **kwargs):
+        if not g.get('request_stats_initialized') or not g.request_profile_log:
+            return
+        g.request_profile_log = False
+        Logger.get('requests.profile').info('%s', json.dumps(get_request_profile()))
+
+
+def count_settings_query():
+    """Record a query loading settings from the database."""
+    if has_app_context() and g.get('request_stats_initialized'):
+        g.settings_query_count += 1
+
+
+def count_cache_access(hits, misses):
+    """Record cache lookups."""
+    if has_app_context() and g.get('request_stats_initialized'):
+        g.cache_hits += hits
+        g.cache_misses += misses
 
 
 def get_request_stats():
@@ -46,5 +146,56 @@ def get_request_stats():
     return {
         'query_count': g.query_count if initialized else 0,
         'query_duration': g.query_duration if initialized else 0,
+        'settings_query_count': g.settings_query_count if initialized else 0,
+        'cache_hits': g.cache_hits if initialized else 0,
+        'cache_misses': g.cache_misses if initialized else 0,
+        'template_duration': g.template_duration if initialized else 0,
         'req_duration': (time.time() - g.req_start_ts) if initialized else 0
     }
+
+
+def get_repeated_queries(threshold=REPEATED_QUERY_THRESHOLD):
+    """Get the statements executed more than `threshold` times.
+
+    Statements are only tracked for requests whose profile is logged
+    and in debug mode; otherwise the list is always empty.
+
+    :return: A list of ``(fingerprint, count, duration)`` tuples,
+             sorted by the number of executions.
+    """
+    if not g.get('request_stats_initialized'):
+        return []
+    return sorted(((fingerprint, count, duration)
+                   for fingerprint, (count, duration) in g.query_stats.items()
+                   if count > threshold),
+                  key=lambda x: x[1], reverse=True)
+
+
+def get_request_profile(limit=10):
+    """Get a detailed performance profile of the current request.
+
+    In addition to the data from :func:`get_request_stats`, this
+    contains the slowest statements and those likely caused by N+1
+    query problems.
+
+    :param limit: The maximum number of statements to include
+    """
+    profile = get_request_stats()
+    query_stats = g.query_stats if g.get('request_stats_initialized') else {}
+    slowest = sorted(query_stats.items(), key=lambda x: x[1][1], reverse=True)[:limit]
+    profile['queries'] = [{'sql': fingerprint, 'count': count, 'duration': duration}
+                          for fingerprint, (count, duration) in slowest]
+    profile['repeated_queries'] = [{'sql': fingerprint, 'count': count, 'duration': duration}
+                                   for fingerprint, count, duration in get_repeated_queries()[:limit]]
+    if has_request_context():
+        profile.update(endpoint=request.endpoint, method=request.method, path=request.path)
+    return profile
+
+
+def _format_server_timing(stats):
+    return ', '.join([
+        f'sql;dur={stats["query_duration"] * 1000:.3f};desc="{stats["query_count"]} queries"',
+        f'tpl;dur={stats["template_duration"] * 1000:.3f}',
+        f'cache;desc="{stats["cache_hits"]} hits, {stats["cache_misses"]} misses"',
+        f'total;dur={stats["req_duration"] * 1000:.3f}',
+    ])
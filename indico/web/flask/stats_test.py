@@ -0,0 +1,92 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import pytest
+from flask import render_template_string
+
+from indico.core.cache import make_scoped_cache
+from indico.web.flask.stats import (_sample_request, count_cache_access, fingerprint_sql, get_repeated_queries,
+                                    get_request_profile, get_request_stats, request_stats_request_started)
+
+
+@pytest.mark.parametrize(('statement', 'expected'), (
+    ('SELECT * FROM users.users WHERE id = %(id_1)s', 'SELECT * FROM users.users WHERE id = ?'),
+    ("SELECT  *\n  FROM foo WHERE name = 'it''s' AND x > 42", 'SELECT * FROM foo WHERE name = ? AND x > ?'),
+    ('SELECT * FROM foo WHERE id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s)', 'SELECT * FROM foo WHERE id IN (...)'),
+    ('SELECT * FROM foo WHERE id IN (1, 2)', 'SELECT * FROM foo WHERE id IN (...)'),
+    ('SELECT foo.col1, t2.x FROM foo AS t2', 'SELECT foo.col1, t2.x FROM foo AS t2'),
+))
+def test_fingerprint_sql(statement, expected):
+    assert fingerprint_sql(statement) == expected
+
+
+def test_fingerprint_sql_groups_statements():
+    assert (fingerprint_sql('SELECT * FROM foo WHERE id IN (%(id_1_1)s)') ==
+            fingerprint_sql('SELECT * FROM foo WHERE id IN (%(id_1_1)s, %(id_1_2)s)'))
+
+
+@pytest.mark.usefixtures('request_context')
+def test_request_profile():
+    request_stats_request_started()
+    g_stats = get_request_stats()
+    assert g_stats['query_count'] == 0
+    count_cache_access(2, 1)
+    cache = make_scoped_cache('test-stats')
+    cache.set('a', 1)
+    assert cache.get_many('a', 'b') == [1, None]
+    render_template_string('{{ 1 + 1 }}')
+    stats = get_request_stats()
+    assert stats['cache_hits'] == 3
+    assert stats['cache_misses'] == 2
+    assert stats['template_duration'] > 0
+
+
+@pytest.mark.usefixtures('request_context')
+def test_repeated_queries(db, create_user, mocker):
+    mocker.patch('indico.web.flask.stats._sample_request', return_value=(True, False))
+    users = [create_user(i) for i in range(1, 13)]
+    db.session.flush()
+    db.session.expire_all()
+    request_stats_request_started()
+    for user in users:
+        assert user.first_name
+    repeated = get_repeated_queries()
+    assert len(repeated) == 1
+    assert repeated[0][1] == 12
+    assert 'WHERE users.users.id = ?' in repeated[0][0]
+    profile = get_request_profile()
+    assert profile['query_count'] == 12
+    assert profile['repeated_queries'][0]['count'] == 12
+
+
+@pytest.mark.usefixtures('request_context')
+def test_queries_not_profiled(db, create_user, mocker):
+    fingerprint_sql = mocker.patch('indico.web.flask.stats.fingerprint_sql')
+    mocker.patch('indico.web.flask.stats._sample_request', return_value=(False, False))
+    users = [create_user(i) for i in range(1, 13)]
+    db.session.flush()
+    db.session.expire_all()
+    request_stats_request_started()
+    for user in users:
+        assert user.first_name
+    # the cheap counters are always available
+    assert get_request_stats()['query_count'] == 12
+    assert get_repeated_queries() == []
+    assert not fingerprint_sql.called
+
+
+@pytest.mark.parametrize(('rate', 'debug', 'random', 'expected'), (
+    (0, False, 0, (False, False)),
+    (0, True, 0, (True, False)),
+    (0.5, False, 0.2, (True, True)),
+    (0.5, False, 0.7, (False, False)),
+    (0.5, True, 0.7, (True, False)),
+))
+def test_sample_request(mocker, rate, debug, random, expected):
+    mocker.patch('indico.web.flask.stats.random').random.return_value = random
+    mocker.patch('indico.web.flask.stats.config', REQUEST_PROFILE_LOG_RATE=rate, DEBUG=debug)
+    assert _sample_request() == expected
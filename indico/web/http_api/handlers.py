@@ -19,7 +19,7 @@ from uuid import UUID
 
 import sentry_sdk
 from authlib.oauth2 import OAuth2Error
-from flask import current_app, g, request, session
+from flask import current_app, g, request, session, stream_with_context
 from werkzeug.exceptions import BadRequest, NotFound
 
 from indico.core.cache import make_scoped_cache
@@ -30,7 +30,7 @@ from indico.modules.api import APIMode, api_settings
 from indico.modules.api.models.keys import APIKey
 from indico.web.http_api import HTTPAPIHook
 from indico.web.http_api.metadata.serializer import Serializer
-from indico.web.http_api.responses import HTTPAPIError, HTTPAPIResult, HTTPAPIResultSchema
+from indico.web.http_api.responses import HTTPAPIError, HTTPAPIResult, HTTPAPIResultSchema, HTTPAPIResultStream
 from indico.web.http_api.util import get_query_parameter
 
 
@@ -100,6 +100,15 @@ def checkAK(apiKey, signature, timestamp, path, query):
     return ak, onlyPublic
 
 
+def _stream_response(serializer, result, logger, path, query):
+    try:
+        yield from serializer.iter_serialize(result)
+    except Exception:
+        # the status code has already been sent at this point, so all we can do is log it
+        logger.exception('Serialization error in streamed request %s?%s', path, query)
+        raise
+
+
 def handler(prefix, path):
     path = posixpath.join('/', prefix, path)
     logger = Logger.get('httpapi')
@@ -229,6 +238,9 @@ def handler(prefix, path):
                 result, extra, complete, typeMap = res
             else:
                 result, extra, complete, typeMap = res, {}, True, {}
+            if isinstance(result, HTTPAPIResultStream):
+                # streamed results are only generated while sending the response
+                addToCache = False
         if result is not None and addToCache:
             ttl = api_settings.get('cache_ttl')
             if ttl > 0:
@@ -266,6 +278,17 @@ def handler(prefix, path):
                 serializer = Serializer.create('json')
 
             result = {'message': error.message}
+        elif isinstance(result, HTTPAPIResultStream):
+            result.path = path
+            result.query = query
+            result.ts = ts
+            response = current_app.response_class(
+                stream_with_context(_stream_response(serializer, result, logger, path, query))
+            )
+            content_type = serializer.get_response_content_type()
+            if content_type:
+                response.content_type = content_type
+            return response
         elif serializer.encapsulate:
             result = HTTPAPIResultSchema().dump(HTTPAPIResult(result, path, query, ts, extra))
 
@@ -11,6 +11,7 @@ Base export interface
 
 import re
 from datetime import datetime, time, timedelta
+from functools import partial
 from types import GeneratorType
 from urllib.parse import unquote
 
@@ -29,7 +30,7 @@ from indico.web.http_api.metadata.atom import AtomSerializer
 from indico.web.http_api.metadata.html import HTML4Serializer
 from indico.web.http_api.metadata.ical import ICalSerializer
 from indico.web.http_api.metadata.jsonp import JSONPSerializer
-from indico.web.http_api.responses import HTTPAPIError
+from indico.web.http_api.responses import HTTPAPIError, HTTPAPIResultStream
 from indico.web.http_api.util import get_query_parameter
 
 
@@ -51,6 +52,8 @@ class HTTPAPIHook:
     COMMIT = False  # commit database changes
     HTTP_POST = False  # require (and allow) HTTP POST
     NO_CACHE = False
+    STREAMING = False  # allow sending results while they are generated when `stream=yes` is passed
+    STREAM_EXTRA_KEYS = ()  # result keys needed by the `_extra` method when streaming
 
     @classmethod
     def parseRequest(cls, path, queryParams):
@@ -95,6 +98,7 @@ class HTTPAPIHook:
         self._queryParams = queryParams
         self._type = type
         self._pathParams = pathParams
+        self._stream = False
 
     def _getParams(self):
         self._offset = get_query_parameter(self._queryParams, ['O', 'offset'], 0, integer=True)
@@ -117,6 +121,7 @@ class HTTPAPIHook:
             raise HTTPAPIError("You can only request up to %d records per request with the detail level '%s'" %
                                (max, self._detail), 400)
         self._limit = self._userLimit if self._userLimit > 0 else max
+        self._stream = self.STREAMING and get_query_parameter(self._queryParams, ['stream'], 'no') == 'yes'
 
         fromDT = get_query_parameter(self._queryParams, ['f', 'from'])
         toDT = get_query_parameter(self._queryParams, ['t', 'to'])
@@ -147,7 +152,9 @@ class HTTPAPIHook:
         complete = True
         try:
             res = func(user)
-            if isinstance(res, GeneratorType):
+            if self._stream and isinstance(res, GeneratorType):
+                return res, True
+            elif isinstance(res, GeneratorType):
                 for obj in res:
                     resultList.append(obj)
             else:
@@ -163,6 +170,10 @@ class HTTPAPIHook:
         resultList, complete = self._performCall(func, user)
         if isinstance(resultList, current_app.response_class):
             return True, resultList, None, None
+        if isinstance(resultList, GeneratorType):
+            # streaming results; the extra data is only available once they have been sent
+            extra_func = partial(extra_func, user) if extra_func else None
+            return False, HTTPAPIResultStream(resultList, extra_func, self.STREAM_EXTRA_KEYS), complete, None
         extra = extra_func(user, resultList) if extra_func else None
         return False, resultList, complete, extra
 
@@ -125,21 +125,46 @@ class ICalSerializer(Serializer):
     def register_mapper(cls, fossil, func):
         cls._mappers[fossil] = func
 
+    def _get_mapper(self, fossil):
+        if '_fossil' in fossil:
+            return ICalSerializer._mappers.get(fossil['_fossil'])
+        else:
+            return self._extra_args.get('ical_serializer')
+
+    def _create_calendar(self):
+        cal = ical.Calendar()
+        cal.add('version', '2.0')
+        cal.add('prodid', '-//CERN//INDICO//EN')
+        return cal
+
     def _execute(self, fossils):
         results = fossils['results']
         if not isinstance(results, list):
             results = [results]
 
-        cal = ical.Calendar()
-        cal.add('version', '2.0')
-        cal.add('prodid', '-//CERN//INDICO//EN')
+        cal = self._create_calendar()
         now = now_utc()
         for fossil in results:
-            if '_fossil' in fossil:
-                mapper = ICalSerializer._mappers.get(fossil['_fossil'])
-            else:
-                mapper = self._extra_args.get('ical_serializer')
+            mapper = self._get_mapper(fossil)
             if mapper:
                 mapper(cal, fossil, now)
 
         return cal.to_ical()
+
+    def iter_serialize(self, result):
+        footer = b'END:VCALENDAR\r\n'
+        header = self._create_calendar().to_ical()
+        assert header.endswith(footer)
+        yield header.removesuffix(footer)
+        now = now_utc()
+        for fossil in result:
+            mapper = self._get_mapper(fossil)
+            if not mapper:
+                continue
+            # the mappers add their components to a calendar, so we give each of them
+            # a temporary one and only send the components it contains
+            cal = ical.Calendar()
+            mapper(cal, fossil, now)
+            for component in cal.subcomponents:
+                yield component.to_ical()
+        yield footer
@@ -17,5 +17,17 @@ class JSONSerializer(Serializer):
     def _execute(self, fossil):
         return json.dumps(fossil, pretty=self.pretty)
 
+    def iter_serialize(self, result):
+        if self.pretty:
+            yield from super().iter_serialize(result)
+        else:
+            yield from self._iter_json(result)
+
+    def _iter_json(self, result):
+        yield '{{"_type":"HTTPAPIResult","url":{},"ts":{},"results":['.format(json.dumps(result.url), result.ts)
+        for i, fossil in enumerate(result):
+            yield (',' if i else '') + json.dumps(fossil)
+        yield '],"count":{},"additionalInfo":{}}}'.format(result.count, json.dumps(result.extra))
+
 
 Serializer.register('json', JSONSerializer)
@@ -17,3 +17,11 @@ class JSONPSerializer(JSONSerializer):
         return '// fetched from Indico\n%s(%s);' % \
                (self._query_params.get('jsonp', 'read'),
                 super()._execute(results))
+
+    def iter_serialize(self, result):
+        if self.pretty:
+            yield from super().iter_serialize(result)
+            return
+        yield '// fetched from Indico\n%s(' % self._query_params.get('jsonp', 'read')
+        yield from self._iter_json(result)
+        yield ');'
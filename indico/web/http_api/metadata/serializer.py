@@ -5,6 +5,9 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+from indico.web.http_api.responses import HTTPAPIResultSchema
+
+
 class Serializer:
 
     schemaless = True
@@ -51,6 +54,16 @@ class Serializer:
         self._data = self._execute(obj, *args, **kwargs)
         return self._data
 
+    def iter_serialize(self, result):
+        """Serialize a :class:`.HTTPAPIResultStream` in chunks.
+
+        Serializers which can produce their output incrementally should
+        override this; by default all results are collected first and
+        serialized in one go.
+        """
+        result = result.materialize()
+        yield self(HTTPAPIResultSchema().dump(result) if self.encapsulate else result.results)
+
 
 from indico.web.http_api.metadata.json import JSONSerializer  # noqa: F401,E402
 from indico.web.http_api.metadata.xml import XMLSerializer  # noqa: F401,E402
@@ -0,0 +1,63 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2022 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import pytest
+from lxml import etree
+
+from indico.util import json
+from indico.web.http_api.metadata.serializer import Serializer
+from indico.web.http_api.responses import HTTPAPIResult, HTTPAPIResultSchema, HTTPAPIResultStream
+
+
+RESULTS = [
+    {'_type': 'Conference', 'id': '1', 'title': 'Foo', 'categoryId': 2, 'keywords': ['a', 'b']},
+    {'_type': 'Conference', 'id': '2', 'title': 'Bar & Baz', 'categoryId': 3, 'keywords': []},
+]
+
+
+def _extra(summaries):
+    return {'categories': sorted(x['categoryId'] for x in summaries)}
+
+
+def _make_stream():
+    stream = HTTPAPIResultStream(iter(RESULTS), _extra, ('categoryId',))
+    stream.path = '/export/categ/1.json'
+    stream.query = 'stream=yes'
+    stream.ts = 1234
+    return stream
+
+
+def _serialize_regular(dformat, **kwargs):
+    serializer = Serializer.create(dformat, **kwargs)
+    result = HTTPAPIResult(RESULTS, '/export/categ/1.json', 'stream=yes', 1234, _extra(RESULTS))
+    return serializer(HTTPAPIResultSchema().dump(result))
+
+
+def _serialize_streamed(dformat, **kwargs):
+    serializer = Serializer.create(dformat, **kwargs)
+    chunks = serializer.iter_serialize(_make_stream())
+    return b''.join(x.encode() if isinstance(x, str) else x for x in chunks)
+
+
+@pytest.mark.parametrize('pretty', (False, True))
+def test_stream_json(pretty):
+    expected = json.loads(_serialize_regular('json', pretty=pretty))
+    assert json.loads(_serialize_streamed('json', pretty=pretty)) == expected
+
+
+def test_stream_xml():
+    expected = etree.fromstring(_serialize_regular('xml'))
+    result = etree.fromstring(_serialize_streamed('xml'))
+    assert sorted(etree.tostring(x) for x in result) == sorted(etree.tostring(x) for x in expected)
+
+
+def test_stream_result_extra():
+    stream = _make_stream()
+    assert stream.count == 0
+    assert list(stream) == RESULTS
+    assert stream.count == 2
+    assert stream.extra == {'categories': [2, 3]}
@@ -7,6 +7,7 @@
 
 import re
 from datetime import datetime
+from io import BytesIO
 
 import dateutil.parser
 from lxml import etree
@@ -106,5 +107,35 @@ class XMLSerializer(Serializer):
         return etree.tostring(result, pretty_print=self.pretty,
                               xml_declaration=xml_declaration, encoding='utf-8')
 
+    def iter_serialize(self, result):
+        buf = BytesIO()
+
+        def _flush():
+            xf.flush()
+            data = buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            return data
+
+        with etree.xmlfile(buf, encoding='utf-8') as xf:
+            xf.write_declaration()
+            if not self.encapsulate:
+                with xf.element('collection'):
+                    for fossil in result:
+                        xf.write(self._xmlForFossil(fossil), pretty_print=self.pretty)
+                        yield _flush()
+            else:
+                head = self._xmlForFossil({'_type': 'HTTPAPIResult', 'ts': result.ts, 'url': result.url})
+                with xf.element(head.tag):
+                    for elem in head:
+                        xf.write(elem, pretty_print=self.pretty)
+                    with xf.element('results'):
+                        for fossil in result:
+                            xf.write(self._xmlForFossil(fossil), pretty_print=self.pretty)
+                            yield _flush()
+                    for elem in self._xmlForFossil({'count': result.count, 'additionalInfo': result.extra}):
+                        xf.write(elem, pretty_print=self.pretty)
+        yield buf.getvalue()
+
 
 Serializer.register('xml', XMLSerializer)
@@ -42,6 +42,45 @@ class HTTPAPIResult:
         return len(self.results)
 
 
+class HTTPAPIResultStream(HTTPAPIResult):
+    """An HTTP API result whose items are generated while sending the response.
+
+    Since the results are only iterated over once, the number of results
+    and the additional info are only available after iterating over it.
+
+    :param results: an iterable yielding the serialized results
+    :param extra_func: a callable that receives a list of summaries of
+                       all the results and returns the additional info
+    :param extra_keys: the keys of each result that are kept for the
+                       summaries passed to `extra_func`
+    """
+
+    def __init__(self, results, extra_func=None, extra_keys=()):
+        super().__init__(results)
+        self._extra_func = extra_func
+        self._extra_keys = extra_keys
+        self._count = 0
+
+    def __iter__(self):
+        summaries = []
+        for result in self.results:
+            self._count += 1
+            if self._extra_func:
+                summaries.append({key: result.get(key) for key in self._extra_keys})
+            yield result
+        if self._extra_func:
+            self.extra = self._extra_func(summaries) or {}
+
+    @property
+    def count(self):
+        return self._count
+
+    def materialize(self):
+        """Collect all results into a regular :class:`HTTPAPIResult`."""
+        results = list(self)
+        return HTTPAPIResult(results, self.path, self.query, self.ts, self.extra)
+
+
 class HTTPAPIResultSchema(mm.Schema):
     count = fields.Integer()
     extra = fields.Raw(data_key='additionalInfo')